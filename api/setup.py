@@ -2,6 +2,7 @@
 # https://hynek.me/articles/sharing-your-labor-of-love-pypi-quick-and-dirty/
 import sys
 import codecs
+import importlib.util
 import os
 import os.path
 from setuptools import setup, find_packages
@@ -27,6 +28,21 @@ SHARED_DATA_SUBDIRS = ['deck',
                        'protocol']
 # Where, relative to the package root, we put the files we copy
 DEST_BASE_PATH = 'shared_data'
+# The module that knows how to compile shared data into a bundle
+DATA_BUNDLE_MODULE = os.path.join(
+    'src', 'opentrons', 'util', 'data_bundle.py')
+
+
+def load_data_bundle_module():
+    """
+    Load opentrons.util.data_bundle on its own, since the rest of the package
+    (and its dependencies) may not be importable at build time
+    """
+    spec = importlib.util.spec_from_file_location(
+        'data_bundle', os.path.join(HERE, DATA_BUNDLE_MODULE))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
 
 
 def get_shared_data_files():
@@ -79,6 +95,26 @@ class BuildWithSharedData(build_py.build_py):
                       destination, to_include))
         return files
 
+    def run(self):
+        super().run()
+        if not self.dry_run and os.path.isdir(SHARED_DATA_PATH):
+            self.build_data_bundle()
+
+    def build_data_bundle(self):
+        """
+        Compile the shared data definitions into a single bundle that the
+        package can load faster than the individual json files
+        """
+        data_bundle = load_data_bundle_module()
+        destination = os.path.join(
+            self.build_lib, 'opentrons', DEST_BASE_PATH,
+            data_bundle.BUNDLE_NAME)
+        self.mkpath(os.path.dirname(destination))
+        count = data_bundle.build_bundle(
+            SHARED_DATA_PATH, data_bundle.BUNDLED_SUBDIRS, destination)
+        self.announce("bundled {} shared data files into {}"
+                      .format(count, destination))
+
 
 def get_version():
     with open(os.path.join(HERE, 'src', 'opentrons', 'package.json')) as pkg:
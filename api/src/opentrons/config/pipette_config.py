@@ -1,11 +1,17 @@
-import copy
+import bisect
+import functools
 import logging
 import json
 from collections import namedtuple
-from typing import Any, Dict, List, Union, Tuple, Sequence, Optional
-import pkgutil
+from pathlib import Path
+from types import MappingProxyType
+from typing import (Any, Dict, List, Mapping, Union, Tuple, Sequence,
+                    Optional)
+
+import numpy as np  # type: ignore
 
 from opentrons.config import feature_flags as ff, CONFIG
+from opentrons.util.data_bundle import load_shared_data
 
 
 log = logging.getLogger(__name__)
@@ -67,32 +73,115 @@ Z_OFFSET_P300 = 0
 Z_OFFSET_P1000 = 20  # shortest single-channel pipette
 
 
-def model_config() -> Dict[str, Any]:
-    """ Load the per-pipette-model config file from within the wheel """
-    return json.loads(
-        pkgutil.get_data(
-            'opentrons',
-            'shared_data/pipette/definitions/pipetteModelSpecs.json')
-        or '{}')
+def _freeze(obj: Any) -> Any:
+    """ Build a read-only view of a parsed json object, converting dicts to
+    mapping proxies and lists to tuples all the way down.
+    """
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    elif isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+
+def _thaw(obj: Any) -> Any:
+    """ Build a plain, mutable (and json serializable) copy of a view built
+    by :py:meth:`_freeze`
+    """
+    if isinstance(obj, Mapping):
+        return {k: _thaw(v) for k, v in obj.items()}
+    elif isinstance(obj, tuple):
+        return [_thaw(v) for v in obj]
+    return obj
+
 
+@functools.lru_cache(maxsize=None)
+def model_config() -> Mapping[str, Any]:
+    """ Load the per-pipette-model config file from within the wheel.
+
+    The file is only loaded once (from the shared data bundle if there is
+    one); the result is a read-only view. Use
+    :py:meth:`load` or :py:meth:`load_config_dict` to get mutable configs.
+    """
+    return _freeze(load_shared_data(
+        'pipette/definitions/pipetteModelSpecs.json'))
 
-def name_config() -> Dict[str, Any]:
-    """ Load the per-pipette-name config file from within the wheel """
-    return json.loads(
-        pkgutil.get_data(
-            'opentrons',
-            'shared_data/pipette/definitions/pipetteNameSpecs.json')
-        or '{}')
+
+@functools.lru_cache(maxsize=None)
+def name_config() -> Mapping[str, Any]:
+    """ Load the per-pipette-name config file from within the wheel.
+
+    The file is only loaded once; the result is a read-only view.
+    """
+    return _freeze(load_shared_data(
+        'pipette/definitions/pipetteNameSpecs.json'))
 
 
 config_models = list(model_config()['config'].keys())
 configs = model_config()['config']
 #: A list of pipette model names for which we have config entries
-MUTABLE_CONFIGS = model_config()['mutableConfigs']
+MUTABLE_CONFIGS = list(model_config()['mutableConfigs'])
 #: A list of mutable configs for pipettes
-VALID_QUIRKS = model_config()['validQuirks']
+VALID_QUIRKS = list(model_config()['validQuirks'])
 #: A list of valid quirks for pipettes
 
+# Merged (model + name + overrides) configs, keyed by model and the path of
+# the override file (if any), along with the signature of the override file
+# they were built from
+_merged_configs: Dict[Tuple[str, Optional[Path]],
+                      Tuple[Optional[Tuple[int, int]], Mapping[str, Any]]] = {}
+
+
+def _override_path(pipette_id: str) -> Path:
+    return CONFIG['pipette_config_overrides_dir']/f'{pipette_id}.json'
+
+
+def _override_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """ Get the mtime and size of an override file, or None if it does not
+    exist. Used to decide whether a cached config is stale.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _merged_config(
+        pipette_model: str, pipette_id: Optional[str]) -> Mapping[str, Any]:
+    """ Get the read-only model config for a pipette, updated with its name
+    config and any overrides. Results are cached until the override file
+    changes on disk.
+    """
+    path = _override_path(pipette_id) if pipette_id else None
+    key = (pipette_model, path)
+    signature = _override_signature(path) if path else None
+    cached = _merged_configs.get(key)
+    if cached and (not path or signature) and cached[0] == signature:
+        return cached[1]
+
+    cfg = dict(configs[pipette_model])
+    cfg.update(name_config()[cfg['name']])
+    # Load overrides if we have a pipette id
+    if pipette_id:
+        try:
+            override = load_overrides(pipette_id)
+            if 'quirks' in override.keys():
+                override['quirks'] = [
+                    qname for qname, qval in override['quirks'].items()
+                    if qval]
+        except FileNotFoundError:
+            save_overrides(pipette_id, {}, pipette_model)
+            log.info(
+                "Save defaults for pipette model {} and id {}".format(
+                    pipette_model, pipette_id))
+        else:
+            cfg.update(_freeze(override))
+        signature = _override_signature(path) if path else None
+    merged = MappingProxyType(cfg)
+    _merged_configs[key] = (signature, merged)
+    return merged
+
 
 def name_for_model(pipette_model: str) -> str:
     return configs[pipette_model]['name']
@@ -110,8 +199,10 @@ def load(pipette_model: str, pipette_id: str = None) -> pipette_config:
     - any config overrides found in
       ``opentrons.config.CONFIG['pipette_config_overrides_dir']``
 
-    This function reads from disk each time, so changes to the overrides
-    will be picked up in subsequent calls.
+    The shared data files are only parsed once, and merged configs are
+    cached per model and pipette id. The override file is checked for changes
+    on each call, so changes to the overrides will be picked up in subsequent
+    calls.
 
     :param str pipette_model: The pipette model name (i.e. "p10_single_v1.3")
                               for which to load configuration
@@ -129,24 +220,7 @@ def load(pipette_model: str, pipette_id: str = None) -> pipette_config:
     :returns pipette_config: The configuration, loaded and checked
     """
 
-    # Load the model config and update with the name config
-    cfg = copy.deepcopy(configs[pipette_model])
-    cfg.update(copy.deepcopy(name_config()[cfg['name']]))
-    # Load overrides if we have a pipette id
-    if pipette_id:
-        try:
-            override = load_overrides(pipette_id)
-            if 'quirks' in override.keys():
-                override['quirks'] = [
-                    qname for qname, qval in override['quirks'].items()
-                    if qval]
-        except FileNotFoundError:
-            save_overrides(pipette_id, {}, pipette_model)
-            log.info(
-                "Save defaults for pipette model {} and id {}".format(
-                    pipette_model, pipette_id))
-        else:
-            cfg.update(override)
+    cfg = _merged_config(pipette_model, pipette_id)
 
     # the ulPerMm functions are structured in pipetteModelSpecs.json as
     # a list sorted from oldest to newest. That means the latest functions
@@ -157,10 +231,10 @@ def load(pipette_model: str, pipette_id: str = None) -> pipette_config:
     # intelligently
     if ff.use_old_aspiration_functions():
         log.info("Using old aspiration functions")
-        ul_per_mm = cfg['ulPerMm'][0]
+        ul_per_mm = _thaw(cfg['ulPerMm'][0])
     else:
         log.info("Using new aspiration functions")
-        ul_per_mm = cfg['ulPerMm'][-1]
+        ul_per_mm = _thaw(cfg['ulPerMm'][-1])
 
     smoothie_configs = cfg['smoothieConfigs']
     res = pipette_config(
@@ -183,7 +257,8 @@ def load(pipette_model: str, pipette_id: str = None) -> pipette_config:
         dispense_flow_rate=ensure_value(
             cfg, 'defaultDispenseFlowRate', MUTABLE_CONFIGS),
         channels=ensure_value(cfg, 'channels', MUTABLE_CONFIGS),
-        model_offset=ensure_value(cfg, 'modelOffset', MUTABLE_CONFIGS),
+        model_offset=_thaw(
+            ensure_value(cfg, 'modelOffset', MUTABLE_CONFIGS)),
         plunger_current=ensure_value(cfg, 'plungerCurrent', MUTABLE_CONFIGS),
         drop_tip_current=ensure_value(cfg, 'dropTipCurrent', MUTABLE_CONFIGS),
         drop_tip_speed=ensure_value(cfg, 'dropTipSpeed', MUTABLE_CONFIGS),
@@ -207,7 +282,7 @@ def load(pipette_model: str, pipette_id: str = None) -> pipette_config:
 
 
 def piecewise_volume_conversion(
-        ul: float, sequence: List[List[float]]) -> float:
+        ul: float, sequence: Sequence[Sequence[float]]) -> float:
     """
     Takes a volume in microliters and a sequence representing a piecewise
     function for the slope and y-intercept of a ul/mm function, where each
@@ -218,6 +293,9 @@ def piecewise_volume_conversion(
       - the slope of the segment
       - the y-intercept of the segment
 
+    For repeated conversions with the same sequence, build a
+    :py:class:`VolumeConversionTable` once instead.
+
     :return: the ul/mm value for the specified volume
     """
     # pick the first item from the seq for which the target is less than
@@ -227,10 +305,67 @@ def piecewise_volume_conversion(
     return i[1]*ul + i[2]
 
 
+class VolumeConversionTable:
+    """ A precompiled form of a piecewise ul/mm function (see
+    :py:meth:`piecewise_volume_conversion`).
+
+    The segment breakpoints are kept sorted so that the segment for a volume
+    can be found with a binary search rather than a scan of the sequence, and
+    whole arrays of volumes can be converted at once.
+    """
+    def __init__(self, sequence: Sequence[Sequence[float]]) -> None:
+        # Only segments whose max volume is above that of every previous
+        # segment can ever be selected by a first-match scan, so dropping the
+        # others leaves strictly increasing breakpoints with the same results
+        segments: List[Sequence[float]] = []
+        for segment in sequence:
+            if not segments or segment[0] > segments[-1][0]:
+                segments.append(segment)
+        self._breakpoints = [float(seg[0]) for seg in segments]
+        self._slopes = [float(seg[1]) for seg in segments]
+        self._intercepts = [float(seg[2]) for seg in segments]
+        self._np_breakpoints = np.array(self._breakpoints)
+        self._np_slopes = np.array(self._slopes)
+        self._np_intercepts = np.array(self._intercepts)
+
+    def ul_per_mm(self, ul: float) -> float:
+        """ Get the ul/mm value for a single volume
+
+        :raises IndexError: if the volume is above the last breakpoint
+        """
+        idx = bisect.bisect_left(self._breakpoints, ul)
+        if idx == len(self._breakpoints):
+            raise IndexError(
+                f'{ul}uL is outside of the ul/mm function')
+        return self._slopes[idx]*ul + self._intercepts[idx]
+
+    def ul_per_mm_array(self, ul: Sequence[float]) -> np.ndarray:
+        """ Get the ul/mm values for a whole sequence of volumes at once
+
+        :raises IndexError: if any volume is above the last breakpoint
+        """
+        volumes = np.asarray(ul, dtype=float)
+        idx = np.searchsorted(self._np_breakpoints, volumes, side='left')
+        if np.any(idx == len(self._breakpoints)):
+            raise IndexError(
+                f'{volumes.max()}uL is outside of the ul/mm function')
+        return self._np_slopes[idx]*volumes + self._np_intercepts[idx]
+
+
+def compile_ul_per_mm(
+        ul_per_mm: Mapping[str, Sequence[Sequence[float]]])\
+        -> Dict[str, VolumeConversionTable]:
+    """ Build a :py:class:`VolumeConversionTable` for each action ('aspirate'
+    and 'dispense') of a ul_per_mm config element
+    """
+    return {action: VolumeConversionTable(sequence)
+            for action, sequence in ul_per_mm.items()}
+
+
 def save_overrides(
         pipette_id: str, overrides: Dict[str, Any], model: Optional[str]):
     override_dir = CONFIG['pipette_config_overrides_dir']
-    model_configs = configs[model]
+    model_configs = _thaw(configs[model])
     try:
         existing = load_overrides(pipette_id)
         # Add quirks setting for pipettes already with a pipette id file
@@ -256,6 +391,14 @@ def save_overrides(
     assert model in config_models
     existing['model'] = model
     json.dump(existing, (override_dir/f'{pipette_id}.json').open('w'))
+    _invalidate_merged_configs(override_dir/f'{pipette_id}.json')
+
+
+def _invalidate_merged_configs(path: Path):
+    """ Drop any cached merged configs built from the override file at path
+    """
+    for key in [k for k in _merged_configs.keys() if k[1] == path]:
+        del _merged_configs[key]
 
 
 def change_quirks(override_quirks, existing, model_configs):
@@ -296,7 +439,7 @@ def validate_quirks(quirks: List[str]):
 
 
 def ensure_value(
-        config: dict,
+        config: Mapping[str, Any],
         name: Union[str, Tuple[str, ...]],
         mutable_config_list: List[str]):
     """
@@ -340,8 +483,8 @@ def load_config_dict(pipette_id: str) -> Dict:
     """
     override = load_overrides(pipette_id)
     model = override['model']
-    config = copy.deepcopy(model_config()['config'][model])
-    config.update(copy.deepcopy(name_config()[config['name']]))
+    config = _thaw(configs[model])
+    config.update(_thaw(name_config()[config['name']]))
 
     if 'quirks' not in override.keys():
         override['quirks'] = {key: True for key in config['quirks']}
@@ -1,7 +1,9 @@
 # pylama:ignore=E252
+import contextlib
 import sqlite3
+import threading
 # import warnings
-from typing import List
+from typing import Iterator, List
 from opentrons.legacy_api.containers.placeable\
     import Container, Well, Module, Placeable
 from opentrons.data_storage import database_queries as db_queries
@@ -16,6 +18,55 @@ log = logging.getLogger(__file__)
 database_path = str(CONFIG['labware_database_file'])
 log.debug("Database path: {}".format(database_path))
 
+# The columns of a well row after the container name, in order
+_WELL_COLUMNS = ('location', 'x', 'y', 'z', 'depth', 'volume', 'diameter',
+                 'length', 'width')
+
+# Each thread keeps one connection open (sqlite connections can't be shared
+# between threads), which also keeps the statements it has compiled.
+# Bumping the generation, when the database is changed or removed, makes
+# every thread reconnect the next time it uses it.
+_local = threading.local()
+_generation = 0
+# Changes whenever anything is written to (or replaces) the database
+_revision = 0
+
+
+def _connect():
+    db_conn = sqlite3.connect(database_path)
+    try:
+        # Readers don't wait for writers, and commits don't fsync the main
+        # file, in write-ahead-log mode
+        db_conn.execute('PRAGMA journal_mode=WAL')
+        db_conn.execute('PRAGMA synchronous=NORMAL')
+    except sqlite3.DatabaseError:
+        log.exception("Could not put the labware database in WAL mode")
+    return db_conn
+
+
+def _connection():
+    db_conn = getattr(_local, 'db_conn', None)
+    if db_conn is None or _local.generation != _generation:
+        if db_conn is not None:
+            db_conn.close()
+        db_conn = _connect()
+        _local.db_conn = db_conn
+        _local.generation = _generation
+        _local.depth = 0
+    return db_conn
+
+
+def _changed():
+    global _revision
+    _revision += 1
+
+
+def _close_connection():
+    db_conn = getattr(_local, 'db_conn', None)
+    if db_conn is not None:
+        db_conn.close()
+        _local.db_conn = None
+
 # ======================== Private Functions ======================== #
 
 
@@ -47,20 +98,20 @@ def _create_container_obj_in_db(db, container: Container, container_name: str):
     db_queries.create_container(
         db, container_name, **_parse_container_obj(container)
     )
-    for well in iter(container):
-        _create_well_obj_in_db(db, container_name, well)
+    db_queries.insert_wells_into_db(
+        db, container_name, [_well_row(well) for well in container])
 
 
 def _load_container_object_from_db(db, container_name: str):
-    db_data = db_queries.get_container_by_name(db, container_name)
-    if not db_data:
+    rows = db_queries.get_container_with_wells(db, container_name)
+    if not rows:
         raise ValueError(
             "No container with name {} found in Containers database"
             .format(container_name)
         )
 
-    container_type, *rel_coords = db_data
-    wells = db_queries.get_wells_by_container_name(db, container_name)
+    container_type, *rel_coords = rows[0][:4]
+    wells = [row[4:] for row in rows if row[4] is not None]
     if not wells:
         raise ResourceWarning(
             "No wells for container {} found in ContainerWells database"
@@ -96,11 +147,9 @@ def _delete_container_object_in_db(db, container_name: str):
     db_queries.delete_container(db, container_name)
 
 
-def _create_well_obj_in_db(db, container_name: str, well: Well):
+def _well_row(well: Well):
     well_data = _parse_well_obj(well)
-    db_queries.insert_well_into_db(
-        db_conn=db, container_name=container_name, **well_data
-    )
+    return tuple(well_data[column] for column in _WELL_COLUMNS)
 
 
 def _load_well_object_from_db(db, well_data):
@@ -146,70 +195,113 @@ def _get_db_version(db):
 
 
 # ======================== Public Functions ======================== #
+@contextlib.contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """
+    This thread's connection to the labware database, in a transaction that
+    is committed when the outermost ``with transaction()`` exits (or rolled
+    back if it raises), so that nested database calls commit together.
+    """
+    db_conn = _connection()
+    outermost = not _local.depth
+    changes = db_conn.total_changes
+    _local.depth += 1
+    try:
+        yield db_conn
+    except BaseException:
+        if outermost:
+            db_conn.rollback()
+        raise
+    else:
+        if outermost:
+            db_conn.commit()
+            if db_conn.total_changes != changes:
+                _changed()
+                # Write the changes back to the main database file, which
+                # is sometimes copied without its write-ahead log
+                db_conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+    finally:
+        _local.depth -= 1
+
+
+def revision() -> int:
+    """ A number that changes whenever the contents of the database might
+    have changed, so that anything built from them can tell it is stale """
+    return _revision
+
+
 def save_new_container(container: Container, container_name: str) -> bool:
-    db_conn = sqlite3.connect(database_path)
-    _create_container_obj_in_db(db_conn, container, container_name)
+    with transaction() as db_conn:
+        _create_container_obj_in_db(db_conn, container, container_name)
     res = True  # old create fn does not return anything
     return res
 
 
 def load_container(container_name: str) -> Container:
-    db_conn = sqlite3.connect(database_path)
-    res = _load_container_object_from_db(db_conn, container_name)
+    with transaction() as db_conn:
+        res = _load_container_object_from_db(db_conn, container_name)
     return res
 
 
 def overwrite_container(container: Container) -> bool:
     log.debug("Overwriting container definition: {}".format(
         container.get_type()))
-    db_conn = sqlite3.connect(database_path)
-    _update_container_object_in_db(db_conn, container)
+    with transaction() as db_conn:
+        _update_container_object_in_db(db_conn, container)
     res = True  # old overwrite fn does not return anything
     return res
 
 
 def delete_container(container_name) -> bool:
-    db_conn = sqlite3.connect(database_path)
-    _delete_container_object_in_db(db_conn, container_name)
+    with transaction() as db_conn:
+        _delete_container_object_in_db(db_conn, container_name)
     res = True  # old delete fn does not return anything
     return res
 
 
 def list_all_containers() -> List[str]:
-    db_conn = sqlite3.connect(database_path)
-    res = _list_all_containers_by_name(db_conn)
+    with transaction() as db_conn:
+        res = _list_all_containers_by_name(db_conn)
     return res
 
 
 def load_module(module_name: str) -> Container:
-    db_conn = sqlite3.connect(database_path)
-    res = _load_module_dict_from_db(db_conn, module_name)
+    with transaction() as db_conn:
+        res = _load_module_dict_from_db(db_conn, module_name)
     return res
 
 
 def change_database(db_path: str):
-    global database_path
+    global database_path, _generation
+    _close_connection()
     database_path = db_path
+    _generation += 1
+    _changed()
 
 
 def get_version():
     '''Get the Opentrons-defined database version'''
-    db_conn = sqlite3.connect(database_path)
-    return _get_db_version(db_conn)
+    with transaction() as db_conn:
+        return _get_db_version(db_conn)
 
 
 def set_version(version):
-    db_conn = sqlite3.connect(database_path)
-    db_queries.set_user_version(db_conn, version)
+    with transaction() as db_conn:
+        db_queries.set_user_version(db_conn, version)
 
 
 def reset():
     """ Unmount and remove the sqlite database (used in robot reset) """
+    global _generation
+    _close_connection()
+    _generation += 1
+    _changed()
     if os.path.exists(database_path):
         os.remove(database_path)
     # Not an os.path.join because it is a suffix to the full filename
-    journal_path = database_path + '-journal'
-    if os.path.exists(journal_path):
-        os.remove(journal_path)
+    for suffix in ('-journal', '-wal', '-shm'):
+        journal_path = database_path + suffix
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
 
 # ======================== END Public Functions ======================== #
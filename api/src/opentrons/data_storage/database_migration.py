@@ -5,9 +5,9 @@ from opentrons.data_storage.old_container_loading import \
     load_all_containers_from_disk, \
     list_container_names, \
     get_persisted_container
-from opentrons.config import CONFIG
 from opentrons.data_storage.schema_changes import \
-    create_table_ContainerWells, create_table_Containers
+    create_table_ContainerWells, create_table_Containers, \
+    create_index_ContainerWells_container_name
 from opentrons.util.vector import Vector
 
 # TODO (SF 7/11/2019): Once we're off balena remove all these prints
@@ -74,8 +74,9 @@ def _ensure_containers_and_wells():
     msg = f"Found {len(to_update)} containers to add. Starting migration..."
     print(msg)
     log.info(msg)
-    for container_name in to_update:
-        _migrate_container(container_name)
+    with database.transaction():
+        for container_name in to_update:
+            _migrate_container(container_name)
     current_containers = database.list_all_containers()
     missing = set(json_containers) - set(current_containers)
     if missing:
@@ -101,8 +102,9 @@ def _ensure_trash():
     present = set(database.list_all_containers())
     to_update = to_load - present
     log.info(f"_ensure_trash: loading {to_update}")
-    for container_name in to_update:
-        _migrate_container(container_name)
+    with database.transaction():
+        for container_name in to_update:
+            _migrate_container(container_name)
 
 
 def execute_schema_change(conn, sql_command):
@@ -111,24 +113,29 @@ def execute_schema_change(conn, sql_command):
 
 
 def _do_schema_changes():
-    db_path = str(CONFIG['labware_database_file'])
-    conn = sqlite3.connect(db_path)
-    db_version = database.get_version()
-    if db_version == 0:
-        log.info("doing database schema migration")
-        try:
-            execute_schema_change(conn, create_table_ContainerWells)
-        except sqlite3.OperationalError:
-            log.warning(
-                "Creation of container wells failed, robot may have been "
-                "interrupted during last boot")
-        try:
-            execute_schema_change(conn, create_table_Containers)
-        except sqlite3.OperationalError:
-            log.warning(
-                "Creation of containers failed, robot may have been "
-                "interrupted during last boot")
-        database.set_version(1)
+    with database.transaction() as conn:
+        db_version = database.get_version()
+        if db_version == 0:
+            log.info("doing database schema migration")
+            try:
+                execute_schema_change(conn, create_table_ContainerWells)
+            except sqlite3.OperationalError:
+                log.warning(
+                    "Creation of container wells failed, robot may have been "
+                    "interrupted during last boot")
+            try:
+                execute_schema_change(conn, create_table_Containers)
+            except sqlite3.OperationalError:
+                log.warning(
+                    "Creation of containers failed, robot may have been "
+                    "interrupted during last boot")
+            database.set_version(1)
+            db_version = 1
+        if db_version == 1:
+            log.info("indexing container wells by container")
+            execute_schema_change(
+                conn, create_index_ContainerWells_container_name)
+            database.set_version(2)
     return conn
 
 
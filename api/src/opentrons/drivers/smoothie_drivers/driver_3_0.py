@@ -3,14 +3,15 @@ from os import environ
 import logging
 from time import sleep
 from threading import Event, RLock
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Set
 
-from numpy import isclose  # type: ignore
 from serial.serialutil import SerialException  # type: ignore
 
 from opentrons.drivers import serial_communication
 from opentrons.drivers.rpi_drivers import gpio
 from opentrons.system import smoothie_update
+from . import gcode, motion_script
+from .motion_script import MotionScript
 '''
 - Driver is responsible for providing an interface for motion control
 - Driver is the only system component that knows about GCODES or how smoothie
@@ -275,6 +276,11 @@ def _parse_homing_status_values(raw_homing_status_values):
     return res
 
 
+def _speed_command(speed):
+    ''' The gcode to set the combined axes speed to `speed` mm/second '''
+    return GCODES['SET_SPEED'] + str(int(speed * SEC_PER_MIN))
+
+
 class SmoothieDriver_3_0_0:
     def __init__(self, config, handle_locks=True):
         self.run_flag = Event()
@@ -289,6 +295,8 @@ class SmoothieDriver_3_0_0:
         self.simulating = True
         self._connection = None
         self._config = config
+        self._gcode = gcode.GCodeBuilder(
+            GCODES, GCODE_ROUNDING_PRECISION, CURRENT_CHANGE_DELAY)
 
         # Current settings:
         # The amperage of each axis, has been organized into three states:
@@ -333,6 +341,16 @@ class SmoothieDriver_3_0_0:
 
         # position after homing
         self._homed_position = HOMED_POSITION.copy()
+        # Axes whose homed position has been read back from the smoothie
+        # since its homing positions were last configured. Homing these again
+        # lands on a known position, so it doesn't need an M114.2.
+        self._verified_home_axes: Set[str] = set()
+        # Set when the tracked position might not match the smoothie (before
+        # setup, and after errors and halts) so the next home reads it back
+        self._position_stale = True
+        # How far each axis was from where it was expected to be the last
+        # time its position was read back
+        self._position_drift = {ax: 0.0 for ax in AXES}
         self.homed_flags = {}
         self.update_homed_flags(flags={
             'X': False,
@@ -368,7 +386,52 @@ class SmoothieDriver_3_0_0:
 
         self.log += [self._position.copy()]
 
+    @property
+    def position_drift(self) -> Dict[str, float]:
+        '''
+        The difference (in mm) between the position read back from the
+        smoothie and the position it was expected to be at, for each axis,
+        the last time it was read back while the tracked position was trusted
+        '''
+        return self._position_drift.copy()
+
     def update_position(self, default=None):
+        '''
+        Read the position back from the smoothie (M114.2) and replace the
+        tracked position with it. The tracked position is otherwise only
+        updated from the targets of successful moves, so any disagreement
+        with it (or with `default`, where the axes are expected to be) is
+        recorded in :py:attr:`position_drift` and logged if it is larger than
+        a step.
+
+        :param default: The expected position of some axes, which is also
+            used as the new position when simulating
+        '''
+        expected = self._position.copy()
+        expected.update(default or {})
+        updated_position = self._read_position(default)
+        if not self._position_stale:
+            self._record_drift(expected, updated_position)
+        self._update_position(updated_position)
+        self._position_stale = False
+
+    def _record_drift(self, expected, updated_position):
+        drift = {
+            ax: updated_position[ax] - expected[ax]
+            for ax in AXES
+            if updated_position.get(ax) is not None
+            and expected.get(ax) is not None
+        }
+        self._position_drift.update(drift)
+        drifted = {
+            ax: round(value, GCODE_ROUNDING_PRECISION)
+            for ax, value in drift.items()
+            if abs(value) > MOVEMENT_ERROR_MARGIN
+        }
+        if drifted:
+            log.warning(f'Position drifted from tracked position: {drifted}')
+
+    def _read_position(self, default):
         if default is None:
             default = self._position
 
@@ -392,7 +455,7 @@ class SmoothieDriver_3_0_0:
             updated_position = _recursive_update_position(
                 DEFAULT_COMMAND_RETRIES)
 
-        self._update_position(updated_position)
+        return updated_position
 
     def read_pipette_id(self, mount) -> Optional[str]:
         '''
@@ -482,6 +545,9 @@ class SmoothieDriver_3_0_0:
         if self.simulating:
             return {axis: data}
 
+        if 'home' in data:
+            self._verified_home_axes.discard(axis.upper())
+
         gcodes = {
             'retract': 'M365.3',
             'debounce': 'M365.2',
@@ -649,8 +715,7 @@ class SmoothieDriver_3_0_0:
     def set_speed(self, value):
         ''' set total axes movement speed in mm/second'''
         self._combined_speed = float(value)
-        speed_per_min = int(self._combined_speed * SEC_PER_MIN)
-        command = GCODES['SET_SPEED'] + str(speed_per_min)
+        command = _speed_command(self._combined_speed)
         log.debug("set_speed: {}".format(command))
         self._send_command(command)
 
@@ -792,6 +857,7 @@ class SmoothieDriver_3_0_0:
             for ax in settings.keys()
         })
         self._current_settings['now'].update(settings)
+        self._gcode.currents_changed()
         log.debug("_save_current: {}".format(self.current))
 
     def _set_saved_current(self):
@@ -808,19 +874,7 @@ class SmoothieDriver_3_0_0:
         axis-current settings, plus a small delay to wait for those settings
         to take effect.
         '''
-        values = ['{}{}'.format(axis, value)
-                  for axis, value in sorted(self.current.items())]
-        current_cmd = '{} {}'.format(
-            GCODES['SET_CURRENT'],
-            ' '.join(values)
-        )
-        command = '{currents} {code}P{seconds}'.format(
-            currents=current_cmd,
-            code=GCODES['DWELL'],
-            seconds=CURRENT_CHANGE_DELAY
-        )
-        log.debug("_generate_current_command: {}".format(command))
-        return command
+        return self._gcode.current_command(self.current)
 
     def disengage_axis(self, axes):
         '''
@@ -895,6 +949,7 @@ class SmoothieDriver_3_0_0:
         if not self.simulating:
             sleep(DEFAULT_STABILIZE_DELAY)
         log.debug("reset_from_error")
+        self._position_stale = True
         self._send_command(GCODES['RESET_FROM_ERROR'])
         self.update_homed_flags()
 
@@ -925,37 +980,67 @@ class SmoothieDriver_3_0_0:
             with self._serial_lock:
                 return self._send_command_unsynchronized(command, timeout)
         except SmoothieError as se:
-            # XXX: This is a reentrancy error because another command could
-            # swoop in here. We're already resetting though and errors (should
-            # be) rare so it's probably fine, but the actual solution to this
-            # is locking at a higher level like in APIv2.
-            self._reset_from_error()
-            error_axis = se.ret_code.strip()[-1]
-            log.warning(
-                    f"alarm/error: command={command}, resp={se.ret_code}")
-            if GCODES['MOVE'] in command or GCODES['PROBE'] in command:
-                if error_axis not in 'XYZABC':
-                    error_axis = AXES
-                log.info("Homing after alarm/error")
-                self.home(error_axis)
-            raise SmoothieError(se.ret_code, command)
+            self._recover_from_error(se, command)
+
+    def _send_commands(self, commands, timeout=DEFAULT_SMOOTHIE_TIMEOUT):
+        """
+        Submit several GCODE commands to the robot, one per line, followed by
+        a single M400 to block until they are all done. A command of just
+        M400 waits for the commands before it to finish. Errors are handled
+        as in :py:meth:`_send_command`.
+        """
+        if self.simulating:
+            return
+        command = ''
+        try:
+            with self._serial_lock:
+                for command in commands:
+                    if command == GCODES['WAIT']:
+                        self._wait_for_idle()
+                    else:
+                        self._write_command(command)
+                self._wait_for_idle()
+        except SmoothieError as se:
+            self._recover_from_error(se, command)
+
+    def _recover_from_error(self, se, command):
+        # XXX: This is a reentrancy error because another command could
+        # swoop in here. We're already resetting though and errors (should
+        # be) rare so it's probably fine, but the actual solution to this
+        # is locking at a higher level like in APIv2.
+        self._reset_from_error()
+        error_axis = se.ret_code.strip()[-1]
+        log.warning(
+                f"alarm/error: command={command}, resp={se.ret_code}")
+        if GCODES['MOVE'] in command or GCODES['PROBE'] in command:
+            if error_axis not in 'XYZABC':
+                error_axis = AXES
+            log.info("Homing after alarm/error")
+            self.home(error_axis)
+        raise SmoothieError(se.ret_code, command)
 
     def _send_command_unsynchronized(self,
                                      command,
                                      timeout=DEFAULT_SMOOTHIE_TIMEOUT):
+        cmd_ret = self._write_command(command)
+        self._wait_for_idle()
+        return cmd_ret.strip()
+
+    def _write_command(self, command):
         cmd_ret = self._write_with_retries(
             command + SMOOTHIE_COMMAND_TERMINATOR,
             5.0, DEFAULT_COMMAND_RETRIES)
-        cmd_ret = self._remove_unwanted_characters(command, cmd_ret)
+        cmd_ret = gcode.clean_response(command, cmd_ret)
         self._handle_return(cmd_ret)
+        return cmd_ret
+
+    def _wait_for_idle(self):
         wait_ret = serial_communication.write_and_return(
             GCODES['WAIT'] + SMOOTHIE_COMMAND_TERMINATOR,
             SMOOTHIE_ACK, self._connection, timeout=12000,
             tag='smoothie')
-        wait_ret = self._remove_unwanted_characters(
-            GCODES['WAIT'], wait_ret)
+        wait_ret = gcode.clean_response(GCODES['WAIT'], wait_ret)
         self._handle_return(wait_ret)
-        return cmd_ret.strip()
 
     def _handle_return(self, ret_code: str):
         """ Check the return string from smoothie for an error condition.
@@ -981,29 +1066,6 @@ class SmoothieDriver_3_0_0:
             if is_alarm or is_error:
                 raise SmoothieError(ret_code)
 
-    def _remove_unwanted_characters(self, command, response):
-        # smoothieware can enter a weird state, where it repeats back
-        # the sent command at the beginning of its response.
-        # Check for this echo, and strips the command from the response
-        remove_from_response = [
-            c.strip() for c in command.strip().split(' ') if c.strip()]
-
-        # also removing any inadvertant newline/return characters
-        # this is ok because all data we need from Smoothie is returned on
-        # the first line in the response
-        remove_from_response += ['\r', '\n']
-        modified_response = str(response)
-
-        for cmd in remove_from_response:
-            modified_response = modified_response.replace(cmd, '')
-
-        if modified_response != response:
-            log.debug('Removed characters from response: {}'.format(
-                response))
-            log.debug('Newly formatted response: {}'.format(modified_response))
-
-        return modified_response
-
     def _write_with_retries(self, cmd: str, timeout: float, retries: int):
         for attempt in range(retries):
             try:
@@ -1235,46 +1297,13 @@ class SmoothieDriver_3_0_0:
         '''
         self.run_flag.wait()
 
-        def valid_movement(coords, axis):
-            return not (
-                (axis in DISABLE_AXES) or
-                (coords is None) or
-                isclose(coords, self.position[axis])
-            )
-
-        def create_coords_list(coords_dict):
-            return [
-                axis + str(round(coords, GCODE_ROUNDING_PRECISION))
-                for axis, coords in sorted(coords_dict.items())
-                if valid_movement(coords, axis)
-            ]
-
-        backlash_target = target.copy()
-        backlash_target.update({
-            axis: value + PLUNGER_BACKLASH_MM
-            for axis, value in sorted(target.items())
-            if axis in 'BC' and self.position[axis] < value
-        })
-
-        target_coords = create_coords_list(target)
-        backlash_coords = create_coords_list(backlash_target)
-
-        if target_coords:
-            non_moving_axes = ''.join([
-                ax
-                for ax in AXES
-                if ax not in target.keys()
-            ])
-            self.dwell_axes(non_moving_axes)
-            self.activate_axes(target.keys())
+        move_command = self._move_coordinates(target)
+        if move_command:
+            self._activate_axes_for_move(target)
 
             # include the current-setting gcodes within the moving gcode string
             # to reduce latency, since we're setting current so much
-            command = self._generate_current_command()
-
-            if backlash_coords != target_coords:
-                command += ' ' + GCODES['MOVE'] + ''.join(backlash_coords)
-            command += ' ' + GCODES['MOVE'] + ''.join(target_coords)
+            command = self._generate_current_command() + ' ' + move_command
 
             try:
                 for axis in target.keys():
@@ -1295,6 +1324,128 @@ class SmoothieDriver_3_0_0:
 
             self._update_position(target)
 
+    def run_script(self, script: MotionScript):
+        '''
+        Run the moves, current changes and dwells of a `MotionScript`.
+
+        Each move is sent as a line of gcode as it would be by `move()`, but
+        without waiting (M400) for it to finish before sending the next one;
+        the script waits once, at the end. Since a current change could
+        otherwise take effect while an earlier move is still running, the
+        script also waits before any move that needs different currents
+        than the move before it. Plunger axes are set to their dwelling
+        current after they move, as in `move()`.
+        '''
+        self.run_flag.wait()
+        if not script.steps:
+            return
+        if script.home_flagged_axes:
+            self.home_flagged_axes(script.home_flagged_axes)
+        commands, final_position = self._script_commands(script)
+        log.debug("run_script: {}".format(commands))
+        self._send_commands(commands, timeout=DEFAULT_MOVEMENT_TIMEOUT)
+        self._update_position(final_position)
+
+    def _script_commands(self, script: MotionScript):
+        '''
+        The gcode for a script: a list of commands, each to be sent as a line,
+        in which GCODES['WAIT'] on its own means wait for motion to finish.
+        Also returns the position at the end of the script.
+
+        Current and engaged-axis settings are updated as the commands are
+        built, as `move()` would; the position is left as it was.
+        '''
+        start_position = self._position.copy()
+        commands: List[str] = []
+        sent_current = None
+        for step in script.steps:
+            if step[0] == motion_script.MOVE:
+                sent_current = self._script_move(
+                    commands, step[1], step[2], sent_current)
+            else:
+                self._script_setting(commands, step)
+        if sent_current is not None and self.current != sent_current:
+            commands.append(GCODES['WAIT'])
+            commands.append(self._generate_current_command())
+        final_position = self._position.copy()
+        self._position = start_position
+        return commands, final_position
+
+    def _script_move(self, commands, target, speed, sent_current):
+        '''
+        Add the line for a script's move to `commands`, preceded by a wait
+        and a current change if the move needs different currents than
+        `sent_current` (None if no currents have been sent yet). Returns the
+        currents sent.
+        '''
+        move_command = self._move_coordinates(target)
+        if not move_command:
+            return sent_current
+        self._activate_axes_for_move(target)
+        line = []
+        if self.current != sent_current:
+            if sent_current is not None:
+                commands.append(GCODES['WAIT'])
+            line.append(self._generate_current_command())
+            sent_current = self.current.copy()
+        if speed:
+            line.append(_speed_command(speed))
+        line.append(move_command)
+        if speed:
+            line.append(_speed_command(self._combined_speed))
+        commands.append(' '.join(line))
+        self.engaged_axes.update({axis: True for axis in target})
+        self._position.update(target)
+        plunger_axis_moved = ''.join(set('BC') & set(target.keys()))
+        if plunger_axis_moved:
+            self.dwell_axes(plunger_axis_moved)
+        return sent_current
+
+    def _script_setting(self, commands, step):
+        kind = step[0]
+        if kind == motion_script.SET_ACTIVE_CURRENT:
+            self.set_active_current(step[1])
+        elif kind == motion_script.PUSH_ACTIVE_CURRENT:
+            self.push_active_current()
+        elif kind == motion_script.POP_ACTIVE_CURRENT:
+            self.pop_active_current()
+        elif kind == motion_script.DWELL:
+            commands.append('{code}P{seconds}'.format(
+                code=GCODES['DWELL'], seconds=step[1]))
+
+    def _move_coordinates(self, target):
+        '''
+        The G0 commands to move to `target` (with plunger backlash
+        compensation), or an empty string if no axis would move
+        '''
+        position = self._position
+        target_coords = self._gcode.coordinates(
+            target, position, DISABLE_AXES)
+        if not target_coords:
+            return ''
+        command = self._gcode.move(target_coords)
+
+        backlash = {
+            axis: value + PLUNGER_BACKLASH_MM
+            for axis, value in target.items()
+            if axis in 'BC' and position[axis] < value
+        }
+        if backlash:
+            backlash_coords = self._gcode.coordinates(
+                dict(target, **backlash), position, DISABLE_AXES)
+            if backlash_coords != target_coords:
+                command = self._gcode.move(backlash_coords) + ' ' + command
+        return command
+
+    def _activate_axes_for_move(self, target):
+        non_moving_axes = ''.join([
+            ax
+            for ax in AXES
+            if ax not in target.keys()
+        ])
+        self.dwell_axes(non_moving_axes)
+        self.activate_axes(target.keys())
+
     def home(self, axis=AXES, disabled=DISABLE_AXES):
 
         self.run_flag.wait()
@@ -1361,7 +1512,7 @@ class SmoothieDriver_3_0_0:
             for ax in ''.join(home_sequence)
         }
         log.info(f'Home before update pos {homed}')
-        self.update_position(default=homed)
+        self._update_homed_axes_position(homed)
         for axis in ''.join(home_sequence):
             self.engaged_axes[axis] = True
 
@@ -1377,6 +1528,21 @@ class SmoothieDriver_3_0_0:
 
         return self.position
 
+    def _update_homed_axes_position(self, homed):
+        '''
+        Update the position of just-homed axes, only reading it back from the
+        smoothie if they haven't homed to a known position before
+        '''
+        if self._position_stale \
+                or not set(homed.keys()) <= self._verified_home_axes:
+            # where these axes home to hasn't been read back yet
+            self._position_stale = True
+            self.update_position(default=homed)
+            if not self.simulating:
+                self._verified_home_axes.update(homed.keys())
+        else:
+            self._update_position(homed)
+
     def fast_home(self, axis, safety_margin):
         ''' home after a controlled motor stall
 
@@ -1480,6 +1646,8 @@ class SmoothieDriver_3_0_0:
             log.debug("probe_axis: {}".format(command))
             self._send_command(
                 command=command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
+            # the probe stops wherever it touched
+            self._position_stale = True
             self.update_position(self.position)
             return self.position
         else:
@@ -1559,6 +1727,8 @@ class SmoothieDriver_3_0_0:
             sleep(0.25)
             self._wait_for_ack()
             self._reset_from_error()
+        # the smoothie may have rebooted with different homing positions
+        self._verified_home_axes.clear()
 
     def _smoothie_programming_mode(self):
         log.debug('Setting Smoothie to ISP mode (simulating: {})'.format(
@@ -1581,6 +1751,7 @@ class SmoothieDriver_3_0_0:
             pass
         else:
             self._is_hard_halting.set()
+            self._position_stale = True
             gpio.set_low(gpio.OUTPUT_PINS['HALT'])
             sleep(0.25)
             gpio.set_high(gpio.OUTPUT_PINS['HALT'])
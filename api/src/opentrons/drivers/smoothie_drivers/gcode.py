@@ -0,0 +1,109 @@
+""" opentrons.drivers.smoothie_drivers.gcode: building the commands sent to
+the smoothie for every move, and cleaning up its responses.
+
+Moves are sent often enough that formatting them shows up in profiles, so
+the coordinate templates are formatted once up front, and the current
+settings command (which prefixes most moves) is only rebuilt when the
+currents change.
+"""
+import functools
+import re
+from typing import Dict, Optional, Pattern
+
+#: The order axes appear in commands
+COMMAND_AXES = 'ABCXYZ'
+
+# numpy.isclose's default tolerances
+_RELATIVE_TOLERANCE = 1e-05
+_ABSOLUTE_TOLERANCE = 1e-08
+
+
+def isclose(a: float, b: float) -> bool:
+    ''' The same check as ``numpy.isclose(a, b)``, without the overhead of
+    making arrays of two scalars '''
+    return abs(a - b) <= _ABSOLUTE_TOLERANCE + _RELATIVE_TOLERANCE * abs(b)
+
+
+class GCodeBuilder:
+    '''
+    Formats move and current-setting commands for a smoothie driver
+
+    :param gcodes: The driver's gcode table (needs ``MOVE``, ``SET_CURRENT``
+                   and ``DWELL``)
+    :param precision: The number of decimal places coordinates are sent with
+    :param current_change_delay: The time (in seconds) to dwell after
+                                 changing currents
+    '''
+    def __init__(self,
+                 gcodes: Dict[str, str],
+                 precision: int,
+                 current_change_delay: float) -> None:
+        self._move = gcodes['MOVE']
+        self._set_current = gcodes['SET_CURRENT']
+        self._current_suffix = ' {}P{}'.format(
+            gcodes['DWELL'], current_change_delay)
+        self._coordinate_templates = {
+            ax: ax + '%.{}f'.format(precision) for ax in COMMAND_AXES}
+        self._current_command: Optional[str] = None
+
+    def coordinates(self,
+                    target: Dict[str, Optional[float]],
+                    position: Dict[str, float],
+                    skip_axes: str = '') -> str:
+        '''
+        The coordinates (e.g. ``'X10.5Y20'``) of the axes in `target` that
+        would move from `position`. Axes in `skip_axes`, axes with a
+        target of None and axes already at their target are left out.
+        '''
+        templates = self._coordinate_templates
+        coords = ''
+        for ax in COMMAND_AXES:
+            value = target.get(ax)
+            if value is None or ax in skip_axes \
+                    or isclose(value, position[ax]):
+                continue
+            # Trim trailing zeros like str(round(value)) would
+            coords += (templates[ax] % value).rstrip('0').rstrip('.')
+        return coords
+
+    def move(self, coordinates: str) -> str:
+        return self._move + coordinates
+
+    def current_command(self, currents: Dict[str, float]) -> str:
+        '''
+        The command setting every axis to `currents`, followed by a short
+        dwell for those settings to take effect. The command is reused until
+        :py:meth:`currents_changed` is called.
+        '''
+        if self._current_command is None:
+            self._current_command = self._set_current + ' ' + ' '.join(
+                '{}{}'.format(axis, value)
+                for axis, value in sorted(currents.items())
+            ) + self._current_suffix
+        return self._current_command
+
+    def currents_changed(self):
+        self._current_command = None
+
+
+@functools.lru_cache(maxsize=64)
+def _echo_pattern(command: str) -> Pattern:
+    # Longest first, so an echoed token is never left half-removed by a
+    # shorter token that it contains
+    tokens = sorted(set(command.split()), key=len, reverse=True)
+    return re.compile('|'.join([re.escape(t) for t in tokens] + ['\r', '\n']))
+
+
+def clean_response(command: str, response: str) -> str:
+    '''
+    Remove any echo of `command` and any line breaks from `response` in one
+    pass.
+
+    Smoothieware can enter a weird state where it repeats back the sent
+    command at the beginning of its response. Removing line breaks is fine
+    because all the data we need from the smoothie is returned on the first
+    line of its response.
+    '''
+    if not response:
+        return response
+    return _echo_pattern(command).sub('', response)
@@ -0,0 +1,71 @@
+"""
+A list of moves, current changes and dwells to be run by the smoothie driver
+as one batch of gcode, waiting for the motion to finish only at the end
+rather than after every command.
+"""
+from typing import Dict, List, Optional, Tuple, Any
+
+MOVE = 'move'
+SET_ACTIVE_CURRENT = 'set active current'
+PUSH_ACTIVE_CURRENT = 'push active current'
+POP_ACTIVE_CURRENT = 'pop active current'
+DWELL = 'dwell'
+
+AXES = 'XYZABC'
+
+
+class MotionScript:
+    """ Builds up the steps of a script. Coordinates and currents are in
+    smoothie terms: dicts keyed by axis letter ('X', 'Y', 'Z', 'A', 'B', 'C').
+    """
+    def __init__(self) -> None:
+        self.steps: List[Tuple[Any, ...]] = []
+        self._home_flagged_axes = ''
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def move(self,
+             target: Dict[str, float],
+             speed: Optional[float] = None,
+             home_flagged_axes: bool = False) -> 'MotionScript':
+        """ Move to ``target``, at ``speed`` (mm/sec) if specified.
+
+        :param home_flagged_axes: Whether the axes of this move should be
+                                  homed before the script runs if the
+                                  smoothie reports that they need it
+        """
+        self.steps.append((MOVE, dict(target), speed))
+        if home_flagged_axes:
+            self._home_flagged_axes = ''.join(
+                ax for ax in AXES
+                if ax in target or ax in self._home_flagged_axes)
+        return self
+
+    def set_active_current(self, settings: Dict[str, float]) -> 'MotionScript':
+        """ Change the current of axes for the moves after this one """
+        self.steps.append((SET_ACTIVE_CURRENT, dict(settings)))
+        return self
+
+    def push_active_current(self) -> 'MotionScript':
+        self.steps.append((PUSH_ACTIVE_CURRENT,))
+        return self
+
+    def pop_active_current(self) -> 'MotionScript':
+        self.steps.append((POP_ACTIVE_CURRENT,))
+        return self
+
+    def dwell(self, seconds: float) -> 'MotionScript':
+        """ Wait ``seconds`` after the moves before this one finish """
+        self.steps.append((DWELL, seconds))
+        return self
+
+    @property
+    def home_flagged_axes(self) -> str:
+        """ The axes to home before running, if they need it """
+        return self._home_flagged_axes
+
+    @property
+    def targets(self) -> List[Dict[str, float]]:
+        """ The targets of each move, in order """
+        return [step[1] for step in self.steps if step[0] == MOVE]
@@ -119,6 +119,16 @@ class TempDeck:
                 return str(e)
         return ''
 
+    def poll_temperature(self) -> str:
+        """ Query the temperature in the calling thread (unlike
+        :py:meth:`update_temperature`, which starts a thread to do it).
+        """
+        try:
+            self._recursive_update_temperature(DEFAULT_COMMAND_RETRIES)
+        except (TempDeckError, SerialException, SerialNoResponse) as e:
+            return str(e)
+        return ''
+
     @property
     def target(self) -> int:
         return self._temperature.get('target')
@@ -16,9 +16,11 @@ import contextlib
 import functools
 import inspect
 import logging
-from typing import Any, Dict, Union, List, Optional, Tuple
+from typing import Any, Dict, Union, List, Optional, Sequence, Tuple
+import numpy as np  # type: ignore
 from opentrons import types as top_types
 from opentrons.util import linal
+from opentrons.drivers.smoothie_drivers.motion_script import MotionScript
 from .simulator import Simulator
 from opentrons.config import robot_configs, pipette_config
 from .pipette import Pipette
@@ -104,6 +106,9 @@ class API(HardwareAPILike):
         }
         self._attached_modules: Dict[str, Any] = {}
         self._last_moved_mount: Optional[top_types.Mount] = None
+        # The z position each mount was left at by its last home or retract,
+        # so a mount that has not moved since then is not retracted again
+        self._retracted_z: Dict[top_types.Mount, float] = {}
         # The motion lock synchronizes calls to long-running physical tasks
         # involved in motion. This fixes issue where for instance a move()
         # or home() call is in flight and something else calls
@@ -511,6 +516,9 @@ class API(HardwareAPILike):
             if smoothie_plungers:
                 smoothie_pos.update(self._backend.home(smoothie_plungers))
             self._current_position = self._deck_from_smoothie(smoothie_pos)
+            for mount in top_types.Mount:
+                if Axis.by_mount(mount) in gantry:
+                    self._note_retracted(mount)
 
     async def add_tip(
             self,
@@ -722,27 +730,100 @@ class API(HardwareAPILike):
 
         If `mount` does not match the value in :py:attr:`_last_moved_mount`
         (and :py:attr:`_last_moved_mount` exists) then retract the mount
-        in :py:attr:`_last_moved_mount`. Also unconditionally update
+        in :py:attr:`_last_moved_mount`, unless it has not moved since it was
+        last homed or retracted. Also unconditionally update
         :py:attr:`_last_moved_mount` to contain `mount`.
         """
-        if mount != self._last_moved_mount and self._last_moved_mount:
-            await self.retract(self._last_moved_mount, 10)
+        last = self._last_moved_mount
+        if mount != last and last and not self._is_retracted(last):
+            await self.retract(last, 10)
         self._last_moved_mount = mount
 
+    def _note_retracted(self, mount: top_types.Mount):
+        z = self._current_position.get(Axis.by_mount(mount))
+        if z is None:
+            self._retracted_z.pop(mount, None)
+        else:
+            self._retracted_z[mount] = z
+
+    def _is_retracted(self, mount: top_types.Mount) -> bool:
+        """ Whether `mount` is still where its last home or retract left it
+        (any move, probe or failure since then changes or clears its known
+        position) """
+        z = self._current_position.get(Axis.by_mount(mount))
+        retracted_z = self._retracted_z.get(mount)
+        return z is not None and retracted_z is not None and z >= retracted_z
+
     async def _move_plunger(self, mount: top_types.Mount, dist: float,
                             speed: float = None):
+        script, position = MotionScript(), dict(self._current_position)
+        self._script_move_plunger(script, position, mount, dist, speed)
+        await self._run_script(script, position)
+
+    def _script_move_plunger(self, script: MotionScript,
+                             position: Dict[Axis, float],
+                             mount: top_types.Mount, dist: float,
+                             speed: float = None):
+        """ Add a plunger move to ``script``, which will run starting from
+        (and update) the deck position ``position``
+        """
         z_axis = Axis.by_mount(mount)
         pl_axis = Axis.of_plunger(mount)
         all_axes_pos = OrderedDict(
-            ((Axis.X,
-              self._current_position[Axis.X]),
-             (Axis.Y,
-              self._current_position[Axis.Y]),
-             (z_axis,
-              self._current_position[z_axis]),
+            ((Axis.X, position[Axis.X]),
+             (Axis.Y, position[Axis.Y]),
+             (z_axis, position[z_axis]),
              (pl_axis, dist))
         )
-        await self._move(all_axes_pos, speed, False)
+        script.move(self._smoothie_target(all_axes_pos), speed)
+        position.update(all_axes_pos)
+
+    def _script_move_rel(self, script: MotionScript,
+                         position: Dict[Axis, float],
+                         mount: top_types.Mount, delta: top_types.Point,
+                         speed: float = None):
+        """ Add a move like :py:meth:`move_rel` to ``script``, which will run
+        starting from (and update) the deck position ``position``
+        """
+        z_axis = Axis.by_mount(mount)
+        target_position = OrderedDict(
+            ((Axis.X, position[Axis.X] + delta.x),
+             (Axis.Y, position[Axis.Y] + delta.y),
+             (z_axis, position[z_axis] + delta.z))
+        )
+        script.move(self._smoothie_target(target_position), speed,
+                    home_flagged_axes=True)
+        position.update(target_position)
+
+    async def _start_script(self, mount: top_types.Mount)\
+            -> Tuple[MotionScript, Dict[Axis, float]]:
+        """ Get ready to build a script of moves of ``mount``, homing and
+        retracting the other mount first if needed (as :py:meth:`move_rel`
+        does). Returns the empty script and the position it starts from.
+        """
+        if not self._current_position:
+            await self.home()
+        await self._cache_and_maybe_retract_mount(mount)
+        return MotionScript(), dict(self._current_position)
+
+    async def _run_script(self, script: MotionScript,
+                          final_position: Dict[Axis, float]):
+        """ Run a script built by the ``_script_`` methods, which will leave
+        the gantry at the deck position ``final_position``.
+
+        The whole script is sent to the backend at once, and only waits for
+        motion to finish at the end, so this is much faster than making its
+        moves one at a time.
+        """
+        async with self._motion_lock:
+            try:
+                self._backend.run_motion_script(script)
+            except Exception:
+                self._log.exception('Motion script failed')
+                self._current_position.clear()
+                raise
+            else:
+                self._current_position.update(final_position)
 
     async def _move(self, target_position: 'OrderedDict[Axis, float]',
                     speed: float = None, home_flagged_axes: bool = True):
@@ -757,6 +838,24 @@ class API(HardwareAPILike):
         at most one of a ZA or BC components. The frame in which to move
         is identified by the presence of (ZA) or (BC).
         """
+        smoothie_pos = self._smoothie_target(target_position)
+        async with self._motion_lock:
+            try:
+                self._backend.move(smoothie_pos, speed=speed,
+                                   home_flagged_axes=home_flagged_axes)
+            except Exception:
+                self._log.exception('Move failed')
+                self._current_position.clear()
+                raise
+            else:
+                self._current_position.update(target_position)
+
+    def _smoothie_target(self, target_position: 'OrderedDict[Axis, float]')\
+            -> Dict[str, float]:
+        """ Transform a target for :py:meth:`_move` into smoothie coordinates
+        by applying the deck calibration, warning about any axis that would
+        be out of bounds.
+        """
         # Transform only the x, y, and (z or a) axes specified since this could
         # get the b or c axes as well
         to_transform = tuple((tp
@@ -807,16 +906,7 @@ class API(HardwareAPILike):
                                 smoothie_pos[ax.name],
                                 deck_mins[ax], deck_max[ax],
                                 bounds[ax.name][0], bounds[ax.name][1]))
-        async with self._motion_lock:
-            try:
-                self._backend.move(smoothie_pos, speed=speed,
-                                   home_flagged_axes=home_flagged_axes)
-            except Exception:
-                self._log.exception('Move failed')
-                self._current_position.clear()
-                raise
-            else:
-                self._current_position.update(target_position)
+        return smoothie_pos
 
     async def get_engaged_axes(self) -> Dict[Axis, bool]:
         """ Which axes are engaged and holding. """
@@ -838,6 +928,7 @@ class API(HardwareAPILike):
         async with self._motion_lock:
             smoothie_pos = self._backend.fast_home(smoothie_ax, margin)
             self._current_position = self._deck_from_smoothie(smoothie_pos)
+            self._note_retracted(mount)
 
     def _critical_point_for(
             self, mount: top_types.Mount,
@@ -1046,6 +1137,15 @@ class API(HardwareAPILike):
         position = mm + instr.config.bottom
         return round(position, 6)
 
+    def _plunger_positions(self, instr: Pipette, ul: Sequence[float],
+                           action: str) -> np.ndarray:
+        """ Vectorized :py:meth:`_plunger_position`, for precomputing the
+        plunger targets of a whole series of volumes at once.
+        """
+        volumes = np.asarray(ul, dtype=float)
+        mm = volumes / instr.ul_per_mm_array(volumes, action)
+        return np.round(mm + instr.config.bottom, 6)
+
     def _plunger_speed(
             self, instr: Pipette, ul_per_s: float, action: str) -> float:
         mm_per_s = ul_per_s / instr.ul_per_mm(instr.config.max_volume, action)
@@ -1099,11 +1199,12 @@ class API(HardwareAPILike):
         instr_ax = Axis.by_mount(mount)
         plunger_ax = Axis.of_plunger(mount)
         self._log.info('Picking up tip on {}'.format(instr.name))
+        script, position = await self._start_script(mount)
         # Initialize plunger to bottom position
-        self._backend.set_active_current(plunger_ax,
-                                         instr.config.plunger_current)
-        await self._move_plunger(
-            mount, instr.config.bottom)
+        script.set_active_current(
+            {plunger_ax.name: instr.config.plunger_current})
+        self._script_move_plunger(
+            script, position, mount, instr.config.bottom)
 
         if not presses or presses < 0:
             checked_presses = instr.config.pick_up_presses
@@ -1119,26 +1220,29 @@ class API(HardwareAPILike):
         # moving further by <increment> mm after each press
         for i in range(checked_presses):
             # move nozzle down into the tip
-            with self._backend.save_current():
-                self._backend.set_active_current(instr_ax,
-                                                 instr.config.pick_up_current)
-                dist = -1.0 * instr.config.pick_up_distance\
-                    + -1.0 * checked_increment * i
-                target_pos = top_types.Point(0, 0, dist)
-                await self.move_rel(
-                    mount, target_pos, instr.config.pick_up_speed)
+            script.push_active_current()
+            script.set_active_current(
+                {instr_ax.name: instr.config.pick_up_current})
+            dist = -1.0 * instr.config.pick_up_distance\
+                + -1.0 * checked_increment * i
+            self._script_move_rel(
+                script, position, mount, top_types.Point(0, 0, dist),
+                instr.config.pick_up_speed)
+            script.pop_active_current()
             # move nozzle back up
-            backup_pos = top_types.Point(0, 0, -dist)
-            await self.move_rel(mount, backup_pos)
-        instr.add_tip(tip_length=tip_length)
-        instr.set_current_volume(0)
+            self._script_move_rel(
+                script, position, mount, top_types.Point(0, 0, -dist))
 
         # neighboring tips tend to get stuck in the space between
         # the volume chamber and the drop-tip sleeve on p1000.
         # This extra shake ensures those tips are removed
         if 'pickupTipShake' in instr.config.quirks:
-            await self._shake_off_tips_pick_up(mount)
-            await self._shake_off_tips_pick_up(mount)
+            self._script_shake_off_tips_pick_up(script, position, mount)
+            self._script_shake_off_tips_pick_up(script, position, mount)
+
+        await self._run_script(script, position)
+        instr.add_tip(tip_length=tip_length)
+        instr.set_current_volume(0)
 
         await self.retract(mount, instr.config.pick_up_distance)
 
@@ -1178,13 +1282,16 @@ class API(HardwareAPILike):
         bottom = instr.config.bottom
 
         async def _drop_tip():
-            self._backend.set_active_current(plunger_ax,
-                                             instr.config.plunger_current)
-            await self._move_plunger(mount, bottom)
-            self._backend.set_active_current(plunger_ax,
-                                             instr.config.drop_tip_current)
-            await self._move_plunger(
-                mount, droptip, speed=instr.config.drop_tip_speed)
+            script, position = MotionScript(), dict(self._current_position)
+            script.set_active_current(
+                {plunger_ax.name: instr.config.plunger_current})
+            self._script_move_plunger(script, position, mount, bottom)
+            script.set_active_current(
+                {plunger_ax.name: instr.config.drop_tip_current})
+            self._script_move_plunger(
+                script, position, mount, droptip,
+                speed=instr.config.drop_tip_speed)
+            await self._run_script(script, position)
             if home_after:
                 safety_margin = abs(bottom-droptip)
                 async with self._motion_lock:
@@ -1216,38 +1323,44 @@ class API(HardwareAPILike):
             shake_off_dist = min(shake_off_dist, tiprack_diameter / 4)
         shake_off_dist = max(shake_off_dist, 1.0)
 
-        shake_pos = top_types.Point(-shake_off_dist, 0, 0)  # move left
-        await self.move_rel(mount, shake_pos, speed=SHAKE_OFF_TIPS_SPEED)
-        shake_pos = top_types.Point(2*shake_off_dist, 0, 0)    # move right
-        await self.move_rel(mount, shake_pos, speed=SHAKE_OFF_TIPS_SPEED)
-        shake_pos = top_types.Point(-shake_off_dist, 0, 0)  # original position
-        await self.move_rel(mount, shake_pos, speed=SHAKE_OFF_TIPS_SPEED)
+        script, position = await self._start_script(mount)
+        self._script_shake(script, position, mount, [
+            top_types.Point(-shake_off_dist, 0, 0),  # move left
+            top_types.Point(2*shake_off_dist, 0, 0),  # move right
+            top_types.Point(-shake_off_dist, 0, 0)])  # original position
         # raise the pipette upwards so we are sure tip has fallen off
-        up_pos = top_types.Point(0, 0, DROP_TIP_RELEASE_DISTANCE)
-        await self.move_rel(mount, up_pos)
+        self._script_move_rel(
+            script, position, mount,
+            top_types.Point(0, 0, DROP_TIP_RELEASE_DISTANCE))
+        await self._run_script(script, position)
 
     async def _shake_off_tips_pick_up(self, mount):
+        script, position = await self._start_script(mount)
+        self._script_shake_off_tips_pick_up(script, position, mount)
+        await self._run_script(script, position)
+
+    def _script_shake_off_tips_pick_up(self, script, position, mount):
         # tips don't always fall off, especially if resting against
         # tiprack or other tips below it. To ensure the tip has fallen
         # first, shake the pipette to dislodge partially-sealed tips,
         # then second, raise the pipette so loosened tips have room to fall
         shake_off_dist = SHAKE_OFF_TIPS_PICKUP_DISTANCE
-
-        shake_pos = top_types.Point(-shake_off_dist, 0, 0)  # move left
-        await self.move_rel(mount, shake_pos, speed=SHAKE_OFF_TIPS_SPEED)
-        shake_pos = top_types.Point(2*shake_off_dist, 0, 0)    # move right
-        await self.move_rel(mount, shake_pos, speed=SHAKE_OFF_TIPS_SPEED)
-        shake_pos = top_types.Point(-shake_off_dist, 0, 0)  # original position
-        await self.move_rel(mount, shake_pos, speed=SHAKE_OFF_TIPS_SPEED)
-        shake_pos = top_types.Point(0, -shake_off_dist, 0)  # move front
-        await self.move_rel(mount, shake_pos, speed=SHAKE_OFF_TIPS_SPEED)
-        shake_pos = top_types.Point(0, 2*shake_off_dist, 0)    # move back
-        await self.move_rel(mount, shake_pos, speed=SHAKE_OFF_TIPS_SPEED)
-        shake_pos = top_types.Point(0, -shake_off_dist, 0)  # original position
-        await self.move_rel(mount, shake_pos, speed=SHAKE_OFF_TIPS_SPEED)
+        self._script_shake(script, position, mount, [
+            top_types.Point(-shake_off_dist, 0, 0),  # move left
+            top_types.Point(2*shake_off_dist, 0, 0),  # move right
+            top_types.Point(-shake_off_dist, 0, 0),  # original position
+            top_types.Point(0, -shake_off_dist, 0),  # move front
+            top_types.Point(0, 2*shake_off_dist, 0),  # move back
+            top_types.Point(0, -shake_off_dist, 0)])  # original position
         # raise the pipette upwards so we are sure tip has fallen off
-        up_pos = top_types.Point(0, 0, DROP_TIP_RELEASE_DISTANCE)
-        await self.move_rel(mount, up_pos)
+        self._script_move_rel(
+            script, position, mount,
+            top_types.Point(0, 0, DROP_TIP_RELEASE_DISTANCE))
+
+    def _script_shake(self, script, position, mount, shakes):
+        for shake_pos in shakes:
+            self._script_move_rel(
+                script, position, mount, shake_pos, speed=SHAKE_OFF_TIPS_SPEED)
 
     # Pipette config api
     @_log_call
@@ -1330,7 +1443,7 @@ class API(HardwareAPILike):
         new = these - known
         gone = known - these
         for mod in gone:
-            self._attached_modules.pop(mod)
+            await self._attached_modules.pop(mod).cleanup()
             self._log.info(f"Module {mod} disconnected")
         for mod in new:
             self._attached_modules[mod]\
@@ -1344,23 +1457,40 @@ class API(HardwareAPILike):
     async def update_module(
             self, module: modules.AbstractModule,
             firmware_file: str,
-            loop: asyncio.AbstractEventLoop = None) -> Tuple[bool, str]:
+            loop: asyncio.AbstractEventLoop = None,
+            progress_callback: modules.update.ProgressCallback = None,
+            timeout: float = None) -> Tuple[bool, str]:
         """ Update a module's firmware.
 
         Returns (ok, message) where ok is True if the update succeeded and
         message is a human readable message.
+
+        :param progress_callback: If specified, called with the fraction
+                                  (0-1) of the upload that is done as it
+                                  progresses
+        :param timeout: If specified, the most seconds the upload itself may
+                        take. If it takes longer it is stopped, and modules
+                        are discovered again in case the module moved.
         """
         details = (module.port, module.name())
         mod = self._attached_modules.pop(details[0] + details[1])
         try:
             new_mod = await self._backend.update_module(
-                mod, firmware_file, loop)
+                mod, firmware_file, loop, progress_callback, timeout)
         except modules.UpdateError as e:
+            await mod.cleanup()
+            # Pick the module up again wherever it is now
+            await self.discover_modules()
             return False, e.msg
-        else:
-            new_details = new_mod.port + new_mod.device_info['model']
-            self._attached_modules[new_details] = new_mod
-            return True, 'firmware update successful'
+        except BaseException:
+            await mod.cleanup()
+            raise
+        if new_mod is not mod:
+            # Replaced by the updated module
+            await mod.cleanup()
+        new_details = new_mod.port + new_mod.device_info['model']
+        self._attached_modules[new_details] = new_mod
+        return True, 'firmware update successful'
 
     async def _do_tp(self, pip, mount) -> top_types.Point:
         """ Execute the work of tip probe.
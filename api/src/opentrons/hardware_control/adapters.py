@@ -1,6 +1,7 @@
 """ Adapters for the :py:class:`.hardware_control.API` instances.
 """
 import asyncio
+import concurrent.futures
 import copy
 import functools
 import threading
@@ -115,11 +116,37 @@ class SynchronousAdapter(HardwareAPILike, threading.Thread):
         fut = asyncio.run_coroutine_threadsafe(to_call(*args, **kwargs), loop)
         return fut.result()
 
+    def call_async(self, attr_name, *args, **kwargs) \
+            -> concurrent.futures.Future:
+        """ Start calling a method of the wrapped object without waiting
+        for it to finish.
+
+        Coroutine methods are scheduled on the adapter's event loop; other
+        methods are called right away. Either way, the returned future holds
+        the result (or the exception) once the call is done.
+        """
+        loop = object.__getattribute__(self, '_loop')
+        api = object.__getattribute__(self, '_api')
+        attr = getattr(api, attr_name)
+        try:
+            check = attr.__wrapped__
+        except AttributeError:
+            check = attr
+        if asyncio.iscoroutinefunction(check):
+            return asyncio.run_coroutine_threadsafe(
+                attr(*args, **kwargs), loop)
+        fut: concurrent.futures.Future = concurrent.futures.Future()
+        try:
+            fut.set_result(attr(*args, **kwargs))
+        except Exception as e:
+            fut.set_exception(e)
+        return fut
+
     def __getattribute__(self, attr_name):
         """ Retrieve attributes from our API and wrap coroutines """
         # Almost every attribute retrieved from us will be fore people actually
         # looking for an attribute of the hardware API, so check there first.
-        if attr_name == 'discover_modules':
+        if attr_name in ('discover_modules', 'call_async'):
             return object.__getattribute__(self, attr_name)
 
         api = object.__getattribute__(self, '_api')
@@ -4,6 +4,7 @@ import logging
 from typing import Any, Dict, List, Optional, Tuple
 
 from opentrons.drivers.smoothie_drivers import driver_3_0
+from opentrons.drivers.smoothie_drivers.motion_script import MotionScript
 from opentrons.drivers.rpi_drivers import gpio
 import opentrons.config
 from opentrons.types import Mount
@@ -38,6 +39,7 @@ class Controller:
         self._smoothie_driver = driver_3_0.SmoothieDriver_3_0_0(
             config=self.config, handle_locks=False)
         self._cached_fw_version: Optional[str] = None
+        self._module_registry = modules.ModuleRegistry(modules.match_port)
 
     def update_position(self) -> Dict[str, float]:
         self._smoothie_driver.update_position()
@@ -49,6 +51,9 @@ class Controller:
             self._smoothie_driver.move(
                 target_position, home_flagged_axes=home_flagged_axes)
 
+    def run_motion_script(self, script: MotionScript):
+        self._smoothie_driver.run_script(script)
+
     def home(self, axes: List[str] = None) -> Dict[str, float]:
         if axes:
             args: Tuple[Any, ...] = (''.join(axes),)
@@ -103,7 +108,7 @@ class Controller:
         self._smoothie_driver.set_speed(val)
 
     def get_attached_modules(self) -> List[Tuple[str, str]]:
-        return modules.discover()
+        return self._module_registry.attached()
 
     async def build_module(self,
                            port: str,
@@ -119,10 +124,11 @@ class Controller:
             self,
             module: modules.AbstractModule,
             firmware_file: str,
-            loop: Optional[asyncio.AbstractEventLoop])\
-            -> modules.AbstractModule:
+            loop: Optional[asyncio.AbstractEventLoop],
+            progress_callback: modules.update.ProgressCallback = None,
+            timeout: float = None) -> modules.AbstractModule:
         return await modules.update_firmware(
-            module, firmware_file, loop)
+            module, firmware_file, loop, progress_callback, timeout)
 
     async def connect(self, port: str = None):
         self._smoothie_driver.connect(port)
@@ -5,10 +5,15 @@ import re
 from typing import List, Optional, Tuple
 
 from opentrons.config import IS_ROBOT
-from .mod_abc import AbstractModule
+from .mod_abc import (AbstractModule,  # noqa(W0611)
+                      MODULE_STATUS_CHANGED, MODULE_ADDED, MODULE_REMOVED,
+                      MODULE_UPDATE_PROGRESS, broker)
+from .registry import ModuleRegistry  # noqa(W0611)
+from .update_jobs import (UpdateManager, UpdateJob,  # noqa(W0611)
+                          UpdateInProgressError)
 # Must import tempdeck and magdeck (and other modules going forward) so they
 # actually create the subclasses
-from . import update, tempdeck, magdeck, thermocycler  # noqa(W0611)
+from . import registry, update, tempdeck, magdeck, thermocycler  # noqa(W0611)
 
 log = logging.getLogger(__name__)
 
@@ -28,6 +33,8 @@ class AbsentModuleError(Exception):
 MODULE_TYPES = {cls.name(): cls
                 for cls in AbstractModule.__subclasses__()}  # type: ignore
 
+_MODULE_PORT_REGEX = re.compile('|'.join(MODULE_TYPES.keys()), re.I)
+
 
 async def build(
         port: str,
@@ -38,27 +45,34 @@ async def build(
         port, interrupt_callback=interrupt_callback, simulating=simulating)
 
 
+def match_port(entry: str) -> Optional[Tuple[str, str]]:
+    """ Turn the name of an entry in ``/dev/modules`` into the absolute port
+    and name of the module it is for, or None if it is not a module
+    """
+    match = _MODULE_PORT_REGEX.search(entry)
+    if not match:
+        return None
+    name = match.group().lower()
+    if name not in MODULE_TYPES:
+        log.warning("Unexpected module connected: {} on {}"
+                    .format(name, entry))
+        return None
+    return os.path.join(registry.MODULES_DIR, entry), name
+
+
 def discover() -> List[Tuple[str, str]]:
-    """ Scan for connected modules and instantiate handler classes
+    """ Scan for connected modules by listing ``/dev/modules``.
+
+    This lists the directory every time; code that asks repeatedly should
+    keep a :py:class:`.registry.ModuleRegistry` instead.
     """
-    if IS_ROBOT and os.path.isdir('/dev/modules'):
-        devices = os.listdir('/dev/modules')
+    if IS_ROBOT and os.path.isdir(registry.MODULES_DIR):
+        devices = os.listdir(registry.MODULES_DIR)
     else:
         devices = []
 
-    discovered_modules = []
-
-    module_port_regex = re.compile('|'.join(MODULE_TYPES.keys()), re.I)
-    for port in devices:
-        match = module_port_regex.search(port)
-        if match:
-            name = match.group().lower()
-            if name not in MODULE_TYPES:
-                log.warning("Unexpected module connected: {} on {}"
-                            .format(name, port))
-                continue
-            absolute_port = '/dev/modules/{}'.format(port)
-            discovered_modules.append((absolute_port, name))
+    discovered_modules = [address for address in map(match_port, devices)
+                          if address]
     log.debug('Discovered modules: {}'.format(discovered_modules))
 
     return discovered_modules
@@ -72,26 +86,42 @@ class UpdateError(RuntimeError):
 async def update_firmware(
         module: AbstractModule,
         firmware_file: str,
-        loop: Optional[asyncio.AbstractEventLoop]) -> AbstractModule:
+        loop: Optional[asyncio.AbstractEventLoop],
+        progress_callback: update.ProgressCallback = None,
+        timeout: float = None) -> AbstractModule:
     """ Update a module.
 
+    Several modules may be updated at once: only the switches into and out of
+    their bootloaders are done one at a time.
+
     If the update succeeds, an Module instance will be returned.
 
     Otherwise, raises an UpdateError with the reason for the failure.
+
+    :param progress_callback: If specified, called with the fraction of the
+                              upload that is done as it progresses
+    :param timeout: If specified, the most seconds the upload itself may take
     """
     simulating = module.is_simulated
     cls = type(module)
     old_port = module.port
-    flash_port = await module.prep_for_update()
+    async with update.port_switch_lock(loop):
+        flash_port = await module.prep_for_update()
     callback = module.interrupt_callback
     del module
-    after_port, results = await update.update_firmware(flash_port,
-                                                       firmware_file,
-                                                       loop)
-    await asyncio.sleep(1.0)
+    try:
+        after_port, results = await update.update_firmware(
+            flash_port, firmware_file, loop,
+            progress_callback=progress_callback, name=cls.name(),
+            timeout=timeout)
+    except asyncio.TimeoutError:
+        raise UpdateError('AVRDUDE not responding')
     new_port = after_port or old_port
     if not results[0]:
         raise UpdateError(results[1])
+    if not simulating:
+        # Wait for the module to come back from its bootloader
+        await update.wait_for_port(new_port)
     return await cls.build(
         port=new_port,
         interrupt_callback=callback,
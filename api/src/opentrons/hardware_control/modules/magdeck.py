@@ -1,7 +1,7 @@
 import asyncio
-from typing import Union
+from typing import Optional, Union
 from opentrons.drivers.mag_deck import MagDeck as MagDeckDriver
-from . import update, mod_abc
+from . import update, mod_abc, supervisor
 
 LABWARE_ENGAGE_HEIGHT = {'biorad-hardshell-96-PCR': 18}    # mm
 MAX_ENGAGE_HEIGHT = 45  # mm from home position
@@ -90,14 +90,27 @@ class MagDeck(mod_abc.AbstractModule):
             self._loop = loop
 
         self._device_info = None
+        self._supervised: Optional[supervisor.SupervisedPort] = None
+
+    def _call(self, func, *args):
+        """ Run a driver command, serialized with anything else using the
+        port
+        """
+        if not self._supervised:
+            return func(*args)
+        return self._supervised.run_sync(func, *args)
+
+    def _status_updated(self):
+        supervisor.call_in_loop(self._loop, self._publish_live_data)
 
     def calibrate(self):
         """
         Calibration involves probing for top plate to get the plate height
         """
-        self._driver.probe_plate()
+        self._call(self._driver.probe_plate)
         # return if successful or not?
         self._engaged = False
+        self._status_updated()
 
     def engage(self, height):
         """
@@ -106,15 +119,17 @@ class MagDeck(mod_abc.AbstractModule):
         if height > MAX_ENGAGE_HEIGHT or height < 0:
             raise ValueError('Invalid engage height. Should be 0 to {}'.format(
                 MAX_ENGAGE_HEIGHT))
-        self._driver.move(height)
+        self._call(self._driver.move, height)
         self._engaged = True
+        self._status_updated()
 
     def deactivate(self):
         """
         Home the magnet
         """
-        self._driver.home()
+        self._call(self._driver.home)
         self._engaged = False
+        self._status_updated()
 
     @property
     def device_info(self):
@@ -164,18 +179,21 @@ class MagDeck(mod_abc.AbstractModule):
         """
         self._driver.connect(self._port)
         self._device_info = self._driver.get_device_info()
+        if not self.is_simulated:
+            self._supervised = supervisor.get_supervisor(self._loop).register(
+                self._port)
 
-    def _disconnect(self):
-        """
-        Disconnect from the serial port
-        """
-        if self._driver:
-            self._driver.disconnect()
+    async def _stop_supervision(self):
+        if self._supervised:
+            await self._supervised.aclose()
+            self._supervised = None
 
-    def __del__(self):
-        self._disconnect()
+    async def cleanup(self):
+        await self._stop_supervision()
+        self._driver.disconnect()
 
     async def prep_for_update(self) -> str:
+        await self._stop_supervision()
         new_port = await update.enter_bootloader(self._driver,
                                                  self.device_info['model'])
         return new_port or self.port
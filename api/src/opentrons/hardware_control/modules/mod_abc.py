@@ -1,12 +1,57 @@
 import abc
-from typing import Dict, Callable
+import numbers
+from typing import Any, Dict, Callable, Optional
+
+from opentrons.broker import Broker
 
 InterruptCallback = Callable[[str], None]
 
+#: The topic of the messages published when a module's live data changes
+MODULE_STATUS_CHANGED = 'module status changed'
+#: The topic of the messages published when a module is plugged in
+MODULE_ADDED = 'module added'
+#: The topic of the messages published when a module is unplugged
+MODULE_REMOVED = 'module removed'
+#: The topic of the messages published as module firmware updates progress
+MODULE_UPDATE_PROGRESS = 'module update progress'
+#: Numeric live data (temperatures, hold times) must change by more than this
+#: for the change to be published
+STATUS_DEADBAND = 0.1
+
+#: Where modules publish their events
+broker = Broker()
+
+
+def live_data_changed(previous: Optional[Dict[str, Any]],
+                      current: Dict[str, Any],
+                      deadband: float = STATUS_DEADBAND) -> bool:
+    """ Whether two samples of a module's live data differ, ignoring numeric
+    changes no bigger than ``deadband``
+    """
+    if previous is None or previous.keys() != current.keys():
+        return True
+    for key, value in current.items():
+        old = previous[key]
+        if isinstance(value, dict) and isinstance(old, dict):
+            if live_data_changed(old, value, deadband):
+                return True
+        elif isinstance(value, numbers.Real)\
+                and not isinstance(value, bool)\
+                and isinstance(old, numbers.Real)\
+                and not isinstance(old, bool):
+            if abs(value - old) > deadband:
+                return True
+        elif value != old:
+            return True
+    return False
+
 
 class AbstractModule(abc.ABC):
     """ Defines the common methods of a module. """
 
+    #: The live data last published by :py:meth:`_publish_live_data`
+    _published_live_data: Optional[Dict[str, Any]] = None
+
     @classmethod
     @abc.abstractmethod
     async def build(cls,
@@ -68,6 +113,15 @@ class AbstractModule(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    async def cleanup(self):
+        """ Stop supervising the module's port and disconnect from it.
+
+        Called when the module is unplugged or replaced by an update; the
+        instance should not be used afterwards.
+        """
+        pass
+
     @property
     @abc.abstractmethod
     def interrupt_callback(self) -> InterruptCallback:
@@ -84,3 +138,17 @@ class AbstractModule(abc.ABC):
     def display_name(cls) -> str:
         """ A user-facing name for this kind of module. """
         pass
+
+    def _publish_live_data(self):
+        """ Publish :py:attr:`live_data` to :py:data:`broker` if it has
+        changed since it was last published. Must be called in the event loop.
+        """
+        live_data = self.live_data
+        if not live_data_changed(self._published_live_data, live_data):
+            return
+        self._published_live_data = live_data
+        broker.publish(MODULE_STATUS_CHANGED, {
+            'name': self.name(),
+            'port': self.port,
+            'serial': (self.device_info or {}).get('serial'),
+            **live_data})
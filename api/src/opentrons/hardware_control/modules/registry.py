@@ -0,0 +1,275 @@
+""" opentrons.hardware_control.modules.registry: keeps track of the attached
+modules from filesystem events rather than by listing ``/dev/modules``.
+
+Our udev rules (see :py:mod:`opentrons.system.udev`) make a symlink in
+``/dev/modules`` for each module when it is plugged in, and remove it when it
+is unplugged. The :py:class:`ModuleRegistry` lists that directory once and
+then follows those changes with an event source (inotify where available),
+publishing a message to :py:data:`.mod_abc.broker` for each module added or
+removed. Reading the attached modules is then just a copy of a dict.
+"""
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .mod_abc import broker, MODULE_ADDED, MODULE_REMOVED
+
+MODULE_LOG = logging.getLogger(__name__)
+
+#: Where udev puts the symlinks for attached modules
+MODULES_DIR = '/dev/modules'
+
+#: A (port, module name) pair
+ModuleAddress = Tuple[str, str]
+#: Called with the name of an entry added to or removed from a directory
+EntryCallback = Callable[[str], None]
+
+# From linux/inotify.h
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_IGNORED = 0x8000
+_IN_WATCH_MASK = _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError, TypeError):
+        return None
+    return libc
+
+
+_libc = _load_libc()
+
+
+class InotifyEventSource:
+    """ Reports entries added to and removed from a directory, using inotify
+    and the event loop's reader callbacks
+    """
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._fd: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def available() -> bool:
+        return _libc is not None
+
+    def start(self,
+              loop: asyncio.AbstractEventLoop,
+              on_added: EntryCallback,
+              on_removed: EntryCallback,
+              on_lost: Callable[[], None]):
+        """ Start watching.
+
+        :param on_lost: Called if the directory goes away, after which
+                        nothing more is reported
+        :raises OSError: If the directory cannot be watched
+        """
+        if not _libc:
+            raise OSError('inotify is not available')
+        fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if _libc.inotify_add_watch(
+                fd, os.fsencode(self._path), _IN_WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, f'Could not watch {self._path}')
+        self._fd = fd
+        self._loop = loop
+        loop.add_reader(fd, self._read, on_added, on_removed, on_lost)
+
+    def stop(self):
+        if self._fd is None:
+            return
+        if self._loop:
+            self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+        self._fd = None
+
+    def _read(self, on_added, on_removed, on_lost):
+        try:
+            data = os.read(self._fd, 4096)  # type: ignore
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            _, mask, _, name_len = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = os.fsdecode(
+                data[offset:offset + name_len].rstrip(b'\0'))
+            offset += name_len
+            if mask & (_IN_CREATE | _IN_MOVED_TO):
+                on_added(name)
+            elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                on_removed(name)
+            elif mask & _IN_IGNORED:
+                # The directory itself was removed
+                self.stop()
+                on_lost()
+                return
+
+
+class ScanningEventSource:
+    """ Reports entries added to and removed from a directory by listing it
+    again whenever :py:meth:`rescan` is called (and, if an interval is given,
+    periodically). For platforms without inotify, and for tests.
+    """
+    def __init__(self, path: str, interval: float = None) -> None:
+        self._path = path
+        self._interval = interval
+        self._entries: List[str] = []
+        self._callbacks: Optional[Tuple[EntryCallback, EntryCallback,
+                                        Callable[[], None]]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.Handle] = None
+
+    @staticmethod
+    def available() -> bool:
+        return True
+
+    def start(self,
+              loop: asyncio.AbstractEventLoop,
+              on_added: EntryCallback,
+              on_removed: EntryCallback,
+              on_lost: Callable[[], None]):
+        self._entries = os.listdir(self._path)
+        self._loop = loop
+        self._callbacks = (on_added, on_removed, on_lost)
+        self._schedule()
+
+    def stop(self):
+        self._callbacks = None
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def rescan(self):
+        """ List the directory, and report anything added or removed since
+        the last listing
+        """
+        if not self._callbacks:
+            return
+        on_added, on_removed, on_lost = self._callbacks
+        try:
+            entries = os.listdir(self._path)
+        except FileNotFoundError:
+            self.stop()
+            on_lost()
+            return
+        old = set(self._entries)
+        new = set(entries)
+        self._entries = entries
+        for name in sorted(old - new):
+            on_removed(name)
+        for name in sorted(new - old):
+            on_added(name)
+
+    def _schedule(self):
+        if self._interval and self._loop:
+            self._timer = self._loop.call_later(self._interval, self._tick)
+
+    def _tick(self):
+        self.rescan()
+        if self._callbacks:
+            self._schedule()
+
+
+class ModuleRegistry:
+    """ The set of attached modules, kept up to date from directory events
+
+    :param match: Turns the name of an entry in the modules directory into
+                  the address of a module, or None if it is not a module
+    :param path: The directory to watch
+    :param source: Where events come from. Defaults to an
+                   :py:class:`InotifyEventSource` if inotify is available, and
+                   otherwise a :py:class:`ScanningEventSource` that rescans
+                   the directory every time the attached modules are read.
+    """
+    def __init__(self,
+                 match: Callable[[str], Optional[ModuleAddress]],
+                 path: str = MODULES_DIR,
+                 source=None,
+                 loop: asyncio.AbstractEventLoop = None) -> None:
+        self._match = match
+        self._path = path
+        if source:
+            self._source = source
+            self._rescan_on_read = False
+        elif InotifyEventSource.available():
+            self._source = InotifyEventSource(path)
+            self._rescan_on_read = False
+        else:
+            self._source = ScanningEventSource(path)
+            self._rescan_on_read = True
+        self._loop = loop
+        self._watching = False
+        self._attached: Dict[str, ModuleAddress] = {}
+
+    @property
+    def watching(self) -> bool:
+        return self._watching
+
+    def start(self):
+        """ Start following the modules directory, if it exists. Must be
+        called from the event loop.
+        """
+        if self._watching or not os.path.isdir(self._path):
+            return
+        loop = self._loop or asyncio.get_event_loop()
+        # Start watching before listing so nothing is missed in between
+        try:
+            self._source.start(
+                loop, self._added, self._removed, self._lost)
+        except OSError:
+            MODULE_LOG.exception(f'Could not watch {self._path}')
+            return
+        self._watching = True
+        for entry in os.listdir(self._path):
+            self._added(entry)
+
+    def stop(self):
+        self._source.stop()
+        self._watching = False
+
+    def attached(self) -> List[ModuleAddress]:
+        """ The (port, name) of each attached module """
+        if not self._watching:
+            self.start()
+        elif self._rescan_on_read:
+            self._source.rescan()
+        return list(self._attached.values())
+
+    def _added(self, entry: str):
+        if entry in self._attached:
+            return
+        address = self._match(entry)
+        if not address:
+            return
+        self._attached[entry] = address
+        MODULE_LOG.info(f'Module {address[1]} added on {address[0]}')
+        broker.publish(
+            MODULE_ADDED, {'port': address[0], 'name': address[1]})
+
+    def _removed(self, entry: str):
+        address = self._attached.pop(entry, None)
+        if not address:
+            return
+        MODULE_LOG.info(f'Module {address[1]} removed from {address[0]}')
+        broker.publish(
+            MODULE_REMOVED, {'port': address[0], 'name': address[1]})
+
+    def _lost(self):
+        self._watching = False
+        for entry in list(self._attached.keys()):
+            self._removed(entry)
@@ -0,0 +1,438 @@
+""" opentrons.hardware_control.modules.supervisor: the single owner of module
+serial connections.
+
+Rather than each module running its own poller thread, every attached module
+registers its port with the :py:class:`ModuleSupervisor` for its event loop.
+The supervisor
+
+- schedules status polls for all modules from one task, each on its own
+  (adjustable) interval
+- queues the commands and polls for each port by priority, so a command
+  never waits behind more than the single poll that may already be in
+  flight
+- runs the blocking serial I/O on a small shared thread pool, holding a
+  per-port lock so that synchronous callers can safely share the port
+- watches ports that send unsolicited messages (like the thermocycler's lid
+  interrupt) with the event loop's reader callbacks instead of threads, and
+  queues the reading of those messages ahead of everything else.
+
+Modules use a :py:class:`StatusWaiter`, notified after every poll and
+command, to wait for their status to change without polling it themselves.
+"""
+import asyncio
+import concurrent.futures
+import itertools
+import logging
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MODULE_LOG = logging.getLogger(__name__)
+
+#: Priority for handling unsolicited messages, which are already waiting to
+#: be read
+INTERRUPT_PRIORITY = -1
+#: Priority for commands, which always run before pending polls
+COMMAND_PRIORITY = 0
+#: Priority for status polls
+POLL_PRIORITY = 10
+#: The most threads that may be doing module serial I/O at once
+MAX_IO_THREADS = 4
+
+
+class PortClosedError(RuntimeError):
+    pass
+
+
+def call_in_loop(loop: asyncio.AbstractEventLoop,
+                 func: Callable[..., Any], *args):
+    """ Schedule ``func(*args)`` to run in ``loop``. Safe to call from any
+    thread, and does nothing if the loop is closed (since nothing can then be
+    waiting on the loop).
+    """
+    try:
+        loop.call_soon_threadsafe(func, *args)
+    except RuntimeError:
+        pass
+
+
+class SupervisedPort:
+    """ A handle to a port registered with a :py:class:`ModuleSupervisor`.
+
+    Modules keep this handle and use it to run commands on their driver.
+    """
+    def __init__(self,
+                 supervisor: 'ModuleSupervisor',
+                 port: str,
+                 poll: Optional[Callable[[], Any]],
+                 poll_interval: Optional[float],
+                 on_poll: Optional[Callable[[], None]]) -> None:
+        self._supervisor = supervisor
+        self._loop = supervisor.loop
+        self.port = port
+        self.poll = poll
+        self.on_poll = on_poll
+        self.poll_interval = poll_interval
+        self.next_poll = self._loop.time() + (poll_interval or 0)
+        self.poll_pending = False
+        self.closed = False
+        self.lock = threading.Lock()
+        self._queue: asyncio.PriorityQueue\
+            = asyncio.PriorityQueue(loop=self._loop)
+        self._interrupt_fd: Optional[int] = None
+        self._on_interrupt: Optional[Callable[[], None]] = None
+        self._interrupt_pending = False
+        self._worker = self._loop.create_task(self._work())
+
+    def __repr__(self):
+        return '<{}: {}{}>'.format(self.__class__.__name__, self.port,
+                                   ' (closed)' if self.closed else '')
+
+    async def submit(self,
+                     func: Callable[..., Any],
+                     *args,
+                     priority: int = COMMAND_PRIORITY) -> Any:
+        """ Run ``func(*args)`` on the I/O thread pool once everything of
+        higher priority queued for this port has run, and return its result.
+        """
+        if self.closed:
+            raise PortClosedError(f'{self.port} is no longer supervised')
+        fut = self._loop.create_future()
+        self._enqueue(priority, func, args, fut)
+        return await fut
+
+    def run_sync(self, func: Callable[..., Any], *args) -> Any:
+        """ Run ``func(*args)`` in the calling thread, holding the port lock.
+
+        For modules whose public interface is synchronous. Ports that watch
+        for interrupts must use :py:meth:`submit` instead.
+        """
+        if self.closed:
+            raise PortClosedError(f'{self.port} is no longer supervised')
+        with self.lock:
+            return func(*args)
+
+    def poll_soon(self):
+        """ Poll this port as soon as it is free, rather than on schedule """
+        self._call_in_loop(self._supervisor._reschedule, self, 0)
+
+    def set_poll_interval(self, seconds: float):
+        """ Change how often this port is polled. Takes effect immediately
+        if the new interval is shorter than the time left until the next poll
+        """
+        def _set():
+            self.poll_interval = seconds
+            self._supervisor._reschedule(self, seconds)
+        self._call_in_loop(_set)
+
+    def watch_interrupts(self, fd: int, on_interrupt: Callable[[], None]):
+        """ Call ``on_interrupt`` (on the I/O thread pool, holding the port
+        lock) whenever ``fd`` becomes readable while nothing else is using the
+        port.
+        """
+        self._interrupt_fd = fd
+        self._on_interrupt = on_interrupt
+        self._resume_interrupts()
+
+    def close(self):
+        """ Stop supervising this port. Safe to call from any thread. """
+        if self.closed:
+            return
+        self.closed = True
+        self._call_in_loop(self._teardown)
+
+    async def aclose(self):
+        """ Stop supervising this port, and wait for any serial I/O that is
+        already in flight to finish.
+        """
+        self.close()
+        # Once we can take the lock, nothing else is talking to the port.
+        # The supervisor's threads stop once it has no ports left, so wait
+        # on the loop's own executor.
+        await self._loop.run_in_executor(None, self._wait_for_idle)
+
+    def _wait_for_idle(self):
+        with self.lock:
+            pass
+
+    def _call_in_loop(self, func, *args):
+        call_in_loop(self._loop, func, *args)
+
+    def _teardown(self):
+        self._pause_interrupts()
+        self._worker.cancel()
+        while not self._queue.empty():
+            _, _, _, _, fut = self._queue.get_nowait()
+            if fut and not fut.done():
+                fut.set_exception(
+                    PortClosedError(f'{self.port} is no longer supervised'))
+        self._supervisor._remove(self)
+
+    def _enqueue(self, priority, func, args, fut):
+        self._queue.put_nowait(
+            (priority, next(self._supervisor._sequence), func, args, fut))
+
+    def _locked(self, func, args):
+        with self.lock:
+            return func(*args)
+
+    async def _work(self):
+        while True:
+            priority, _, func, args, fut = await self._queue.get()
+            if fut and fut.done():
+                # The submitter gave up waiting
+                continue
+            self._pause_interrupts()
+            try:
+                if fut:
+                    await self._run_command(func, args, fut)
+                else:
+                    await self._run_poll(func)
+            finally:
+                if not self.closed:
+                    self._resume_interrupts()
+
+    def _run_locked(self, func, args):
+        return self._loop.run_in_executor(
+            self._supervisor.executor, self._locked, func, args)
+
+    async def _run_command(self, func, args, fut):
+        try:
+            result = await self._run_locked(func, args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not fut.done():
+                fut.set_exception(e)
+        else:
+            if not fut.done():
+                fut.set_result(result)
+
+    async def _run_poll(self, func):
+        try:
+            await self._run_locked(func, ())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            MODULE_LOG.exception(f'Polling {self.port} failed')
+        else:
+            if self.on_poll:
+                self._handle_poll()
+        finally:
+            self._supervisor._poll_done(self)
+
+    def _handle_poll(self):
+        try:
+            self.on_poll()  # type: ignore
+        except Exception:
+            MODULE_LOG.exception(f'Handling poll of {self.port} failed')
+
+    def _pause_interrupts(self):
+        if self._interrupt_fd is not None:
+            self._loop.remove_reader(self._interrupt_fd)
+
+    def _resume_interrupts(self):
+        if self._interrupt_fd is not None and not self._interrupt_pending:
+            self._loop.add_reader(self._interrupt_fd, self._interrupted)
+
+    def _interrupted(self):
+        # Reading the message blocks, so stop watching until the handler
+        # has run on an I/O thread
+        self._pause_interrupts()
+        if self._interrupt_pending or self.closed:
+            return
+        self._interrupt_pending = True
+        fut = self._loop.create_future()
+        fut.add_done_callback(self._interrupt_handled)
+        self._enqueue(INTERRUPT_PRIORITY, self._on_interrupt, (), fut)
+
+    def _interrupt_handled(self, fut: asyncio.Future):
+        self._interrupt_pending = False
+        if fut.cancelled() or self.closed:
+            return
+        error = fut.exception()
+        if error:
+            MODULE_LOG.error(f'Handling interrupt from {self.port} failed',
+                             exc_info=error)
+        self._resume_interrupts()
+
+
+class ModuleSupervisor:
+    """ Owns the serial connections of all the modules that share an event
+    loop. Get the one for a loop with :py:meth:`get_supervisor`.
+
+    Once its last port is removed, a supervisor stops its I/O threads and
+    scheduler and is forgotten by :py:meth:`get_supervisor`, so that it does
+    not keep its loop alive.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor]\
+            = None
+        self._ports: Dict[str, SupervisedPort] = {}
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event(loop=loop)
+        self._scheduler: Optional[asyncio.Task] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    @property
+    def ports(self) -> Dict[str, SupervisedPort]:
+        return dict(self._ports)
+
+    @property
+    def executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """ The I/O thread pool, started when first needed """
+        if not self._executor:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=MAX_IO_THREADS, thread_name_prefix='module_io')
+        return self._executor
+
+    def register(self,
+                 port: str,
+                 poll: Callable[[], Any] = None,
+                 poll_interval: float = None,
+                 on_poll: Callable[[], None] = None) -> SupervisedPort:
+        """ Start supervising a port. Must be called from the event loop.
+
+        :param port: The serial port of the module
+        :param poll: A blocking callable that queries the module's status.
+                     If not specified, the port is never polled.
+        :param poll_interval: The number of seconds between polls
+        :param on_poll: Called in the event loop after each successful poll
+        :returns: A handle used to submit commands for the port
+        """
+        existing = self._ports.get(port)
+        if existing:
+            existing.close()
+        handle = SupervisedPort(self, port, poll, poll_interval, on_poll)
+        self._ports[port] = handle
+        if poll:
+            self._start_scheduler()
+        return handle
+
+    def _remove(self, handle: SupervisedPort):
+        if self._ports.get(handle.port) is handle:
+            del self._ports[handle.port]
+        self._wakeup.set()
+        if not self._ports:
+            self._release()
+
+    def _release(self):
+        with _supervisors_lock:
+            if _supervisors.get(self._loop) is self:
+                del _supervisors[self._loop]
+        if self._scheduler:
+            self._scheduler.cancel()
+            self._scheduler = None
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _start_scheduler(self):
+        if not self._scheduler or self._scheduler.done():
+            self._scheduler = self._loop.create_task(self._schedule_polls())
+        self._wakeup.set()
+
+    def _reschedule(self, handle: SupervisedPort, delay: float):
+        handle.next_poll = min(handle.next_poll, self._loop.time() + delay)
+        self._wakeup.set()
+
+    def _poll_done(self, handle: SupervisedPort):
+        handle.poll_pending = False
+        handle.next_poll = self._loop.time() + (handle.poll_interval or 0)
+        self._wakeup.set()
+
+    async def _schedule_polls(self):
+        while any(p.poll for p in self._ports.values()):
+            self._wakeup.clear()
+            now = self._loop.time()
+            next_due = None
+            for handle in self._ports.values():
+                if not handle.poll or handle.poll_pending:
+                    continue
+                if handle.next_poll <= now:
+                    handle.poll_pending = True
+                    handle._enqueue(POLL_PRIORITY, handle.poll, (), None)
+                elif next_due is None or handle.next_poll < next_due:
+                    next_due = handle.next_poll
+            timeout = None if next_due is None else next_due - now
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout, loop=self._loop)
+            except asyncio.TimeoutError:
+                pass
+
+    async def shutdown(self):
+        """ Stop supervising every port and release the I/O threads """
+        for handle in list(self._ports.values()):
+            await handle.aclose()
+        self._release()
+
+
+class StatusWaiter:
+    """ Lets coroutines wait until a module's status meets some condition.
+
+    Conditions are only checked when the waiter is notified that the status
+    may have changed (after a poll or a command), so waiting costs nothing
+    while the module is idle.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._waiting: List[Tuple[Callable[[], bool], asyncio.Future]] = []
+
+    async def wait_for(self,
+                       condition: Callable[[], bool],
+                       timeout: float = None):
+        """ Return once ``condition()`` is true.
+
+        :param condition: Checked now, and then whenever the waiter is
+                          notified
+        :param timeout: The most seconds to wait, or None to wait forever
+        :raises asyncio.TimeoutError: If the timeout passes first
+        """
+        if condition():
+            return
+        entry = (condition, self._loop.create_future())
+        self._waiting.append(entry)
+        try:
+            await asyncio.wait_for(entry[1], timeout, loop=self._loop)
+        finally:
+            self._waiting.remove(entry)
+
+    def notify(self):
+        """ Recheck the conditions being waited on. Safe to call from any
+        thread.
+        """
+        if self._waiting:
+            call_in_loop(self._loop, self._check)
+
+    def _check(self):
+        for condition, fut in list(self._waiting):
+            if fut.done():
+                continue
+            try:
+                met = condition()
+            except Exception as e:
+                fut.set_exception(e)
+            else:
+                if met:
+                    fut.set_result(None)
+
+
+_supervisors: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_supervisors_lock = threading.Lock()
+
+
+def get_supervisor(loop: asyncio.AbstractEventLoop = None)\
+        -> ModuleSupervisor:
+    """ Get (creating if necessary) the supervisor for an event loop """
+    checked_loop = loop or asyncio.get_event_loop()
+    with _supervisors_lock:
+        supervisor = _supervisors.get(checked_loop)
+        if not supervisor:
+            supervisor = ModuleSupervisor(checked_loop)
+            _supervisors[checked_loop] = supervisor
+    return supervisor
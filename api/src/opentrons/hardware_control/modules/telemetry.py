@@ -0,0 +1,129 @@
+""" opentrons.hardware_control.modules.telemetry: a fixed-size history of the
+samples a temperature module's polls return.
+
+Each :py:class:`TelemetryBuffer` keeps its samples in one array of floats
+with a row per sample. The array grows in chunks as samples arrive (so a
+module that is never polled, like a simulated one, costs next to nothing) up
+to ``capacity`` rows, after which the oldest sample is overwritten; its
+memory cost is bounded no matter how long the robot runs.
+"""
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np  # type: ignore
+
+#: The values recorded for each sample, in order
+FIELDS = ('timestamp', 'temperature', 'target', 'lidTemp', 'holdTime')
+#: Samples kept per module: 18 hours at one poll per second, in at most 2.6 MB
+DEFAULT_CAPACITY = 65536
+#: The most samples returned by :py:meth:`TelemetryBuffer.history` by default
+DEFAULT_MAX_POINTS = 500
+#: The number of rows the sample array starts with and grows by (at least)
+GROWTH_CHUNK = 1024
+
+
+def _to_float(value: Optional[float]) -> float:
+    return math.nan if value is None else float(value)
+
+
+def _to_json(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class TelemetryBuffer:
+    """ A ring buffer of (timestamp, temperature, target, lid temperature,
+    hold time) samples. Missing values are stored as NaN.
+
+    Timestamps are seconds since the epoch, but are taken from the monotonic
+    clock, so they never go backwards even if the system clock is changed.
+    """
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self._capacity = capacity
+        self._samples = np.empty((0, len(FIELDS)))
+        self._next = 0
+        self._count = 0
+        self._epoch_offset = time.time() - time.monotonic()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def _now(self) -> float:
+        return time.monotonic() + self._epoch_offset
+
+    def _grow(self):
+        size = len(self._samples)
+        grown = np.empty(
+            (min(self._capacity, max(GROWTH_CHUNK, 2 * size)), len(FIELDS)))
+        grown[:size] = self._samples
+        self._samples = grown
+
+    def append(self,
+               temperature: Optional[float],
+               target: Optional[float] = None,
+               lid_temp: Optional[float] = None,
+               hold_time: Optional[float] = None,
+               timestamp: float = None):
+        """ Record a sample, overwriting the oldest one if the buffer is full
+
+        :param timestamp: When the sample was taken, in seconds since the
+                          epoch. Defaults to now. Must not be earlier than
+                          the last sample's.
+        """
+        if timestamp is None:
+            timestamp = self._now()
+        elif self._count and timestamp < self._latest_timestamp():
+            raise ValueError('Samples must be recorded in time order')
+        if self._next == len(self._samples):
+            self._grow()
+        self._samples[self._next] = (
+            timestamp, _to_float(temperature), _to_float(target),
+            _to_float(lid_temp), _to_float(hold_time))
+        self._next = (self._next + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+
+    def _latest_timestamp(self) -> float:
+        return self._samples[self._next - 1, 0]
+
+    def window(self,
+               since: float = None,
+               until: float = None) -> np.ndarray:
+        """ The samples taken between ``since`` and ``until`` (inclusive;
+        unbounded if not specified), oldest first, as a copy with one row per
+        sample and one column per entry of :py:data:`FIELDS`
+        """
+        if self._count < self._capacity:
+            ordered = self._samples[:self._count]
+        else:
+            ordered = np.roll(self._samples, -self._next, axis=0)
+        timestamps = ordered[:, 0]
+        # Samples are appended in time order, so the window is contiguous
+        start = 0 if since is None\
+            else np.searchsorted(timestamps, since, side='left')
+        end = len(ordered) if until is None\
+            else np.searchsorted(timestamps, until, side='right')
+        return ordered[start:end].copy()
+
+    def history(self,
+                since: float = None,
+                until: float = None,
+                max_points: int = DEFAULT_MAX_POINTS) -> List[Dict[str, Any]]:
+        """ The samples between ``since`` and ``until``, evenly thinned out to
+        at most ``max_points`` samples, as dicts keyed by :py:data:`FIELDS`
+        (with None for missing values) ready to serialize
+        """
+        if max_points < 1:
+            raise ValueError('max_points must be at least 1')
+        samples = self.window(since, until)
+        if len(samples) > max_points:
+            picks = np.unique(np.linspace(
+                0, len(samples) - 1, max_points).round().astype(int))
+            samples = samples[picks]
+        return [dict(zip(FIELDS, (_to_json(v) for v in row)))
+                for row in samples.tolist()]
@@ -1,10 +1,15 @@
 import asyncio
-from threading import Thread, Event
-from typing import Union
+from typing import Optional, Union
 from opentrons.drivers.temp_deck import TempDeck as TempDeckDriver
-from . import update, mod_abc
+from . import update, mod_abc, supervisor
+from .telemetry import TelemetryBuffer
 
+#: How often to poll while holding at a temperature
 TEMP_POLL_INTERVAL_SECS = 1
+#: How often to poll while heating or cooling
+RAMPING_POLL_INTERVAL_SECS = 0.25
+#: How often to poll while deactivated
+IDLE_POLL_INTERVAL_SECS = 5
 
 
 class MissingDevicePortError(Exception):
@@ -28,6 +33,9 @@ class SimulatingDriver:
     def update_temperature(self):
         pass
 
+    def poll_temperature(self):
+        return ''
+
     def connect(self, port):
         self._port = port
 
@@ -55,22 +63,6 @@ class SimulatingDriver:
                 'version': 'dummyVersion'}
 
 
-class Poller(Thread):
-    def __init__(self, driver):
-        self._driver_ref = driver
-        self._stop_event = Event()
-        super().__init__(target=self._poll_temperature,
-                         name='Temperature poller for tempdeck')
-
-    def _poll_temperature(self):
-        while not self._stop_event.wait(TEMP_POLL_INTERVAL_SECS):
-            self._driver_ref.update_temperature()
-
-    def join(self):
-        self._stop_event.set()
-        super().join()
-
-
 class TempDeck(mod_abc.AbstractModule):
     """
     Under development. API subject to change without a version bump
@@ -118,7 +110,42 @@ class TempDeck(mod_abc.AbstractModule):
 
         self._port = port
         self._device_info = None
-        self._poller = None
+        self._supervised: Optional[supervisor.SupervisedPort] = None
+        self._status_waiter = supervisor.StatusWaiter(self._loop)
+        self._telemetry = TelemetryBuffer()
+
+    def _call(self, func, *args):
+        """ Run a driver command, sharing the port with the supervisor's
+        temperature polls, and then poll for the outcome right away
+        """
+        try:
+            if not self._supervised:
+                return func(*args)
+            return self._supervised.run_sync(func, *args)
+        finally:
+            if self._supervised:
+                self._supervised.poll_soon()
+            else:
+                supervisor.call_in_loop(self._loop, self._status_updated)
+
+    def _on_poll(self):
+        self._telemetry.append(self.temperature, self.target)
+        self._status_updated()
+
+    def _status_updated(self):
+        """ Called in the event loop after every poll or command """
+        self._status_waiter.notify()
+        self._publish_live_data()
+        if self._supervised:
+            self._supervised.set_poll_interval(self._poll_interval())
+
+    def _poll_interval(self) -> float:
+        status = self.status
+        if status in ('heating', 'cooling'):
+            return RAMPING_POLL_INTERVAL_SECS
+        elif status == 'idle':
+            return IDLE_POLL_INTERVAL_SECS
+        return TEMP_POLL_INTERVAL_SECS
 
     def set_temperature(self, celsius):
         """
@@ -128,18 +155,21 @@ class TempDeck(mod_abc.AbstractModule):
         temperature display. Any input outside of this range will be clipped
         to the nearest limit
         """
-        return self._driver.set_temperature(celsius)
+        return self._call(self._driver.set_temperature, celsius)
 
     def deactivate(self):
         """ Stop heating/cooling and turn off the fan """
-        self._driver.deactivate()
+        self._call(self._driver.deactivate)
 
-    async def wait_for_temp(self):
+    async def wait_for_temp(self, timeout: float = None):
         """
         This method exits only if set temperature has reached.Subject to change
+
+        :param timeout: The most seconds to wait, or None to wait forever
+        :raises asyncio.TimeoutError: If the timeout passes first
         """
-        while self.status != 'holding at target':
-            await asyncio.sleep(0.1)
+        await self._status_waiter.wait_for(
+            lambda: self.status == 'holding at target', timeout)
 
     @property
     def device_info(self):
@@ -155,6 +185,11 @@ class TempDeck(mod_abc.AbstractModule):
             }
         }
 
+    @property
+    def telemetry(self) -> TelemetryBuffer:
+        """ The temperatures recorded by recent polls """
+        return self._telemetry
+
     @property
     def temperature(self):
         return self._driver.temperature
@@ -185,6 +220,7 @@ class TempDeck(mod_abc.AbstractModule):
 
     def set_loop(self, loop):
         self._loop = loop
+        self._status_waiter = supervisor.StatusWaiter(self._loop)
 
     async def _connect(self):
         """
@@ -192,22 +228,27 @@ class TempDeck(mod_abc.AbstractModule):
         Planned change- will connect to the correct port in case of multiple
         TempDecks
         """
-        if self._poller:
-            self._poller.join()
+        await self._stop_supervision()
         self._driver.connect(self._port)
         self._device_info = self._driver.get_device_info()
-        self._poller = Poller(self._driver)
-        self._poller.start()
-
-    def __del__(self):
-        if hasattr(self, '_poller') and self._poller:
-            self._poller.join()
+        if not self.is_simulated:
+            self._supervised = supervisor.get_supervisor(self._loop).register(
+                self._port,
+                poll=self._driver.poll_temperature,
+                poll_interval=TEMP_POLL_INTERVAL_SECS,
+                on_poll=self._on_poll)
+
+    async def _stop_supervision(self):
+        if self._supervised:
+            await self._supervised.aclose()
+            self._supervised = None
+
+    async def cleanup(self):
+        await self._stop_supervision()
+        self._driver.disconnect()
 
     async def prep_for_update(self) -> str:
-        if self._poller:
-            self._poller.join()
-        del self._poller
-        self._poller = None
+        await self._stop_supervision()
         new_port = await update.enter_bootloader(self._driver,
                                                  self.name())
         return new_port or self.port
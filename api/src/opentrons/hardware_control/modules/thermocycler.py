@@ -1,12 +1,73 @@
 import asyncio
-from . import mod_abc, types
-from typing import Union, Optional, List, Callable
+import math
+import threading
+from . import mod_abc, types, supervisor
+from .telemetry import TelemetryBuffer
+from typing import Union, Optional, List, Callable, NamedTuple
 from opentrons.drivers.thermocycler.driver import (
-    Thermocycler as ThermocyclerDriver)
+    Thermocycler as ThermocyclerDriver, POLLING_FREQUENCY_MS)
 import logging
 
 MODULE_LOG = logging.getLogger(__name__)
 
+#: How often to poll while holding at a temperature
+POLL_INTERVAL_SECS = POLLING_FREQUENCY_MS / 1000
+#: How often to poll while the plate or lid is heating or cooling
+RAMPING_POLL_INTERVAL_SECS = 0.25
+#: How often to poll while neither the plate nor the lid is controlled
+IDLE_POLL_INTERVAL_SECS = 5
+
+PROFILE_STEP_KEYS = {
+    'temperature', 'hold_time_seconds', 'hold_time_minutes', 'ramp_rate'}
+
+
+class ProfileStep(NamedTuple):
+    """ One entry of a compiled profile """
+    cycle_index: int  # science starts at 1
+    step_index: int  # science starts at 1
+    temperature: float
+    hold_time: float  # seconds
+    ramp_rate: Optional[float]
+
+
+def compile_profile(steps: List[types.ThermocyclerStep],
+                    repetitions: int) -> List[ProfileStep]:
+    """ Validate a profile, and flatten it into the list of steps to run
+
+    :param steps: The steps of one cycle, each a dict of the arguments to
+                  :py:meth:`Thermocycler.set_temperature`, which must
+                  include a hold time
+    :param repetitions: The number of cycles
+    :raises ValueError: If the profile is invalid
+    """
+    if repetitions <= 0:
+        raise ValueError("repetitions must be a positive integer")
+    cycle = []
+    for step in steps:
+        unknown = set(step.keys()) - PROFILE_STEP_KEYS
+        if unknown:
+            raise ValueError(
+                f"unknown keys in cycle step: {', '.join(sorted(unknown))}")
+        if step.get('temperature') is None:
+            raise ValueError(
+                    "temperature must be defined for each step in cycle")
+        hold_mins = step.get('hold_time_minutes')
+        hold_secs = step.get('hold_time_seconds')
+        if hold_mins is None and hold_secs is None:
+            raise ValueError(
+                    "either hold_time_minutes or hold_time_seconds must be"
+                    "defined for each step in cycle")
+        hold_time = (hold_secs or 0) + (hold_mins or 0) * 60
+        if not math.isfinite(hold_time) or hold_time < 0:
+            raise ValueError(
+                "hold times must be finite and not negative")
+        cycle.append((step['temperature'], hold_time, step.get('ramp_rate')))
+    if not cycle:
+        raise ValueError("a profile must have at least one step")
+    return [ProfileStep(cycle_idx + 1, step_idx + 1, *step_args)
+            for cycle_idx in range(repetitions)
+            for step_idx, step_args in enumerate(cycle)]
+
 
 class SimulatingDriver:
     def __init__(self):
@@ -19,7 +80,7 @@ class SimulatingDriver:
         self._lid_target = None
         self._lid_heating_active = False
 
-    async def open(self):
+    def open(self):
         # TODO: BC 2019-07-11 once safe threshold is established in
         # firmware, handle UI level warning responsibly here
 
@@ -29,7 +90,7 @@ class SimulatingDriver:
         self._lid_status = 'open'
         return self._lid_status
 
-    async def close(self):
+    def close(self):
         self._lid_status = 'closed'
         return self._lid_status
 
@@ -70,31 +131,41 @@ class SimulatingDriver:
     def lid_temp(self):
         return self._lid_target
 
-    async def connect(self, port):
+    def connect(self, port):
         self._port = port
 
     def disconnect(self):
         self._port = None
 
-    async def set_temperature(self,
-                              temp: float,
-                              hold_time: float,
-                              ramp_rate: float) -> None:
+    def poll(self):
+        pass
+
+    @property
+    def interrupt_fd(self):
+        return None
+
+    def handle_interrupt(self):
+        pass
+
+    def set_temperature(self,
+                        temp: float,
+                        hold_time: float = None,
+                        ramp_rate: float = None) -> None:
         self._target_temp = temp
         self._hold_time = hold_time
         self._ramp_rate = ramp_rate
         self._active = True
 
-    async def set_lid_temperature(self, temp: Optional[float]):
+    def set_lid_temperature(self, temp: Optional[float]):
         """ Set the lid temperature in deg Celsius """
         self._lid_heating_active = True
         self._lid_target = temp
 
-    async def stop_lid_heating(self):
+    def stop_lid_heating(self):
         self._lid_heating_active = False
         self._lid_target = None
 
-    async def deactivate(self):
+    def deactivate(self):
         self._target_temp = None
         self._ramp_rate = None
         self._hold_time = None
@@ -102,7 +173,7 @@ class SimulatingDriver:
         self._lid_heating_active = False
         self._lid_target = None
 
-    async def get_device_info(self):
+    def get_device_info(self):
         return {'serial': 'dummySerial',
                 'model': 'dummyModel',
                 'version': 'dummyVersion'}
@@ -158,10 +229,19 @@ class Thermocycler(mod_abc.AbstractModule):
 
         self._port = port
         self._device_info = None
-        self._poller = None
+        self._supervised: Optional[supervisor.SupervisedPort] = None
 
         self._running_flag = asyncio.Event(loop=self._loop)
+        self._status_waiter = supervisor.StatusWaiter(self._loop)
+        self._telemetry = TelemetryBuffer()
         self._current_cycle_task: Optional[asyncio.Task] = None
+        # The profile step the Thermocycler last acknowledged, and the one
+        # to start as soon as a poll sees that step finish
+        self._profile_step: Optional[ProfileStep] = None
+        self._armed_step: Optional[ProfileStep] = None
+        # Held while a poll takes and starts the armed step, so cancel() can
+        # be sure no step starts after it returns
+        self._step_lock = threading.Lock()
 
         self._total_cycle_count: Optional[int] = None
         self._current_cycle_index: Optional[int] = None
@@ -175,6 +255,11 @@ class Thermocycler(mod_abc.AbstractModule):
         self._loop.call_soon_threadsafe(self._running_flag.set)
 
     def cancel(self):
+        # Disarm first, so an in-flight poll cannot start another step
+        # before the task sees it has been cancelled. A poll that already
+        # took the armed step finishes starting it before this returns.
+        with self._step_lock:
+            self._armed_step = None
         if self._current_cycle_task:
             self._current_cycle_task.cancel()
             self._current_cycle_task = None
@@ -185,15 +270,15 @@ class Thermocycler(mod_abc.AbstractModule):
         self._current_cycle_index = None
         self._total_step_count = None
         self._current_step_index = None
-        await self._driver.deactivate()
+        await self._call(self._driver.deactivate)
 
     async def open(self) -> str:
         """ Open the lid if it is closed"""
-        return await self._driver.open()
+        return await self._call(self._driver.open)
 
     async def close(self) -> str:
         """ Close the lid if it is open"""
-        return await self._driver.close()
+        return await self._call(self._driver.close)
 
     async def set_temperature(self, temperature,
                               hold_time_seconds: float = None,
@@ -203,67 +288,117 @@ class Thermocycler(mod_abc.AbstractModule):
         minutes = hold_time_minutes if hold_time_minutes is not None else 0
         total_seconds = seconds + (minutes * 60)
         hold_time = total_seconds if total_seconds > 0 else 0
-        await self._driver.set_temperature(
-            temp=temperature, hold_time=hold_time, ramp_rate=ramp_rate)
+        await self._call(
+            self._driver.set_temperature, temperature, hold_time, ramp_rate)
         if hold_time:
             await self.wait_for_hold()
         else:
             await self.wait_for_temp()
 
-    async def _execute_cycles(self,
-                              steps: List[types.ThermocyclerStep],
-                              repetitions: int):
-        for rep in range(repetitions):
-            self._current_cycle_index = rep + 1  # science starts at 1
-            for step_idx, step in enumerate(steps):
+    def _start_step(self, step: ProfileStep):
+        """ Send a profile step to the Thermocycler, and record it as the
+        current step once acknowledged
+        """
+        self._driver.set_temperature(
+            step.temperature, step.hold_time, step.ramp_rate)
+        self._profile_step = step
+        self._current_cycle_index = step.cycle_index
+        self._current_step_index = step.step_index
+
+    def _step_finished(self) -> bool:
+        step = self._profile_step
+        if not step or self.hold_time != 0:
+            return False
+        return bool(step.hold_time) or self.status == 'holding at target'
+
+    def _poll(self):
+        """ Poll the Thermocycler. Runs on a supervisor I/O thread.
+
+        If the poll shows the current profile step has finished, the next
+        step (if it was armed) is sent in the same go, without waiting for
+        the event loop.
+        """
+        self._driver.poll()
+        with self._step_lock:
+            armed = self._armed_step
+            if armed and self._running_flag.is_set()\
+                    and self._step_finished():
+                self._armed_step = None
+                self._start_step(armed)
+
+    async def _execute_profile(self, profile: List[ProfileStep]):
+        try:
+            for step in profile:
                 await self._running_flag.wait()
-                self._current_step_index = step_idx + 1  # science starts at 1
-                await self.set_temperature(**step)
-                await self.wait_for_hold()
+                if self._supervised and self._profile_step:
+                    # Queue the step up for the poll that sees the current
+                    # one finish
+                    self._armed_step = step
+                    await self._status_waiter.wait_for(
+                        lambda: self._profile_step is step)
+                else:
+                    if self._profile_step:
+                        await self._status_waiter.wait_for(
+                            self._step_finished)
+                    await self._call(self._start_step, step)
+            await self._status_waiter.wait_for(self._step_finished)
+        finally:
+            self._armed_step = None
+            self._profile_step = None
 
     async def cycle_temperatures(self,
                                  steps: List[types.ThermocyclerStep],
                                  repetitions: int):
+        profile = compile_profile(steps, repetitions)
         self._running_flag.set()
         self._total_cycle_count = repetitions
         self._total_step_count = len(steps)
-        cycle_task = self._loop.create_task(self._execute_cycles(steps,
-                                                                 repetitions))
+        cycle_task = self._loop.create_task(self._execute_profile(profile))
         self._current_cycle_task = cycle_task
         await cycle_task
 
     async def set_lid_temperature(self, temp: float):
         """ Set the lid temperature in deg Celsius """
-        await self._driver.set_lid_temperature(temp=temp)
+        await self._call(self._driver.set_lid_temperature, temp)
         await self.wait_for_lid_temp()
 
     async def stop_lid_heating(self):
-        return await self._driver.stop_lid_heating()
+        return await self._call(self._driver.stop_lid_heating)
 
-    async def wait_for_lid_temp(self):
+    async def wait_for_lid_temp(self, timeout: float = None):
         """
         This method only exits if lid target temperature has been reached.
 
         Subject to change without a version bump.
+
+        :param timeout: The most seconds to wait, or None to wait forever
+        :raises asyncio.TimeoutError: If the timeout passes first
         """
-        while self._driver.lid_temp_status != 'holding at target':
-            await asyncio.sleep(0.1)
+        await self._status_waiter.wait_for(
+            lambda: self._driver.lid_temp_status == 'holding at target',
+            timeout)
 
-    async def wait_for_temp(self):
+    async def wait_for_temp(self, timeout: float = None):
         """
         This method only exits if set temperature has been reached.
 
         Subject to change without a version bump.
+
+        :param timeout: The most seconds to wait, or None to wait forever
+        :raises asyncio.TimeoutError: If the timeout passes first
         """
-        while self.status != 'holding at target':
-            await asyncio.sleep(0.1)
+        await self._status_waiter.wait_for(
+            lambda: self.status == 'holding at target', timeout)
 
-    async def wait_for_hold(self):
+    async def wait_for_hold(self, timeout: float = None):
         """
         This method returns only when hold time has elapsed
+
+        :param timeout: The most seconds to wait, or None to wait forever
+        :raises asyncio.TimeoutError: If the timeout passes first
         """
-        while self.hold_time != 0:
-            await asyncio.sleep(0.1)
+        await self._status_waiter.wait_for(
+            lambda: self.hold_time == 0, timeout)
 
     @property
     def lid_target(self):
@@ -289,6 +424,11 @@ class Thermocycler(mod_abc.AbstractModule):
     def hold_time(self):
         return self._driver.hold_time
 
+    @property
+    def telemetry(self) -> TelemetryBuffer:
+        """ The temperatures and hold times recorded by recent polls """
+        return self._telemetry
+
     @property
     def temperature(self):
         return self._driver.temperature
@@ -348,7 +488,7 @@ class Thermocycler(mod_abc.AbstractModule):
     def interrupt_callback(self):
         """ Fetch the current interrupt callback
 
-        Exposes the interrupt callback used with the TCPoller, so it can be re-
+        Exposes the interrupt callback used by the driver, so it can be re-
         hooked in the new module instance after a firmware update.
         """
         return self._interrupt_cb
@@ -360,10 +500,70 @@ class Thermocycler(mod_abc.AbstractModule):
     def set_loop(self, newLoop):
         self._loop = newLoop
         self._running_flag = asyncio.Event(loop=self._loop)
+        self._status_waiter = supervisor.StatusWaiter(self._loop)
+
+    async def _call(self, func, *args):
+        """ Run a driver command. Commands for real Thermocyclers are queued
+        ahead of status polls and run on the supervisor's I/O threads.
+        """
+        try:
+            if not self._supervised:
+                return func(*args)
+            return await self._supervised.submit(func, *args)
+        finally:
+            self._status_updated()
+
+    def _on_poll(self):
+        self._telemetry.append(
+            self.temperature, self.target, self.lid_temp, self.hold_time)
+        self._status_updated()
+
+    def _status_updated(self):
+        """ Called in the event loop after every poll or command """
+        self._status_waiter.notify()
+        self._publish_live_data()
+        if self._supervised:
+            self._supervised.set_poll_interval(self._poll_interval())
+
+    def _poll_interval(self) -> float:
+        if 'ramping' in (self.status, self.lid_temp_status):
+            return RAMPING_POLL_INTERVAL_SECS
+        elif self.target is None and self.lid_target is None:
+            return IDLE_POLL_INTERVAL_SECS
+        elif self.hold_time:
+            # Poll as the hold ends, so the next step starts on time
+            return max(RAMPING_POLL_INTERVAL_SECS,
+                       min(POLL_INTERVAL_SECS, self.hold_time))
+        return POLL_INTERVAL_SECS
 
     async def _connect(self):
-        await self._driver.connect(self._port)
-        self._device_info = await self._driver.get_device_info()
+        await self._stop_supervision()
+        if not self.is_simulated:
+            self._supervised = supervisor.get_supervisor(self._loop).register(
+                self._port,
+                poll=self._poll,
+                poll_interval=POLL_INTERVAL_SECS,
+                on_poll=self._on_poll)
+        try:
+            await self._call(self._driver.connect, self._port)
+            self._device_info = await self._call(self._driver.get_device_info)
+        except Exception:
+            await self._stop_supervision()
+            raise
+        interrupt_fd = self._driver.interrupt_fd
+        if self._supervised and interrupt_fd is not None:
+            self._supervised.watch_interrupts(
+                interrupt_fd, self._driver.handle_interrupt)
+
+    async def _stop_supervision(self):
+        if self._supervised:
+            await self._supervised.aclose()
+            self._supervised = None
+
+    async def cleanup(self):
+        self.cancel()
+        await self._stop_supervision()
+        self._driver.disconnect()
 
     @property
     def port(self):
@@ -1,17 +1,47 @@
 import asyncio
 import logging
 import os
-from typing import Any, Dict, Optional, Tuple
+import re
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple
 from opentrons import HERE as package_root
 
 log = logging.getLogger(__name__)
 
 PORT_SEARCH_TIMEOUT = 5.5
+PORT_POLL_INTERVAL = 0.05
+MODULES_DIR = '/dev/modules'
+SYS_TTY_DIR = '/sys/class/tty'
+
+#: Called with the fraction (0-1) of an upload that is done
+ProgressCallback = Callable[[float], None]
 
 # avrdude_options
 PART_NO = 'atmega32u4'
 PROGRAMMER_ID = 'avr109'
 BAUDRATE = '57600'
+# avrdude draws each progress bar with this many #s
+PROGRESS_BAR_WIDTH = 50
+_PROGRESS_BAR = re.compile(r'(Writing|Reading) \| (#*)')
+
+_port_switch_locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def port_switch_lock(
+        loop: asyncio.AbstractEventLoop = None) -> asyncio.Lock:
+    """ The lock to hold while a module's port is switching (for instance,
+    while entering its bootloader).
+
+    Bootloader ports are found by watching what appears in /dev/modules, so
+    no other module may be entering its bootloader or coming back from it at
+    the same time; uploads themselves can run concurrently.
+    """
+    checked_loop = loop or asyncio.get_event_loop()
+    lock = _port_switch_locks.get(checked_loop)
+    if not lock:
+        lock = asyncio.Lock(loop=checked_loop)
+        _port_switch_locks[checked_loop] = lock
+    return lock
 
 
 async def enter_bootloader(driver, model):
@@ -43,24 +73,40 @@ async def enter_bootloader(driver, model):
 
 async def update_firmware(port: str,
                           firmware_file_path: str,
-                          loop: Optional[asyncio.AbstractEventLoop])\
+                          loop: Optional[asyncio.AbstractEventLoop],
+                          progress_callback: ProgressCallback = None,
+                          name: str = None,
+                          timeout: float = None)\
                           -> Tuple[str, Tuple[bool, str]]:
     """
     Run avrdude firmware upload command. Switch back to normal module port
 
-    Note: For modules with old bootloader, the kernel could assign the module
-    a new port after the update (since the board is automatically reset).
-    Scan for such a port change and use the appropriate port.
+    Note: the kernel could assign the module a new port after the update
+    (since the board is automatically reset). The new port is the one for
+    the module that appears on the same USB port as the bootloader port did,
+    so several modules, even of the same kind, can be updated at once.
 
-    Returns a tuple of the new port to communicate on (or None if it was not
+    :param progress_callback: If specified, called with the fraction of the
+                              upload (writing and then verifying) that is done
+                              each time avrdude reports progress
+    :param name: If specified, the name of the module being updated (e.g.
+                 'tempdeck'). Only ports for that kind of module are
+                 considered when looking for the port after the update.
+    :param timeout: If specified, the most seconds avrdude may run before it
+                    is killed
+
+    Returns a tuple of the new port to communicate on (or '' if it was not
     found) and a tuple of success and message from avrdude.
-    """
 
-    ports_before_update = await _discover_ports()
+    :raises asyncio.TimeoutError: If avrdude ran for longer than `timeout`
+    """
+    checked_loop = loop or asyncio.get_event_loop()
+    # Must be found before flashing, while the bootloader port still exists
+    location = _usb_location(port)
     config_file_path = os.path.join(package_root,
                                     'config', 'modules', 'avrdude.conf')
     kwargs: Dict[str, Any] = {
-        'stdout': asyncio.subprocess.PIPE,
+        'stdout': asyncio.subprocess.DEVNULL,
         'stderr': asyncio.subprocess.PIPE
     }
     if loop:
@@ -73,21 +119,119 @@ async def update_firmware(port: str,
         '-b{}'.format(BAUDRATE), '-D',
         '-Uflash:w:{}:i'.format(firmware_file_path),
         **kwargs)
+    try:
+        result = await asyncio.wait_for(
+            _read_output(proc.stderr, progress_callback),  # type: ignore
+            timeout, loop=checked_loop)
+    except BaseException:
+        log.error(f"avrdude did not finish updating {port}")
+        proc.kill()
+        await proc.wait()
+        raise
     await proc.wait()
-
-    _result = await proc.communicate()
-    result = _result[1].decode()
     avrdude_res = _format_avrdude_response(result)
     if avrdude_res[0]:
         log.debug(result)
     else:
         log.error("Failed to update module firmware for {}: {}"
                   .format(port, avrdude_res[1]))
-    new_port = await _port_on_mode_switch(ports_before_update)
+    new_port = ''
+    if location:
+        # Modules entering their bootloaders look for new ports in
+        # /dev/modules, so this one must not reappear while they look
+        async with port_switch_lock(checked_loop):
+            try:
+                new_port = await asyncio.wait_for(
+                    _port_at_location(location, name, exclude=port),
+                    PORT_SEARCH_TIMEOUT, loop=checked_loop)
+            except asyncio.TimeoutError:
+                log.warning(f"No port appeared at USB {location} after "
+                            f"updating {port}")
+    else:
+        log.warning(f"Could not find the USB port of {port}")
     log.info("New port: {}".format(new_port))
     return new_port, avrdude_res
 
 
+def _usb_location(port: str) -> Optional[str]:
+    """ Where the USB device behind a port in /dev/modules is plugged in
+    (e.g. '1-1.3'), which stays the same when a module resets into or out of
+    its bootloader; or None if this cannot be found.
+    """
+    tty = os.path.basename(os.path.realpath(port))
+    interface = os.path.join(SYS_TTY_DIR, tty, 'device')
+    if not os.path.exists(interface):
+        return None
+    # The tty's device is a USB interface, whose parent is the USB device
+    return os.path.basename(os.path.dirname(os.path.realpath(interface)))
+
+
+async def _port_at_location(location: str, name: Optional[str],
+                            exclude: str) -> str:
+    """ Wait for a module port other than ``exclude`` to appear at USB
+    ``location``, and return it """
+    while True:
+        for entry in await _discover_ports():
+            candidate = os.path.join(MODULES_DIR, entry)
+            if candidate == exclude or entry.endswith('bootloader'):
+                continue
+            if name and name not in entry.lower():
+                continue
+            if _usb_location(candidate) == location:
+                return candidate
+        await asyncio.sleep(PORT_POLL_INTERVAL)
+
+
+async def wait_for_port(port: str, timeout: float = PORT_SEARCH_TIMEOUT):
+    """ Wait until ``port`` exists, for instance while a module resets after
+    an update, or until ``timeout`` seconds pass.
+
+    Returns whether the port exists.
+    """
+    try:
+        await asyncio.wait_for(_wait_for_path(port), timeout)
+    except asyncio.TimeoutError:
+        log.warning(f"Port {port} did not appear after {timeout}s")
+        return False
+    return True
+
+
+async def _wait_for_path(path: str):
+    while not os.path.exists(path):
+        await asyncio.sleep(PORT_POLL_INTERVAL)
+
+
+async def _read_output(stream: asyncio.StreamReader,
+                       progress_callback: Optional[ProgressCallback]) -> str:
+    """ Read avrdude's output as it is written, reporting progress """
+    output = ''
+    progress = 0.0
+    while True:
+        chunk = await stream.read(256)
+        if not chunk:
+            return output
+        output += chunk.decode(errors='replace')
+        if not progress_callback:
+            continue
+        new_progress = _upload_progress(output)
+        if new_progress != progress:
+            progress = new_progress
+            progress_callback(progress)
+
+
+def _upload_progress(output: str) -> float:
+    """ How much of an upload is done, from the progress bars avrdude has
+    drawn so far: the first half is writing, the second half verifying.
+    """
+    writing = output.find('Writing |')
+    if writing < 0:
+        # Ignore the bar drawn while reading the device signature
+        return 0.0
+    bars = _PROGRESS_BAR.findall(output, writing)[:2]
+    done = sum(min(len(marks), PROGRESS_BAR_WIDTH) for _, marks in bars)
+    return done / (2 * PROGRESS_BAR_WIDTH)
+
+
 def _format_avrdude_response(raw_response: str) -> Tuple[bool, str]:
     avrdude_log = ''
     for line in raw_response.splitlines():
@@ -124,11 +268,13 @@ async def _port_poll(is_old_bootloader, ports_before_switch=None):
         else:
             ports = await _discover_ports()
             if ports:
+                # Other modules may already be in their bootloaders
                 discovered_ports = list(filter(
-                    lambda x: x.endswith('bootloader'), ports))
+                    lambda x: x.endswith('bootloader')
+                    and x not in (ports_before_switch or []), ports))
                 if len(discovered_ports) == 1:
                     new_port = '/dev/modules/{}'.format(discovered_ports[0])
-        await asyncio.sleep(0.05)
+        await asyncio.sleep(PORT_POLL_INTERVAL)
     return new_port
 
 
@@ -141,7 +287,7 @@ async def _discover_ports():
         # Measure for race condition where port is being switched in
         # between calls to isdir() and listdir()
         try:
-            return os.listdir('/dev/modules')
+            return os.listdir(MODULES_DIR)
         except (FileNotFoundError, OSError):
             pass
         await asyncio.sleep(2)
@@ -0,0 +1,140 @@
+""" opentrons.hardware_control.modules.update_jobs: runs module firmware
+updates in the background.
+
+Each module is on its own serial port, so an :py:class:`UpdateManager` flashes
+as many modules at once as it is asked to, keeping track of how far along each
+one is and publishing that to :py:data:`.mod_abc.broker` under
+:py:data:`.mod_abc.MODULE_UPDATE_PROGRESS` as it changes.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from .mod_abc import AbstractModule, broker, MODULE_UPDATE_PROGRESS
+
+MODULE_LOG = logging.getLogger(__name__)
+
+PREPARING = 'preparing'
+FLASHING = 'flashing'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class UpdateInProgressError(RuntimeError):
+    pass
+
+
+class UpdateJob:
+    """ The state of the firmware update of one module """
+    def __init__(self, module: AbstractModule, filename: str) -> None:
+        self.serial: Optional[str] = module.device_info.get('serial')
+        self.name = module.name()
+        self.port = module.port
+        self.filename = filename
+        self.status = PREPARING
+        self.progress = 0.0
+        self.message = ''
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'serial': self.serial,
+            'name': self.name,
+            'port': self.port,
+            'filename': self.filename,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message
+        }
+
+
+class UpdateManager:
+    """ Starts and keeps track of module firmware updates
+
+    :param hardware: The hardware controller whose modules are updated
+    :param loop: The loop to run updates in. Defaults to the current event
+                 loop when an update is started.
+    :param timeout: If specified, how long uploading an update may take
+                    before it is stopped and fails
+    """
+    def __init__(self,
+                 hardware,
+                 loop: asyncio.AbstractEventLoop = None,
+                 timeout: float = None) -> None:
+        self._hardware = hardware
+        self._loop = loop
+        self._timeout = timeout
+        self._jobs: Dict[str, UpdateJob] = {}
+
+    @property
+    def jobs(self) -> List[UpdateJob]:
+        """ The latest update of each module that has been updated """
+        return list(self._jobs.values())
+
+    def get(self, serial: str) -> Optional[UpdateJob]:
+        return self._jobs.get(serial)
+
+    def start(self,
+              module: AbstractModule,
+              firmware_file: str,
+              filename: str = None) -> UpdateJob:
+        """ Start updating a module's firmware, returning without waiting for
+        the update to finish.
+
+        :param firmware_file: The path to the firmware image
+        :param filename: The name of the image to report, if not the path
+        :raises UpdateInProgressError: If the module is already being updated
+        """
+        job = UpdateJob(module, filename or firmware_file)
+        previous = self._jobs.get(job.serial)  # type: ignore
+        if previous and not previous.done:
+            raise UpdateInProgressError(
+                f'Module {job.serial} is already being updated')
+        self._jobs[job.serial] = job  # type: ignore
+        loop = self._loop or asyncio.get_event_loop()
+        job.task = loop.create_task(
+            self._run(job, module, firmware_file, loop))
+        self._publish(job)
+        return job
+
+    async def wait(self, job: UpdateJob) -> UpdateJob:
+        """ Wait for an update to finish """
+        if job.task:
+            await asyncio.shield(job.task)
+        return job
+
+    async def _run(self,
+                   job: UpdateJob,
+                   module: AbstractModule,
+                   firmware_file: str,
+                   loop: asyncio.AbstractEventLoop):
+        MODULE_LOG.info(f'Updating {job.name} {job.serial} on {job.port}'
+                        f' with {job.filename}')
+        try:
+            ok, message = await self._hardware.update_module(
+                module, firmware_file, loop,
+                progress_callback=lambda progress: self._progressed(
+                    job, progress),
+                timeout=self._timeout)
+        except Exception as e:
+            MODULE_LOG.exception(f'Update of {job.serial} failed')
+            ok, message = False, str(e)
+        job.status = SUCCEEDED if ok else FAILED
+        if ok:
+            job.progress = 1.0
+        job.message = message
+        MODULE_LOG.info(f'Update of {job.serial} finished: {message}')
+        self._publish(job)
+
+    def _progressed(self, job: UpdateJob, progress: float):
+        job.status = FLASHING
+        job.progress = progress
+        self._publish(job)
+
+    @staticmethod
+    def _publish(job: UpdateJob):
+        broker.publish(MODULE_UPDATE_PROGRESS, job.to_dict())
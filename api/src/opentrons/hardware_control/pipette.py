@@ -1,7 +1,9 @@
 """ Classes and functions for pipette state tracking
 """
 import logging
-from typing import Any, Dict, Optional, Tuple, Union
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np  # type: ignore
 
 from opentrons.types import Point
 from opentrons.config import pipette_config
@@ -25,6 +27,8 @@ class Pipette:
                  inst_offset_config: Dict[str, Tuple[float, float, float]],
                  pipette_id: str = None) -> None:
         self._config = pipette_config.load(model, pipette_id)
+        self._ul_per_mm = pipette_config.compile_ul_per_mm(
+            self._config.ul_per_mm)
         self._name = pipette_config.name_for_model(model)
         self._model = model
         self._model_offset = self._config.model_offset
@@ -59,6 +63,8 @@ class Pipette:
     def update_config_item(self, elem_name: str, elem_val: Any):
         self._log.info("updated config: {}={}".format(elem_name, elem_val))
         self._config = self._config._replace(**{elem_name: elem_val})
+        if elem_name == 'ul_per_mm':
+            self._ul_per_mm = pipette_config.compile_ul_per_mm(elem_val)
 
     @property
     def name(self) -> str:
@@ -197,8 +203,12 @@ class Pipette:
         return self._has_tip
 
     def ul_per_mm(self, ul: float, action: str) -> float:
-        sequence = self._config.ul_per_mm[action]
-        return pipette_config.piecewise_volume_conversion(ul, sequence)
+        return self._ul_per_mm[action].ul_per_mm(ul)
+
+    def ul_per_mm_array(
+            self, ul: Sequence[float], action: str) -> np.ndarray:
+        """ Get the ul/mm values for a whole sequence of volumes at once """
+        return self._ul_per_mm[action].ul_per_mm_array(ul)
 
     def __str__(self) -> str:
         return '{} current volume {}ul critical point: {} at {}'\
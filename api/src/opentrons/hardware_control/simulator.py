@@ -7,6 +7,7 @@ from contextlib import contextmanager
 from opentrons import types
 from opentrons.config.pipette_config import config_models, configs
 from opentrons.drivers.smoothie_drivers import SimulatingDriver
+from opentrons.drivers.smoothie_drivers.motion_script import MotionScript
 from . import modules
 
 
@@ -109,6 +110,13 @@ class Simulator:
         self._engaged_axes.update({ax: True
                                    for ax in target_position})
 
+    def run_motion_script(self, script: MotionScript):
+        if self._run_flag.is_set():
+            self._log.warning("Motion script would be blocked by pause")
+        for target in script.targets:
+            self._position.update(target)
+            self._engaged_axes.update({ax: True for ax in target})
+
     def home(self, axes: List[str] = None) -> Dict[str, float]:
         if self._run_flag.is_set():
             self._log.warning("Home would be blocked by pause")
@@ -204,8 +212,11 @@ class Simulator:
     async def update_module(
             self, module: modules.AbstractModule,
             firmware_file: str,
-            loop: Optional[asyncio.AbstractEventLoop])\
-            -> modules.AbstractModule:
+            loop: Optional[asyncio.AbstractEventLoop],
+            progress_callback: modules.update.ProgressCallback = None,
+            timeout: float = None) -> modules.AbstractModule:
+        if progress_callback:
+            progress_callback(1.0)
         return module
 
     @property
@@ -1,7 +1,6 @@
 from collections import OrderedDict
 import itertools
 import logging
-import json
 from opentrons.config import CONFIG
 from opentrons.data_storage import database
 from opentrons.util.vector import Vector
@@ -191,7 +190,8 @@ def _load_new_well(well_data, saved_offset, lw_format):
 def _look_up_offsets(labware_hash):
     calibration_path = CONFIG['labware_calibration_offsets_dir_v2']
     labware_offset_path = calibration_path / '{}.json'.format(labware_hash)
-    if labware_offset_path.exists():
+    if labware_offset_path.name in new_labware._calibration_files(
+            calibration_path):
         calibration_data = new_labware._read_file(str(labware_offset_path))
         offset_array = calibration_data['default']['offset']
         return Point(x=offset_array[0], y=offset_array[1], z=offset_array[2])
@@ -201,15 +201,12 @@ def _look_up_offsets(labware_hash):
 
 def save_new_offsets(labware_hash, delta):
     calibration_path = CONFIG['labware_calibration_offsets_dir_v2']
-    if not calibration_path.exists():
-        calibration_path.mkdir(parents=True, exist_ok=True)
     old_delta = _look_up_offsets(labware_hash)
     new_delta = old_delta + Point(x=delta[0], y=delta[1], z=delta[2])
     labware_offset_path = calibration_path / '{}.json'.format(labware_hash)
     calibration_data = new_labware._helper_offset_data_format(
         str(labware_offset_path), new_delta)
-    with labware_offset_path.open('w') as f:
-        json.dump(calibration_data, f)
+    new_labware._write_calibration_file(labware_offset_path, calibration_data)
 
 
 def load_new_labware(container_name):
@@ -217,14 +214,14 @@ def load_new_labware(container_name):
 
     :raises KeyError: If the labware name is not found
     """
-    defn = new_labware.get_labware_definition(load_name=container_name)
+    defn = new_labware._shared_labware_definition(load_name=container_name)
     return load_new_labware_def(defn)
 
 
 def load_new_labware_def(definition):
     """ Load a labware definition in the new schema into a placeable
     """
-    labware_hash = new_labware._hash_labware_def(definition)
+    labware_hash = new_labware._get_labware_hash(definition)
     saved_offset = _look_up_offsets(labware_hash)
     container = Container()
     container_name = definition['parameters']['loadName']
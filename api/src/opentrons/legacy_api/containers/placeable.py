@@ -11,6 +11,18 @@ from opentrons.util.vector import Vector
 
 SUPPORTED_MODULES = ['magdeck', 'tempdeck']
 
+# Names of wells in a grid: the row's letters then the column's number
+WELL_NAME_PATTERN = re.compile(r'^([A-Za-z]+)([0-9]+)$')
+
+# Bumped whenever any placeable is moved or re-parented, which makes the
+# absolute coordinates and ancestry cached on every placeable stale
+_tree_generation = 0
+
+
+def _tree_changed():
+    global _tree_generation
+    _tree_generation += 1
+
 
 def unpack_location(location):
     """
@@ -98,10 +110,7 @@ class Placeable(object):
         self.placeable
         """
 
-        # For performance optimization reasons we are tracking children
-        # by name and by reference
-        self.children_by_name = OrderedDict()
-        self.children_by_reference = OrderedDict()
+        self._clear_children()
         self._coordinates = Vector(0, 0, 0)
 
         self.parent = parent
@@ -126,6 +135,38 @@ class Placeable(object):
             if dimension not in properties:
                 properties[dimension] = 0
 
+    @property
+    def _coordinates(self):
+        """
+        The coordinates of a :Placeable: relative to its parent
+        """
+        return self._relative_coordinates
+
+    @_coordinates.setter
+    def _coordinates(self, value):
+        self._relative_coordinates = value
+        _tree_changed()
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, value):
+        self._parent = value
+        _tree_changed()
+
+    def _tree_cache(self):
+        """
+        Returns a :dict: for values derived from where a :Placeable: is in
+        the tree, emptied whenever any placeable moves or is re-parented
+        """
+        cache = self.__dict__.get('_cache')
+        if cache is None or cache[0] != _tree_generation:
+            cache = (_tree_generation, {})
+            self._cache = cache
+        return cache[1]
+
     def __getitem__(self, name):
         """
         Returns placeable by name or index
@@ -134,7 +175,7 @@ class Placeable(object):
         if isinstance(name, slice):
             return self.get_children_from_slice(name)
         elif isinstance(name, int):
-            return self.get_children_list()[name]
+            return self._children[name]
         elif isinstance(name, str):
             return self.get_child_by_name(name)
         else:
@@ -161,7 +202,7 @@ class Placeable(object):
         return iter(self.get_children_list())
 
     def __len__(self):
-        return len(self.get_children_list())
+        return len(self._children)
 
     def __bool__(self):
         return True
@@ -174,9 +215,8 @@ class Placeable(object):
         if not self.get_parent():
             raise Exception('Must have a parent')
 
-        children = self.parent.get_children_list()
-        my_loc = children.index(self)
-        return children[my_loc + 1]
+        my_loc = self.parent.get_index_from_name(self.get_name())
+        return self.parent._children[my_loc + 1]
 
     def iter(self):
         """
@@ -205,11 +245,19 @@ class Placeable(object):
         """
         return self.properties.get('type', self.__class__.__name__)
 
+    def _clear_children(self):
+        # For performance optimization reasons we are tracking children
+        # by name, by reference and by index
+        self.children_by_name = OrderedDict()
+        self.children_by_reference = OrderedDict()
+        self._children = []
+        self._child_indices = {}
+
     def get_children_list(self):
         """
         Returns the list of children in the order they were added
         """
-        return list(self.children_by_reference.keys())
+        return list(self._children)
 
     def get_path(self, reference=None):
         """
@@ -241,8 +289,12 @@ class Placeable(object):
         """
         Returns the coordinates of a :Placeable: relative to :reference:
         """
-        coordinates = [i._coordinates for i in self.get_trace(reference)]
-        return functools.reduce(lambda a, b: a + b, coordinates)
+        cache = self._tree_cache()
+        key = ('coordinates', reference)
+        if key not in cache:
+            coordinates = [i._coordinates for i in self.get_trace(reference)]
+            cache[key] = functools.reduce(lambda a, b: a + b, coordinates)
+        return cache[key]
 
     def add(self, child, name=None, coordinates=None):
         """
@@ -264,18 +316,40 @@ class Placeable(object):
         child.parent = self
         self.children_by_name[name] = child
         self.children_by_reference[child] = name
+        self._child_indices[name] = len(self._children)
+        self._children.append(child)
+
+    def clone(self):
+        """
+        Returns a copy of :self: and all of its children, without a parent.
+
+        The copies share their :properties: dicts with the originals (which
+        must not be changed after loading), but have their own coordinates
+        and children, so they can be placed and calibrated independently.
+        """
+        copy = self.__class__.__new__(self.__class__)
+        copy.__dict__.update(self.__dict__)
+        copy.parent = None
+        copy._clear_children()
+        for child, name in self.children_by_reference.items():
+            copy.add(child.clone(), name)
+        return copy
 
     def get_deck(self):
         """
         Returns parent :Deck: of a :Placeable:
         """
-        trace = self.get_trace()
+        cache = self._tree_cache()
+        if 'deck' not in cache:
+            trace = self.get_trace()
 
-        # Find decks in trace, prepend with [None] in case nothing was found
-        res = [None] + [item for item in trace if isinstance(item, Deck)]
+            # Find decks in trace, prepend with [None] in case nothing was
+            # found
+            res = [None] + [item for item in trace if isinstance(item, Deck)]
 
-        # Pop last (and hopefully only Deck) or None if there is no deck
-        return res.pop()
+            # Pop last (and hopefully only Deck) or None if there is no deck
+            cache['deck'] = res.pop()
+        return cache['deck']
 
     def get_module(self):
         """
@@ -304,8 +378,10 @@ class Placeable(object):
         """
         Retrieves child's name by index
         """
-        return self.get_children_list().index(
-            self.get_child_by_name(name))
+        try:
+            return self._child_indices[name]
+        except KeyError:
+            raise ValueError('{} has no child named {}'.format(self, name))
 
     def get_children_from_slice(self, s):
         """
@@ -317,13 +393,13 @@ class Placeable(object):
         if isinstance(s.stop, str):
             s = slice(
                 s.start, self.get_index_from_name(s.stop), s.step)
-        return WellSeries(self.get_children_list()[s])
+        return WellSeries(self._children[s])
 
     def has_children(self):
         """
         Returns *True* if :Placeable: has children
         """
-        return len(self.children_by_reference) > 0
+        return len(self._children) > 0
 
     def size(self):
         """
@@ -519,6 +595,21 @@ class Container(Placeable):
         self.grid_transposed = None
         self.ordering = None
 
+    def _clear_children(self):
+        super(Container, self)._clear_children()
+        # The (row, column) names of the wells in each column, kept up to
+        # date as wells are added
+        self._grid_cells = OrderedDict()
+        self.invalidate_grid()
+
+    def add(self, child, name=None, coordinates=None):
+        super(Container, self).add(child, name, coordinates)
+        match = WELL_NAME_PATTERN.match(self.children_by_reference[child])
+        if match:
+            row, col = match.groups(0)
+            self._grid_cells.setdefault(col, OrderedDict())[row] = (row, col)
+        self.invalidate_grid()
+
     def invalidate_grid(self):
         """
         Invalidates pre-calcualted grid structure for rows and colums
@@ -540,21 +631,10 @@ class Container(Placeable):
 
     def get_grid(self):
         """
-        Calculates the grid inferring row/column structure
+        Returns the grid inferring row/column structure
         from indexes. Currently only Letter+Number names are supported
         """
-        columns = OrderedDict()
-
-        index_pattern = r'^([A-Za-z]+)([0-9]+)$'
-        for name in self.children_by_name:
-            match = re.match(index_pattern, name)
-            if match:
-                row, col = match.groups(0)
-                if col not in columns:
-                    columns[col] = OrderedDict()
-                columns[col][row] = (row, col)
-
-        return columns
+        return self._grid_cells
 
     def transpose(self, rows):
         """
@@ -640,7 +720,7 @@ class Container(Placeable):
 
         new_wells = None
         if not args and not kwargs:
-            new_wells = WellSeries(self.get_children_list())
+            new_wells = WellSeries(OrderedDict(self.children_by_name))
         elif len(args) > 1:
             new_wells = WellSeries([self.well(n) for n in args])
         elif 'x' in kwargs or 'y' in kwargs:
@@ -664,21 +744,20 @@ class Container(Placeable):
         """
         return self.wells(*args, **kwargs)
 
-    def get_children_list(self):
-        return super(Container, self).get_children_list()
-
     def _parse_wells_to_and_length(self, *args, **kwargs):
         start = args[0] if len(args) else 0
         stop = kwargs.get('to', None)
         step = kwargs.get('step', 1)
         length = kwargs.get('length', 1)
 
-        wrapped_wells = [
-            w
-            for i in range(3)
-            for w in self.get_children_list()
-        ]
-        total_kids = len(self.get_children_list())
+        children = self._children
+        total_kids = len(children)
+
+        def wrapped_wells(s, length=None):
+            # The first length wells in slice s of the children repeated
+            # three times
+            indices = range(*s.indices(3 * total_kids))[:length]
+            return WellSeries([children[i % total_kids] for i in indices])
 
         if isinstance(start, str):
             start = self.get_index_from_name(start)
@@ -691,14 +770,14 @@ class Container(Placeable):
             elif stop < start:
                 stop -= 1
                 step = step * -1 if step > 0 else step
-            return WellSeries(
-                wrapped_wells[start + total_kids:stop + total_kids:step])
+            return wrapped_wells(
+                slice(start + total_kids, stop + total_kids, step))
         else:
             if length < 0:
                 length *= -1
                 step = step * -1 if step > 0 else step
-            return WellSeries(
-                wrapped_wells[start + total_kids::step][:length])
+            return wrapped_wells(
+                slice(start + total_kids, None, step), length)
 
     def _parse_wells_x_y(self, *args, **kwargs):
         x = kwargs.get('x', None)
@@ -764,14 +843,26 @@ class WellSeries(Container):
             return str(self)
         return str(self.name)
 
+    def _tree_cache(self):
+        # The well a series stands in for can change with :set_offset:, so
+        # nothing about its position is cached
+        return {}
+
     def get_name_by_instance(self, well):
         for name, value in self.items.items():
             if value is well:
                 return name
         return None
 
+    @property
+    def _children(self):
+        return self.values
+
     def get_children_list(self):
         return list(self.values)
 
+    def get_index_from_name(self, name):
+        return self.values.index(self.items.get(name))
+
     def get_child_by_name(self, name):
         return self.items.get(name)
@@ -1557,14 +1557,27 @@ class Pipette(CommandPublisher):
         destination_mm = self._get_plunger_position('bottom') + millimeters
         return round(destination_mm, 6)
 
+    @property
+    def ul_per_mm(self):
+        return self._ul_per_mm_config
+
+    @ul_per_mm.setter
+    def ul_per_mm(self, ul_per_mm):
+        self._ul_per_mm_config = ul_per_mm
+        # Compiled on first use, since pipettes built without a max volume
+        # are still allowed as long as they never move liquid
+        self._ul_per_mm_tables = None
+
     def _ul_per_mm(self, ul: float, func: str) -> float:
         """
         :param ul: microliters as a float
         :param func: must be one of 'aspirate' or 'dispense'
         :return: microliters/mm as a float
         """
-        sequence = self.ul_per_mm[func]
-        return pipette_config.piecewise_volume_conversion(ul, sequence)
+        if self._ul_per_mm_tables is None:
+            self._ul_per_mm_tables = pipette_config.compile_ul_per_mm(
+                self._ul_per_mm_config)
+        return self._ul_per_mm_tables[func].ul_per_mm(ul)
 
     def _volume_percentage(self, volume):
         """Returns the plunger percentage for a given volume.
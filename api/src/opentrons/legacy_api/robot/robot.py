@@ -3,7 +3,7 @@ import os
 import logging
 from functools import lru_cache
 from threading import Lock
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 from numpy import add, subtract  # type: ignore
 
@@ -30,6 +30,12 @@ log = logging.getLogger(__name__)
 TIP_CLEARANCE_DECK = 20    # clearance when moving between different labware
 TIP_CLEARANCE_LABWARE = 5  # clearance when staying within a single labware
 
+# Containers loaded by name, kept so that loading the same container again
+# (after a reset, or when a protocol is simulated again) clones one of these
+# instead of rebuilding it from the database. Each is stored with the key
+# from _prototype_source it was loaded with, and rebuilt when that changes.
+_container_prototypes: Dict[str, Tuple[Any, Container]] = {}
+
 
 def _load_weird_container(container_name):
     """ Load a container from persisted containers, whatever that is """
@@ -46,7 +52,32 @@ def _load_weird_container(container_name):
     return container
 
 
+def _prototype_source(container):
+    """ What a loaded container's geometry depends on: the saved offsets of
+    labware loaded from a new-style definition, or otherwise the contents of
+    the labware database """
+    labware_hash = container.properties.get('labware_hash')
+    if labware_hash:
+        return containers._look_up_offsets(labware_hash)
+    return database.revision()
+
+
 def _load_container_by_name(container_name):
+    """ Load a container by name, cloning it from a previous load if nothing
+    it was loaded from has changed since.
+
+    Returns the container or raises a KeyError if it could not be found
+    """
+    cached = _container_prototypes.get(container_name)
+    if cached and cached[0] == _prototype_source(cached[1]):
+        return cached[1].clone()
+    container = _find_container_by_name(container_name)
+    _container_prototypes[container_name] = (
+        _prototype_source(container), container)
+    return container.clone()
+
+
+def _find_container_by_name(container_name):
     """ Try and find a container in a variety of methods.
 
     Returns the container or raises a KeyError if it could not be found
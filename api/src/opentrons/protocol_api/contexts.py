@@ -9,7 +9,7 @@ from opentrons.config import feature_flags as fflags
 from opentrons.hardware_control import adapters, modules
 from opentrons.hardware_control.simulator import Simulator
 from opentrons.hardware_control.types import CriticalPoint, Axis
-from .labware import (Well, Labware, load, get_labware_definition,
+from .labware import (Well, Labware, load, _shared_labware_definition,
                       load_from_definition, load_module,
                       ModuleGeometry, quirks_from_any_parent,
                       ThermocyclerGeometry, OutOfTipsError,
@@ -17,6 +17,7 @@ from .labware import (Well, Labware, load, get_labware_definition,
 
 from . import geometry
 from . import transfers
+from .parallel import ParallelBlock
 
 MODULE_LOG = logging.getLogger(__name__)
 
@@ -102,6 +103,7 @@ class ProtocolContext(CommandPublisher):
             = {mount: None for mount in types.Mount}
         self._last_moved_instrument: Optional[types.Mount] = None
         self._location_cache: Optional[types.Location] = None
+        self._parallel: Optional[ParallelBlock] = None
 
         self._hw_manager = ProtocolContext.HardwareManager(hardware)
         self._log = MODULE_LOG.getChild(self.__class__.__name__)
@@ -163,6 +165,51 @@ class ProtocolContext(CommandPublisher):
         finally:
             self._hw_manager.set_hw(old_hw)
 
+    @contextlib.contextmanager
+    def parallel(self):
+        """ Run module commands alongside the rest of the protocol.
+
+        This should be used as a context manager. Inside the block, module
+        commands that wait on temperatures (such as
+        :py:meth:`.TemperatureModuleContext.set_temperature` and
+        :py:meth:`.TemperatureModuleContext.wait_for_temp`, or
+        :py:meth:`.ThermocyclerContext.set_block_temperature`) return as soon
+        as they are started, so the pipettes can keep working while the
+        modules heat or cool. Commands to one module still run in order.
+        The block ends when every command started in it is done.
+
+        .. code-block :: python
+
+            with ctx.parallel() as block:
+                temp_mod.set_temperature(4)
+                temp_mod.wait_for_temp()
+                pipette.transfer(100, reservoir['A1'], plate.wells())
+                # the next transfer needs the module to be cold
+                block.wait_for(temp_mod)
+                pipette.transfer(100, plate.wells(), temp_plate.wells())
+
+        Blocks may be nested; an inner block is part of the outer one. If an
+        error leaves the block, commands still running in it are no longer
+        waited for.
+
+        :returns: The :py:class:`.ParallelBlock`, whose
+                  :py:meth:`.ParallelBlock.wait_for` declares that what
+                  comes next depends on a module
+        """
+        if self._parallel is not None:
+            yield self._parallel
+            return
+        block = ParallelBlock()
+        self._parallel = block
+        try:
+            yield block
+            block.wait_for()
+        except BaseException:
+            block.cancel()
+            raise
+        finally:
+            self._parallel = None
+
     def connect(self, hardware: hc.API):
         """ Connect to a running hardware API.
 
@@ -231,7 +278,8 @@ class ProtocolContext(CommandPublisher):
         :param int version: The version of the labware definition. If
             unspecified, will use version 1.
         """
-        labware_def = get_labware_definition(load_name, namespace, version)
+        labware_def = _shared_labware_definition(
+            load_name, namespace, version)
         return self.load_labware_from_definition(labware_def, location, label)
 
     def load_labware_by_name(
@@ -1449,6 +1497,19 @@ class InstrumentContext(CommandPublisher):
               gradient is linear (lambda x: x), however a method can be passed
               with the `gradient` keyword argument to create a custom curve.
 
+            * *optimize_path* (``boolean``) --
+              If `True`, wells are visited in an order that shortens the
+              distance the gantry travels, without changing which liquid
+              goes where. See :py:attr:`.Transfer.optimize_path`. `False`
+              by default.
+
+            * *pack_dispenses* (``boolean``) --
+              (:py:meth:`distribute` and :py:meth:`consolidate` only) If
+              `True`, volumes are regrouped so that they need as few
+              aspirations as possible, which can change the order wells are
+              visited in. See :py:attr:`.Transfer.pack_dispenses`. `False` by
+              default.
+
         :returns: This instance
         """
         self._log.debug("Transfer {} from {} to {}".format(
@@ -1498,7 +1559,11 @@ class InstrumentContext(CommandPublisher):
             drop_tip_strategy=drop_tip,
             blow_out_strategy=blow_out or default_args.blow_out_strategy,
             touch_tip_strategy=(touch_tip or
-                                default_args.touch_tip_strategy)
+                                default_args.touch_tip_strategy),
+            optimize_path=(kwargs.get('optimize_path') or
+                           default_args.optimize_path),
+            pack_dispenses=(kwargs.get('pack_dispenses') or
+                            default_args.pack_dispenses)
         )
         transfer_options = transfers.TransferOptions(transfer=transfer_args,
                                                      mix=mix_opts)
@@ -1508,8 +1573,8 @@ class InstrumentContext(CommandPublisher):
         return self
 
     def _execute_transfer(self, plan: transfers.TransferPlan):
-        for cmd in plan:
-            getattr(self, cmd['method'])(*cmd['args'], **cmd['kwargs'])
+        for step in plan:
+            getattr(self, step.method)(*step.args, **step.kwargs)
 
     @staticmethod
     def _mix_from_kwargs(
@@ -1806,6 +1871,8 @@ class InstrumentContext(CommandPublisher):
 
 class ModuleContext(CommandPublisher):
     """ An object representing a connected module. """
+    #: The synchronous adapter for the hardware module, set by subclasses
+    _module: Any
 
     def __init__(self, ctx: ProtocolContext, geometry: ModuleGeometry) -> None:
         """ Build the ModuleContext.
@@ -1854,6 +1921,22 @@ class ModuleContext(CommandPublisher):
         """ The labware (if any) present on this module. """
         return self._geometry.labware
 
+    def _start(self, method: str, *args, **kwargs):
+        """ Call `method` of the hardware module. Inside a
+        :py:meth:`.ProtocolContext.parallel` block, return a future for the
+        call instead of waiting for it.
+        """
+        block = self._ctx._parallel
+        if block is None:
+            return getattr(self._module, method)(*args, **kwargs)
+        return block.submit(self, self._module, method, *args, **kwargs)
+
+    def _wait_for_started(self):
+        """ Wait for commands started on this module in a parallel block
+        """
+        if self._ctx._parallel is not None:
+            self._ctx._parallel.wait_for(self)
+
     def __repr__(self):
         return "{} at {} lw {}".format(self.__class__.__name__,
                                        self._geometry,
@@ -1905,18 +1988,21 @@ class TemperatureModuleContext(ModuleContext):
 
         :param celsius: The target temperature, in C
         """
-        return self._module.set_temperature(celsius)
+        return self._start('set_temperature', celsius)
 
     @cmds.publish.both(command=cmds.tempdeck_deactivate)
     def deactivate(self):
         """ Stop heating (or cooling) and turn off the fan.
         """
-        return self._module.deactivate()
+        return self._start('deactivate')
 
     def wait_for_temp(self):
         """ Block until the module reaches its setpoint.
+
+        Inside a :py:meth:`.ProtocolContext.parallel` block, this returns
+        right away and later commands to this module wait instead.
         """
-        self._module.wait_for_temp()
+        return self._start('wait_for_temp')
 
     @property
     def temperature(self):
@@ -2051,6 +2137,7 @@ class ThermocyclerContext(ModuleContext):
     @cmds.publish.both(command=cmds.thermocycler_open)
     def open_lid(self):
         """ Opens the lid"""
+        self._wait_for_started()
         self._prepare_for_lid_move()
         self._geometry.lid_status = self._module.open()
         return self._geometry.lid_status
@@ -2058,6 +2145,7 @@ class ThermocyclerContext(ModuleContext):
     @cmds.publish.both(command=cmds.thermocycler_close)
     def close_lid(self):
         """ Closes the lid"""
+        self._wait_for_started()
         self._prepare_for_lid_move()
         self._geometry.lid_status = self._module.close()
         return self._geometry.lid_status
@@ -2093,7 +2181,8 @@ class ThermocyclerContext(ModuleContext):
             after ``temperature`` is reached.
 
         """
-        return self._module.set_temperature(
+        return self._start(
+                'set_temperature',
                 temperature=temperature,
                 hold_time_seconds=hold_time_seconds,
                 hold_time_minutes=hold_time_minutes,
@@ -2112,7 +2201,7 @@ class ThermocyclerContext(ModuleContext):
             ``temperature`` has been reached.
 
         """
-        self._module.set_lid_temperature(temperature)
+        return self._start('set_lid_temperature', temperature)
 
     @cmds.publish.both(command=cmds.thermocycler_execute_profile)
     def execute_profile(self,
@@ -2135,30 +2224,20 @@ class ThermocyclerContext(ModuleContext):
             and finite for each step.
 
         """
-        if repetitions <= 0:
-            raise ValueError("repetitions must be a positive integer")
-        for step in steps:
-            if step.get('temperature') is None:
-                raise ValueError(
-                        "temperature must be defined for each step in cycle")
-            hold_mins = step.get('hold_time_minutes')
-            hold_secs = step.get('hold_time_seconds')
-            if hold_mins is None and hold_secs is None:
-                raise ValueError(
-                        "either hold_time_minutes or hold_time_seconds must be"
-                        "defined for each step in cycle")
-        return self._module.cycle_temperatures(
-            steps=steps, repetitions=repetitions)
+        # Validate here so that errors are raised before anything runs
+        modules.thermocycler.compile_profile(steps, repetitions)
+        return self._start(
+            'cycle_temperatures', steps=steps, repetitions=repetitions)
 
     @cmds.publish.both(command=cmds.thermocycler_deactivate_lid)
     def deactivate_lid(self):
         """ Turn off the heated lid """
-        self._module.stop_lid_heating()
+        return self._start('stop_lid_heating')
 
     @cmds.publish.both(command=cmds.thermocycler_deactivate_block)
     def deactivate_block(self):
         """ Turn off the well block """
-        self._module.deactivate()
+        return self._start('deactivate')
 
     @cmds.publish.both(command=cmds.thermocycler_deactivate)
     def deactivate(self):
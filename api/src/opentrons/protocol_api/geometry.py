@@ -1,14 +1,13 @@
 from collections import UserDict
 import functools
 import logging
-import pkgutil
-import json
 from typing import Any, List, Optional, Tuple, Union, Dict
 
 from opentrons import types
 from .labware import (Labware, Well, ModuleGeometry,
                       quirks_from_any_parent, ThermocyclerGeometry)
 from opentrons.hardware_control.types import CriticalPoint
+from opentrons.util.data_bundle import load_shared_data
 
 
 MODULE_LOG = logging.getLogger(__name__)
@@ -132,9 +131,8 @@ class Deck(UserDict):
                            for idx in range(12)}
         self._highest_z = 0.0
         # TODO: support deck loadName as a param
-        def_path = 'shared_data/deck/definitions/1/ot2_standard.json'
-        self._definition = json.loads(  # type: ignore
-            pkgutil.get_data('opentrons', def_path))
+        self._definition = load_shared_data(
+            'deck/definitions/1/ot2_standard.json')
 
     @staticmethod
     def _assure_int(key: object) -> int:
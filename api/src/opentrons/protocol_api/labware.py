@@ -7,31 +7,41 @@ and labware calibration offsets. It contains all the code necessary to
 transform from labware symbolic points (such as "well a1 of an opentrons
 tiprack") to points in deck coordinates.
 """
+import functools
 import logging
+import math
 import json
+import os
 import re
 import time
-import pkgutil
 import shutil
 import sys
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from enum import Enum, auto
 from hashlib import sha256
 from itertools import takewhile, dropwhile
-from typing import Any, List, Dict, Optional, Union, Tuple
+from typing import (Any, List, Dict, FrozenSet, Optional, Union,
+                    Tuple)
+
+import numpy as np  # type: ignore
 
 from opentrons.types import Location
 from opentrons.types import Point
 from opentrons.config import CONFIG
+from opentrons.util import data_bundle
+from opentrons.util.points import PointArray
 
 MODULE_LOG = logging.getLogger(__name__)
 
 # TODO: Ian 2019-05-23 where to store these constants?
 OPENTRONS_NAMESPACE = 'opentrons'
 CUSTOM_NAMESPACE = 'custom_beta'
+STANDARD_DEFS_NAME = 'labware/definitions/2'
 STANDARD_DEFS_PATH = Path(sys.modules['opentrons'].__file__).parent /\
-    'shared_data' / 'labware' / 'definitions' / '2'
+    'shared_data' / STANDARD_DEFS_NAME
+#: The number of parsed labware definitions to keep in memory
+DEFINITION_CACHE_SIZE = 64
 
 
 class OutOfTipsError(Exception):
@@ -48,6 +58,61 @@ well_shapes = {
     'circular': WellShape.CIRCULAR
 }
 
+#: What is kept about each well of a labware. Circular wells have no length
+#: or width, and rectangular wells no diameter (these are NaN).
+WELL_DTYPE = np.dtype([
+    ('top', float, (3,)),  # Top center, relative to the labware's corner
+    ('depth', float),
+    ('diameter', float),
+    ('length', float),
+    ('width', float),
+    ('max_volume', float),
+])
+
+
+def _well_row(well_props: dict) -> tuple:
+    shape = well_shapes.get(well_props['shape'])
+    if shape is WellShape.RECTANGULAR:
+        dimensions = (np.nan, well_props['xDimension'],
+                      well_props['yDimension'])
+    elif shape is WellShape.CIRCULAR:
+        dimensions = (well_props['diameter'], np.nan, np.nan)
+    else:
+        raise ValueError(
+            'Shape "{}" is not a supported well shape'.format(
+                well_props['shape']))
+    top = (well_props['x'], well_props['y'],
+           well_props['z'] + well_props['depth'])
+    return (top, well_props['depth']) + dimensions \
+        + (well_props['totalLiquidVolume'],)
+
+
+class WellGeometry:
+    """
+    The shapes, positions and tip state of a group of wells (all the wells
+    of a labware, or a single well) kept in arrays, so that moving every well
+    is one addition and each :py:class:`Well` is only a view of its row.
+
+    :param well_defs: Dicts that conform to the json-schema for a Well
+    :param offset: The absolute position of the wells' parent
+    :param has_tip: Whether the wells start with tips in them
+    """
+    def __init__(self,
+                 well_defs: List[dict],
+                 offset: Point,
+                 has_tip: bool) -> None:
+        rows = [_well_row(props) for props in well_defs]
+        self.properties = np.array(rows, dtype=WELL_DTYPE)
+        # Kept as python objects too, for making views without unboxing
+        self.rows = rows
+        self.has_tip = np.full(len(well_defs), has_tip, dtype=bool)
+        self._relative_tops = PointArray(self.properties['top'])
+        self.tops = self._relative_tops + offset
+
+    def move_to(self, offset: Point):
+        """ Move every well so that its parent is at `offset` """
+        self.tops = self._relative_tops + offset
+
 
 class Well:
     """
@@ -75,31 +140,43 @@ class Well:
                        position of the parent of the Well (usually the
                        front-left corner of a labware)
         """
-        self._display_name = display_name
-        self._position\
-            = Point(well_props['x'],
-                    well_props['y'],
-                    well_props['z'] + well_props['depth']) + parent.point
-
+        geometry = WellGeometry([well_props], parent.point, has_tip)
         if not parent.labware:
             raise ValueError("Wells must have a parent")
-        self._parent = parent.labware
-        self._has_tip = has_tip
-        self._shape = well_shapes.get(well_props['shape'])
-        if self._shape is WellShape.RECTANGULAR:
-            self._length = well_props['xDimension']
-            self._width = well_props['yDimension']
+        self._init_view(geometry, 0, parent.labware, display_name)
+
+    @classmethod
+    def _view(cls, geometry: WellGeometry, index: int,
+              parent: 'Labware', display_name: str) -> 'Well':
+        """ Make a Well from row `index` of a labware's well geometry """
+        well = cls.__new__(cls)
+        well._init_view(geometry, index, parent, display_name)
+        return well
+
+    def _init_view(self, geometry: WellGeometry, index: int,
+                   parent: Any, display_name: str):
+        self._display_name = display_name
+        self._geometry = geometry
+        self._index = index
+        self._parent = parent
+        _, depth, diameter, length, width, max_volume = geometry.rows[index]
+        if math.isnan(diameter):
+            self._shape = WellShape.RECTANGULAR
+            self._length = length
+            self._width = width
             self._diameter = None
-        elif self._shape is WellShape.CIRCULAR:
+        else:
+            self._shape = WellShape.CIRCULAR
             self._length = None
             self._width = None
-            self._diameter = well_props['diameter']
-        else:
-            raise ValueError(
-                'Shape "{}" is not a supported well shape'.format(
-                    well_props['shape']))
-        self.max_volume = well_props['totalLiquidVolume']
-        self._depth = well_props['depth']
+            self._diameter = diameter
+        self.max_volume = max_volume
+        self._depth = depth
+
+    @property
+    def _position(self) -> Point:
+        """ The absolute position of the top center of the well """
+        return self._geometry.tops[self._index]
 
     @property
     def parent(self) -> 'Labware':
@@ -107,11 +184,11 @@ class Well:
 
     @property
     def has_tip(self) -> bool:
-        return self._has_tip
+        return bool(self._geometry.has_tip[self._index])
 
     @has_tip.setter
     def has_tip(self, value: bool):
-        self._has_tip = value
+        self._geometry.has_tip[self._index] = value
 
     @property
     def diameter(self) -> Optional[float]:
@@ -189,15 +266,17 @@ class Well:
 
     def __eq__(self, other: object) -> bool:
         """
-        Assuming that equality of wells in this system is having the same
-        absolute coordinates for the top.
+        Wells are equal if they are the same well of the same labware. This
+        does not change when the labware is calibrated, so wells can be kept
+        in sets and used as dict keys across calibrations.
         """
         if not isinstance(other, Well):
             return NotImplemented
-        return self.top().point == other.top().point
+        return self._geometry is other._geometry \
+            and self._index == other._index
 
     def __hash__(self):
-        return hash(self.top().point)
+        return hash((id(self._geometry), self._index))
 
 
 class Labware:
@@ -251,19 +330,27 @@ class Labware:
             dn = definition['metadata']['displayName']
         self._display_name = "{} on {}".format(dn, str(parent.labware))
         self._calibrated_offset: Point = Point(0, 0, 0)
-        self._wells: List[Well] = []
         # Directly from definition
         self._well_definition = definition['wells']
-        self._parameters = definition['parameters']
+        # Copied, since the definition may be shared with other labware and
+        # calibrating the tip length changes the parameters
+        self._parameters = dict(definition['parameters'])
         offset = definition['cornerOffsetFromSlot']
         self._dimensions = definition['dimensions']
         # Inferred from definition
         self._ordering = [well
                           for col in definition['ordering']
                           for well in col]
+        self._well_indices = {name: idx
+                              for idx, name in enumerate(self._ordering)}
         self._offset\
             = Point(offset['x'], offset['y'], offset['z']) + parent.point
         self._parent = parent.labware
+        self._well_geometry = WellGeometry(
+            [self._well_definition[well] for well in self._ordering],
+            self._offset, self.is_tiprack)
+        self._well_views: List[Optional[Well]] = [None] * len(self._ordering)
+        self._all_wells: Optional[List[Well]] = None
         # Applied properties
         self.set_calibration(self._calibrated_offset)
 
@@ -271,7 +358,7 @@ class Labware:
         self._definition = definition
 
     def __getitem__(self, key: str) -> Well:
-        return self.wells_by_name()[key]
+        return self._well_at(self._well_indices[key])
 
     @property
     def parent(self) -> Union['Labware', 'Well', str, 'ModuleGeometry', None]:
@@ -301,19 +388,27 @@ class Labware:
         else:
             return self._parameters['magneticModuleEngageHeight']
 
-    def _build_wells(self) -> List[Well]:
+    def _well_at(self, index: int) -> Well:
         """
-        This function is used to create one instance of wells to be used by all
-        accessor functions. It is only called again if a new offset needs
-        to be applied.
+        The :py:class:`Well` for the well at `index` in the ordering. Each
+        well is only created the first time it is asked for, and then used by
+        all accessor functions; applying a new offset moves the wells rather
+        than replacing them.
         """
-        return [
-            Well(
-                self._well_definition[well],
-                Location(self._calibrated_offset, self),
-                "{} of {}".format(well, self._display_name),
-                self.is_tiprack)
-            for well in self._ordering]
+        well = self._well_views[index]
+        if well is None:
+            well = Well._view(
+                self._well_geometry, index, self,
+                "{} of {}".format(self._ordering[index], self._display_name))
+            self._well_views[index] = well
+        return well
+
+    @property
+    def _wells(self) -> List[Well]:
+        if self._all_wells is None:
+            self._all_wells = [self._well_at(idx)
+                               for idx in range(len(self._ordering))]
+        return self._all_wells
 
     def _create_indexed_dictionary(self, group=0):
         """
@@ -336,7 +431,7 @@ class Labware:
         self._calibrated_offset = Point(x=self._offset.x + delta.x,
                                         y=self._offset.y + delta.y,
                                         z=self._offset.z + delta.z)
-        self._wells = self._build_wells()
+        self._well_geometry.move_to(self._calibrated_offset)
 
     @property
     def calibrated_offset(self) -> Point:
@@ -345,7 +440,7 @@ class Labware:
     def well(self, idx) -> Well:
         """Deprecated---use result of `wells` or `wells_by_name`"""
         if isinstance(idx, int):
-            res = self._wells[idx]
+            res = self._well_at(range(len(self._ordering))[idx])
         elif isinstance(idx, str):
             res = self.wells_by_name()[idx]
         else:
@@ -672,8 +767,7 @@ class Labware:
         """Reset all tips in a tiprack
         """
         if self.is_tiprack:
-            for well in self.wells():
-                well.has_tip = True
+            self._well_geometry.has_tip[:] = True
 
 
 class ModuleGeometry:
@@ -818,7 +912,7 @@ class ThermocyclerGeometry(ModuleGeometry):
     # NOTE: this func is unused until "semi" configuration
     def labware_accessor(self, labware: Labware) -> Labware:
         # Block first three columns from being accessed
-        definition = labware._definition
+        definition = dict(labware._definition)
         definition['ordering'] = definition['ordering'][3::]
         return Labware(definition, super().location)
 
@@ -850,15 +944,74 @@ def _hash_labware_def(labware_def: Dict[str, Any]) -> str:
     return sha256(sorted_def_str.encode('utf-8')).hexdigest()
 
 
+# Hashes of recently used definitions, keyed by the id of the definition. The
+# definition itself is kept alongside its hash so that its id cannot be
+# reused by another object while it is in the cache.
+_definition_hashes: 'OrderedDict[int, Tuple[Dict[str, Any], str]]'\
+    = OrderedDict()
+# The offset files in each calibration directory, along with the mtime of the
+# directory when it was scanned
+_calibration_listings: Dict[Path, Tuple[int, FrozenSet[str]]] = {}
+
+
+def _get_labware_hash(labware_def: Dict[str, Any]) -> str:
+    """ A memoized :py:meth:`_hash_labware_def`.
+
+    Definitions returned from :py:meth:`_shared_labware_definition` are
+    shared, so this only hashes each of them once. Definitions must not be
+    modified after they have been hashed.
+    """
+    key = id(labware_def)
+    cached = _definition_hashes.get(key)
+    if cached and cached[0] is labware_def:
+        _definition_hashes.move_to_end(key)
+        return cached[1]
+    labware_hash = _hash_labware_def(labware_def)
+    _definition_hashes[key] = (labware_def, labware_hash)
+    if len(_definition_hashes) > DEFINITION_CACHE_SIZE:
+        _definition_hashes.popitem(last=False)
+    return labware_hash
+
+
+def _calibration_files(calibration_path: Path) -> FrozenSet[str]:
+    """ Get the names of the files in a calibration directory.
+
+    The directory is only rescanned when its mtime changes (or after a save
+    through this module), so looking up the calibrations of every labware
+    on the deck costs one directory listing rather than a stat per file.
+    """
+    try:
+        mtime = calibration_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return frozenset()
+    cached = _calibration_listings.get(calibration_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    names = frozenset(entry.name for entry in os.scandir(calibration_path))
+    _calibration_listings[calibration_path] = (mtime, names)
+    return names
+
+
+def _invalidate_calibration_files(calibration_path: Path):
+    _calibration_listings.pop(calibration_path, None)
+
+
 def _get_labware_offset_path(labware: Labware):
     calibration_path = CONFIG['labware_calibration_offsets_dir_v2']
-    calibration_path.mkdir(parents=True, exist_ok=True)
-
     parent_id = _get_parent_identifier(labware.parent)
-    labware_hash = _hash_labware_def(labware._definition)
+    labware_hash = _get_labware_hash(labware._definition)
     return calibration_path/f'{labware_hash}{parent_id}.json'
 
 
+def _write_calibration_file(labware_offset_path: Path, calibration_data):
+    # Always check: the directory may be deleted (for instance by a
+    # calibration reset) while the process runs
+    labware_offset_path.parent.mkdir(parents=True, exist_ok=True)
+    with labware_offset_path.open('w') as f:
+        json.dump(calibration_data, f)
+    _invalidate_calibration_files(labware_offset_path.parent)
+
+
 def save_calibration(labware: Labware, delta: Point):
     """
     Function to be used whenever an updated delta is found for the first well
@@ -869,8 +1022,7 @@ def save_calibration(labware: Labware, delta: Point):
     labware_offset_path = _get_labware_offset_path(labware)
     calibration_data = _helper_offset_data_format(
         str(labware_offset_path), delta)
-    with labware_offset_path.open('w') as f:
-        json.dump(calibration_data, f)
+    _write_calibration_file(labware_offset_path, calibration_data)
     labware.set_calibration(delta)
 
 
@@ -884,8 +1036,7 @@ def save_tip_length(labware: Labware, length: float):
     labware_offset_path = _get_labware_offset_path(labware)
     calibration_data = _helper_tip_length_data_format(
         str(labware_offset_path), length)
-    with labware_offset_path.open('w') as f:
-        json.dump(calibration_data, f)
+    _write_calibration_file(labware_offset_path, calibration_data)
     labware.tip_length = length
 
 
@@ -894,7 +1045,8 @@ def load_calibration(labware: Labware):
     Look up a calibration if it exists and apply it to the given labware.
     """
     labware_offset_path = _get_labware_offset_path(labware)
-    if labware_offset_path.exists():
+    if labware_offset_path.name in _calibration_files(
+            labware_offset_path.parent):
         calibration_data = _read_file(str(labware_offset_path))
         offset_array = calibration_data['default']['offset']
         offset = Point(x=offset_array[0], y=offset_array[1], z=offset_array[2])
@@ -987,12 +1139,84 @@ def save_definition(
     Path(def_path).parent.mkdir(parents=True, exist_ok=True)
     with open(def_path, 'w') as f:
         json.dump(labware_def, f)
+    _clear_definition_caches()
 
 
 def delete_all_custom_labware() -> None:
     custom_def_dir = CONFIG['labware_user_definitions_dir_v2']
     if custom_def_dir.is_dir():
         shutil.rmtree(custom_def_dir)
+    _clear_definition_caches()
+
+
+def _clear_definition_caches():
+    _definition_index.cache_clear()
+    _read_definition.cache_clear()
+
+
+def _index_definitions_in(
+        namespace: str, namespace_dir: Path) -> List[Tuple[str, str, int]]:
+    """ List the (namespace, load name, version) of each definition file laid
+    out as namespace_dir/load_name/version.json
+    """
+    found = []
+    for def_file in namespace_dir.glob('*/*.json'):
+        try:
+            version = int(def_file.stem)
+        except ValueError:
+            continue
+        found.append((namespace, def_file.parent.name, version))
+    return found
+
+
+@functools.lru_cache(maxsize=4)
+def _definition_index(
+        user_defs_dir: Path) -> FrozenSet[Tuple[str, str, int]]:
+    """ Build an index of the (namespace, load name, version) of all the
+    labware definitions available, both bundled and custom.
+
+    This is cached until definitions are saved or deleted through this
+    module. Definitions that appear on disk by other means are not in the
+    index, but are still found by :py:meth:`get_labware_definition`.
+    """
+    bundle = data_bundle.get_bundle()
+    if bundle:
+        prefix = STANDARD_DEFS_NAME + '/'
+        index = [(OPENTRONS_NAMESPACE, load_name, int(version_file[:-5]))
+                 for load_name, version_file in (
+                     name[len(prefix):].split('/')
+                     for name in bundle.names() if name.startswith(prefix))]
+    else:
+        index = _index_definitions_in(
+            OPENTRONS_NAMESPACE, STANDARD_DEFS_PATH)
+    if user_defs_dir.is_dir():
+        for namespace_dir in user_defs_dir.iterdir():
+            if namespace_dir.is_dir():
+                index.extend(_index_definitions_in(
+                    namespace_dir.name, namespace_dir))
+    return frozenset(index)
+
+
+@functools.lru_cache(maxsize=DEFINITION_CACHE_SIZE)
+def _read_definition(def_path: Path) -> Dict[str, Any]:
+    try:
+        bundled = def_path.relative_to(STANDARD_DEFS_PATH)
+    except ValueError:
+        # A custom definition, which is never in the bundle
+        with open(def_path, 'r') as f:
+            return json.load(f)
+    return data_bundle.load_shared_data(
+        f'{STANDARD_DEFS_NAME}/{bundled.as_posix()}')
+
+
+def _copy_definition(obj: Any) -> Any:
+    """ Copy a parsed json object; much quicker than :py:func:`copy.deepcopy`
+    since only dicts and lists need copying """
+    if isinstance(obj, dict):
+        return {k: _copy_definition(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_copy_definition(v) for v in obj]
+    return obj
 
 
 def get_labware_definition(
@@ -1009,12 +1233,33 @@ def get_labware_definition(
         If unspecified, will search 'opentrons' then 'custom_beta'
     :param int version: The version of the labware definition. If unspecified,
         will use version 1.
+
+    The returned definition is the caller's own copy, and may be modified.
+    """
+    return _copy_definition(
+        _shared_labware_definition(load_name, namespace, version))
+
+
+def _shared_labware_definition(
+    load_name: str,
+    namespace: str = None,
+    version: int = 1
+) -> Dict[str, Any]:
+    """ Like :py:meth:`get_labware_definition`, but the parsed definition is
+    cached and shared with every other caller, so it must not be modified.
+    Loading labware uses this, which lets the definition's hash be memoized.
     """
     load_name = load_name.lower()
     if namespace is None:
-        for fallback_namespace in [OPENTRONS_NAMESPACE, CUSTOM_NAMESPACE]:
+        index = _definition_index(CONFIG['labware_user_definitions_dir_v2'])
+        fallbacks = [OPENTRONS_NAMESPACE, CUSTOM_NAMESPACE]
+        # Only fall back to looking through every namespace on disk if the
+        # index does not know about this labware
+        indexed = [ns for ns in fallbacks
+                   if (ns, load_name, version) in index]
+        for fallback_namespace in indexed or fallbacks:
             try:
-                return get_labware_definition(
+                return _shared_labware_definition(
                     load_name, fallback_namespace, version)
             except (FileNotFoundError):
                 pass
@@ -1027,8 +1272,7 @@ def get_labware_definition(
     def_path = _get_path_to_labware(load_name, namespace, version)
 
     try:
-        with open(def_path, 'r') as f:
-            labware_def = json.load(f)
+        labware_def = _read_definition(def_path)
     except FileNotFoundError:
         raise FileNotFoundError(
             f'Labware "{load_name}" not found with version {version} ' +
@@ -1063,7 +1307,7 @@ def load(
     :param int version: The version of the labware definition. If unspecified,
         will use version 1.
     """
-    definition = get_labware_definition(load_name, namespace, version)
+    definition = _shared_labware_definition(load_name, namespace, version)
     return load_from_definition(definition, parent, label)
 
 
@@ -1102,6 +1346,7 @@ def clear_calibrations():
             target.unlink()
     except FileNotFoundError:
         pass
+    _invalidate_calibration_files(calibration_path)
 
 
 def load_module_from_definition(
@@ -1137,10 +1382,12 @@ def load_module(name: str, parent: Location) -> ModuleGeometry:
                    the front and left most point of the outside of the module
                    is (often the front-left corner of a slot on the deck).
     """
-    def_path = 'shared_data/module/definitions/1.json'
-    module_def = json.loads(  # type: ignore
-        pkgutil.get_data('opentrons', def_path))
-    return load_module_from_definition(module_def[name], parent)
+    return load_module_from_definition(_module_definitions()[name], parent)
+
+
+@functools.lru_cache(maxsize=None)
+def _module_definitions() -> Dict[str, Any]:
+    return data_bundle.load_shared_data('module/definitions/1.json')
 
 
 def quirks_from_any_parent(
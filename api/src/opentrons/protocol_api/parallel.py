@@ -0,0 +1,55 @@
+""" opentrons.protocol_api.parallel: letting module commands run alongside
+the rest of a protocol.
+
+Inside a :py:meth:`.ProtocolContext.parallel` block, module commands that
+mostly wait (heating, cooling, holding a temperature, running a profile) are
+started on the module's own event loop and the protocol goes on to its next
+command right away. Commands to the same module still run in the order they
+were given, and the block waits for all of them when it ends.
+"""
+import concurrent.futures
+from typing import Any, Dict
+
+
+class ParallelBlock:
+    """ The module commands started in one parallel block.
+
+    Commands to different modules (and everything the pipettes do) are
+    treated as independent of each other. Where a step depends on a module,
+    declare it with :py:meth:`wait_for` before that step.
+    """
+    def __init__(self) -> None:
+        # The last command started on each module. Starting a command waits
+        # for the one before it, so this is all that can still be running.
+        self._running: Dict[Any, concurrent.futures.Future] = {}
+
+    def submit(self, module: Any, hw_module: Any, method: str,
+               *args, **kwargs) -> concurrent.futures.Future:
+        """ Start `method` of `hw_module` (a synchronous adapter for the
+        hardware module of `module`) once the command before it on the same
+        module is done, without waiting for it to finish.
+        """
+        self.wait_for(module)
+        fut = hw_module.call_async(method, *args, **kwargs)
+        self._running[module] = fut
+        return fut
+
+    def wait_for(self, *modules: Any):
+        """ Block until the commands started on `modules` are done.
+
+        :param modules: The module contexts to wait for. If none are given,
+                        wait for every module.
+        :raises: The first error raised by one of those commands
+        """
+        waiting = modules or tuple(self._running)
+        for module in waiting:
+            fut = self._running.pop(module, None)
+            if fut is not None:
+                fut.result()
+
+    def cancel(self):
+        """ Stop waiting for the commands started in the block. Commands
+        already sent to a module are not undone. """
+        running, self._running = self._running, {}
+        for fut in running.values():
+            fut.cancel()
@@ -0,0 +1,176 @@
+""" opentrons.protocol_api.transfer_paths: ordering the stops of a transfer
+so that the gantry travels less between them.
+
+A stop is somewhere the pipette has to go during a transfer, given as the
+point where it starts and the point where it ends: a single dispense starts
+and ends at its well, while one source-to-destination transfer starts at its
+source and ends at its destination. The distance of a path is the sum of the
+straight-line distances from the end of each stop to the start of the next.
+"""
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np  # type: ignore
+
+from opentrons.types import Point
+
+#: Where a stop starts and where it ends
+Stop = Tuple[Point, Point]
+
+#: The most passes of 2-opt to make over one order
+MAX_IMPROVEMENT_PASSES = 20
+
+
+def distance(a: Point, b: Point) -> float:
+    return math.sqrt((a.x - b.x) ** 2 + (a.y - b.y) ** 2 + (a.z - b.z) ** 2)
+
+
+def path_length(stops: Sequence[Stop],
+                start: Optional[Point] = None,
+                end: Optional[Point] = None) -> float:
+    """ The distance travelled visiting `stops` in order, coming from `start`
+    and going to `end` afterwards if they are given
+    """
+    total = 0.0
+    position = start
+    for stop_start, stop_end in stops:
+        if position is not None:
+            total += distance(position, stop_start)
+        position = stop_end
+    if end is not None and position is not None:
+        total += distance(position, end)
+    return total
+
+
+def shortest_order(stops: Sequence[Stop],
+                   start: Optional[Point] = None,
+                   end: Optional[Point] = None) -> List[int]:
+    """
+    Find a short order to visit `stops` in, coming from `start` and going to
+    `end` afterwards if they are given.
+
+    The order is built by always going to the nearest stop not yet visited
+    and then improved with 2-opt (reversing runs of stops while that makes
+    the path shorter). This is a heuristic, so the order is not necessarily
+    the shortest there is, but it is never longer than visiting the stops in
+    the order they were given.
+
+    :returns: The indices of `stops`, in the order to visit them
+    """
+    count = len(stops)
+    if count < 2:
+        return list(range(count))
+    starts = np.array([stop[0] for stop in stops], dtype=float)
+    ends = np.array([stop[1] for stop in stops], dtype=float)
+    # costs[a][b]: the distance from the end of stop a to the start of b
+    costs = np.linalg.norm(
+        ends[:, np.newaxis, :] - starts[np.newaxis, :, :], axis=2).tolist()
+    from_start = _distances_from(start, starts)
+    to_end = _distances_from(end, ends)
+
+    order = _nearest_neighbor(costs, from_start)
+    _two_opt(order, costs, from_start, to_end)
+
+    given = list(range(count))
+    if _order_length(order, costs, from_start, to_end) \
+            >= _order_length(given, costs, from_start, to_end):
+        return given
+    return order
+
+
+def _distances_from(point: Optional[Point],
+                    points: np.ndarray) -> Optional[List[float]]:
+    if point is None:
+        return None
+    return np.linalg.norm(points - np.array(point, dtype=float),
+                          axis=1).tolist()
+
+
+def _nearest_neighbor(costs: List[List[float]],
+                      from_start: Optional[List[float]]) -> List[int]:
+    remaining = set(range(len(costs)))
+    if from_start is None:
+        current = 0
+    else:
+        distances = from_start
+        current = min(remaining, key=lambda stop: distances[stop])
+    order = [current]
+    remaining.remove(current)
+    while remaining:
+        row = costs[current]
+        current = min(remaining, key=lambda stop: row[stop])
+        order.append(current)
+        remaining.remove(current)
+    return order
+
+
+def _order_length(order: List[int],
+                  costs: List[List[float]],
+                  from_start: Optional[List[float]],
+                  to_end: Optional[List[float]]) -> float:
+    total = sum(costs[a][b] for a, b in zip(order, order[1:]))
+    if from_start is not None:
+        total += from_start[order[0]]
+    if to_end is not None:
+        total += to_end[order[-1]]
+    return total
+
+
+def _two_opt(order: List[int],
+             costs: List[List[float]],
+             from_start: Optional[List[float]],
+             to_end: Optional[List[float]]):
+    """ Reverse runs of `order` in place while that makes it shorter.
+
+    Stops start and end in different places, so reversing a run also
+    changes the cost of every step inside it. Running totals of the cost of
+    each step forwards and backwards make checking a reversal constant time.
+    """
+    count = len(order)
+    for _ in range(MAX_IMPROVEMENT_PASSES):
+        improved = False
+        forward, backward = _running_costs(order, costs)
+        for i in range(count - 1):
+            before = order[i - 1] if i else None
+            for j in range(i + 1, count):
+                after = order[j + 1] if j < count - 1 else None
+                change = (backward[j] - backward[i]) \
+                    - (forward[j] - forward[i]) \
+                    + _edge(before, order[j], costs, from_start, None) \
+                    - _edge(before, order[i], costs, from_start, None) \
+                    + _edge(order[i], after, costs, None, to_end) \
+                    - _edge(order[j], after, costs, None, to_end)
+                if change < -1e-9:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    forward, backward = _running_costs(order, costs)
+                    improved = True
+        if not improved:
+            return
+
+
+def _running_costs(
+        order: List[int],
+        costs: List[List[float]]) -> Tuple[List[float], List[float]]:
+    """ The total cost of the steps between the stops at positions 0 and k
+    of `order`, going forwards and (for each step) backwards """
+    forward = [0.0]
+    backward = [0.0]
+    for a, b in zip(order, order[1:]):
+        forward.append(forward[-1] + costs[a][b])
+        backward.append(backward[-1] + costs[b][a])
+    return forward, backward
+
+
+def _edge(a: Optional[int], b: Optional[int],
+          costs: List[List[float]],
+          from_start: Optional[List[float]],
+          to_end: Optional[List[float]]) -> float:
+    """ The cost of going from stop `a` to stop `b`, where None for `a` is the
+    start of the path and None for `b` is its end """
+    if a is not None and b is not None:
+        return costs[a][b]
+    if b is not None and from_start is not None:
+        return from_start[b]
+    if a is not None and to_end is not None:
+        return to_end[a]
+    return 0.0
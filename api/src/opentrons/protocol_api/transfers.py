@@ -1,13 +1,27 @@
 import enum
-from typing import (Any, List, Optional, Union, NamedTuple,
-                    Callable, Generator, Iterator, Tuple,
+import itertools
+import logging
+from operator import itemgetter
+from typing import (Any, Dict, List, Optional, Union, NamedTuple,
+                    Callable, Generator, Iterable, Iterator, Tuple,
                     TYPE_CHECKING)
 from .labware import Well
+from . import transfer_paths
 from opentrons import types
 
 if TYPE_CHECKING:
     from .contexts import InstrumentContext  #noqa (F501)
 
+MODULE_LOG = logging.getLogger(__name__)
+
+#: How many transfers are reordered together when optimizing the path of a
+#: transfer (see :py:attr:`.Transfer.optimize_path`)
+PATH_WINDOW = 96
+
+#: How many aspirations are repacked together when packing dispenses (see
+#: :py:attr:`.Transfer.pack_dispenses`)
+PACKING_WINDOW = 16
+
 
 class MixStrategy(enum.Enum):
     BOTH = enum.auto()
@@ -54,6 +68,8 @@ class Transfer(NamedTuple):
     drop_tip_strategy: DropTipStrategy = DropTipStrategy.TRASH
     blow_out_strategy: BlowOutStrategy = BlowOutStrategy.NONE
     touch_tip_strategy: TouchTipStrategy = TouchTipStrategy.NEVER
+    optimize_path: bool = False
+    pack_dispenses: bool = False
 
 
 Transfer.new_tip.__doc__ = """
@@ -180,6 +196,34 @@ Transfer.touch_tip_strategy.__doc__ = """
     :py:attr:`.TransferOptions.touch_tip`.
     """
 
+Transfer.optimize_path.__doc__ = """
+    Whether to reorder wells to shorten the distance the gantry travels.
+
+    In a distribute, the dispenses made from each aspiration are reordered.
+    In a transfer, source to destination pairs are reordered in groups of
+    up to 96, unless a well in a group is both a source and a destination
+    (in which case the order might matter and that group is left alone).
+    Which liquid goes where, and in what volume, does not change. The
+    distance before and after is logged, and kept in
+    :py:attr:`.TransferPlan.travel_distance`.
+    """
+
+Transfer.pack_dispenses.__doc__ = """
+    Whether to regroup the volumes of a distribute or consolidate so they
+    need as few aspirations as possible.
+
+    Normally each aspiration is filled with the next volumes in order until
+    the next one does not fit. With this option, the aspirations are
+    repacked 16 at a time, largest volumes first, into the first aspiration
+    with room left (first-fit decreasing), while still leaving room for the
+    disposal volume and air gaps. This changes the order wells are visited
+    in, so only use it when that order does not matter. The repacked
+    aspirations are only used if there are fewer of them and none is
+    smaller than the pipette's minimum volume. The number of aspirations
+    saved is logged, and kept in
+    :py:attr:`.TransferPlan.aspirations_saved`.
+    """
+
 
 class PickUpTipOpts(NamedTuple):
     """
@@ -345,6 +389,36 @@ TransferOptions.dispense.__doc__ = """
     """
 
 
+class TransferStep(NamedTuple):
+    """
+    One call to make on the :py:class:`.InstrumentContext` to carry out a
+    :py:class:`TransferPlan`: ``getattr(instr, method)(*args, **kwargs)``
+    """
+    method: str
+    args: List[Any]
+    kwargs: Dict[str, Any]
+
+
+class _WellSequence:
+    """ A well, a list of wells or a list of lists of wells, iterated as one
+    flat sequence of wells without copying them into a new list
+    """
+    def __init__(self, wells) -> None:
+        if isinstance(wells, Well):
+            wells = [wells]
+        if isinstance(wells, List) and wells and isinstance(wells[0], List):
+            self._lists = wells
+        else:
+            self._lists = [wells]
+        self._length = sum(len(well_list) for well_list in self._lists)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Well]:
+        return itertools.chain.from_iterable(self._lists)
+
+
 class TransferPlan:
     """ Calculate and carry state for an arbitrary transfer
 
@@ -352,7 +426,12 @@ class TransferPlan:
 
     It handles calculations based on pipette channels, tip management, and all
     the various little commands that can be involved in a transfer. It can be
-    iterated to resolve methods to call to execute the plan.
+    iterated to resolve methods to call to execute the plan, as
+    :py:class:`TransferStep` s.
+
+    The plan is worked out as it is iterated: sources, destinations and
+    volumes are read one transfer at a time, so the memory it uses does not
+    depend on the size of the transfer.
     """
     def __init__(self,
                  volume,
@@ -375,25 +454,14 @@ class TransferPlan:
         # i. if using multi-channel pipette,
         # and the source or target is a row/column of Wells (i.e list of Wells)
         # then avoid iterating through its Wells.
-        # ii. if using single channel pipettes, flatten a multi-dimensional
-        # list of Wells into a 1 dimensional list of Wells
+        # ii. if using single channel pipettes, iterate a multi-dimensional
+        # list of Wells as a 1 dimensional sequence of Wells
         if self._instr.hw_pipette['channels'] > 1:
             sources, dests = self._multichannel_transfer(sources, dests)
         else:
-            if isinstance(sources, List) and isinstance(sources[0], List):
-                # Source is a List[List[Well]]
-                sources = [well for well_list in sources for well in well_list]
-            elif isinstance(sources, Well):
-                sources = [sources]
-            if isinstance(dests, List) and isinstance(dests[0], List):
-                # Dest is a List[List[Well]]
-                dests = [well for well_list in dests for well in well_list]
-            elif isinstance(dests, Well):
-                dests = [dests]
-
-        total_xfers = max(len(sources), len(dests))
-
-        self._volumes = self._create_volume_list(volume, total_xfers)
+            sources = _WellSequence(sources)
+            dests = _WellSequence(dests)
+
         self._sources = sources
         self._dests = dests
         self._options = options or TransferOptions()
@@ -404,6 +472,12 @@ class TransferPlan:
         self._mix_before_opts = self._options.mix.mix_before
         self._mix_after_opts = self._options.mix.mix_after
         self._max_volume = max_volume
+        # The (before, after) distance between the wells reordered so far
+        self._travel = (0.0, 0.0)
+        self._aspirations_saved = 0
+        self._volume = volume
+        self._total_xfers = max(len(sources), len(dests))
+        self._check_volumes()
 
         if not mode:
             if len(sources) < len(dests):
@@ -415,17 +489,40 @@ class TransferPlan:
         else:
             self._mode = TransferMode[mode.upper()]
 
+    @property
+    def travel_distance(self) -> Tuple[float, float]:
+        """ The distance (in mm) between the wells reordered by
+        :py:attr:`.Transfer.optimize_path`, in the order given and in the
+        order planned. This covers the part of the plan iterated so far.
+        """
+        return self._travel
+
+    @property
+    def aspirations_saved(self) -> int:
+        """ How many fewer aspirations :py:attr:`.Transfer.pack_dispenses`
+        planned, for the part of the plan iterated so far """
+        return self._aspirations_saved
+
     def __iter__(self):
+        self._travel = (0.0, 0.0)
+        self._aspirations_saved = 0
         if self._strategy.new_tip == types.TransferTipPolicy.ONCE:
-            yield self._format_dict('pick_up_tip', kwargs=self._tip_opts)
+            yield self._format_step('pick_up_tip', kwargs=self._tip_opts)
         yield from {TransferMode.CONSOLIDATE: self._plan_consolidate,
                     TransferMode.DISTRIBUTE: self._plan_distribute,
                     TransferMode.TRANSFER: self._plan_transfer}[self._mode]()
         if self._strategy.new_tip == types.TransferTipPolicy.ONCE:
             if self._strategy.drop_tip_strategy == DropTipStrategy.RETURN:
-                yield self._format_dict('return_tip')
+                yield self._format_step('return_tip')
             else:
-                yield self._format_dict('drop_tip')
+                yield self._format_step('drop_tip')
+        if self._strategy.optimize_path:
+            MODULE_LOG.info(
+                'Optimized transfer path from {:.1f}mm to {:.1f}mm'.format(
+                    *self._travel))
+        if self._strategy.pack_dispenses:
+            MODULE_LOG.info('Packing dispenses saved {} aspirations'.format(
+                self._aspirations_saved))
 
     def _plan_transfer(self):
         """
@@ -458,14 +555,19 @@ class TransferPlan:
             -> Touch tip -> Dispense air gap -> Dispense -> Mix if empty ->
             -> Blow out -> Touch tip -> Drop tip*
         """
+        volumes: Iterator[float] = self._volumes()
+        targets: Iterator[Tuple[Any, Any]] = zip(self._sources, self._dests)
+        if self._strategy.optimize_path:
+            volumes, targets = _unzip(
+                self._reorder_transfers(zip(volumes, targets)))
         plan_iter = self._expand_for_volume_constraints(
-            self._volumes, zip(self._sources, self._dests),
+            volumes, targets,
             self._instr.max_volume
             - self._strategy.disposal_volume
             - self._strategy.air_gap)
         for step_vol, (src, dest) in plan_iter:
             if self._strategy.new_tip == types.TransferTipPolicy.ALWAYS:
-                yield self._format_dict('pick_up_tip', kwargs=self._tip_opts)
+                yield self._format_step('pick_up_tip', kwargs=self._tip_opts)
             max_vol = self._max_volume - \
                 self._strategy.disposal_volume - self._strategy.air_gap
             xferred_vol = 0
@@ -521,38 +623,96 @@ class TransferPlan:
         # First method keeps distribute consistent with current behavior while
         # the other maintains consistency in default behaviors of all functions
         plan_iter = self._expand_for_volume_constraints(
-            self._volumes, self._dests,
+            self._volumes(), self._dests,
             self._instr.max_volume
             - self._strategy.disposal_volume
             - self._strategy.air_gap)
+        source = next(iter(self._sources))
+
+        def fits(grouped_volume, grouped_count, volume):
+            return (grouped_volume +
+                    self._strategy.disposal_volume +
+                    self._strategy.air_gap +
+                    volume) <= self._max_volume
 
-        done = False
-        current_xfer = next(plan_iter)
         if self._strategy.new_tip == types.TransferTipPolicy.ALWAYS:
-            yield self._format_dict('pick_up_tip', kwargs=self._tip_opts)
-        while not done:
-            asp_grouped = []
-            try:
-                while (sum(a[0] for a in asp_grouped) +
-                       self._strategy.disposal_volume +
-                       self._strategy.air_gap +
-                       current_xfer[0]) <= self._max_volume:
-                    asp_grouped.append(current_xfer)
-                    current_xfer = next(plan_iter)
-            except StopIteration:
-                done = True
+            yield self._format_step('pick_up_tip', kwargs=self._tip_opts)
+        for asp_grouped in self._aspiration_groups(plan_iter, fits):
+            if self._strategy.optimize_path:
+                asp_grouped = self._reorder_dispenses(asp_grouped, source)
             yield from self._aspirate_actions(sum(a[0] for a in asp_grouped) +
                                               self._strategy.disposal_volume,
-                                              self._sources[0])
+                                              source)
             for step in asp_grouped:
                 yield from self._dispense_actions(step[0], step[1],
                                                   step is not asp_grouped[-1])
         yield from self._new_tip_action()
 
+    def _aspiration_groups(self, xfers: Iterator[Tuple[float, Any]],
+                           fits: '_Fits') -> Iterator[List[Tuple[float, Any]]]:
+        """ Group (volume, well) transfers into the ones to make with each
+        aspiration, repacking them if :py:attr:`.Transfer.pack_dispenses`
+        """
+        groups = _greedy_groups(xfers, fits)
+        if not self._strategy.pack_dispenses:
+            yield from groups
+            return
+        while True:
+            window = list(itertools.islice(groups, PACKING_WINDOW))
+            if not window:
+                return
+            packed = _first_fit_decreasing(
+                [xfer for group in window for xfer in group], fits)
+            if len(packed) < len(window) and all(
+                    _fits_in_order(group, fits)
+                    and sum(a[0] for a in group)
+                    + (self._strategy.disposal_volume or 0)
+                    >= self._instr.min_volume
+                    for group in packed):
+                self._aspirations_saved += len(window) - len(packed)
+                window = packed
+            yield from window
+
+    def _reorder_transfers(self, xfers: Iterator[Tuple[float, Tuple]]):
+        """ Reorder (volume, (source, dest)) transfers to shorten the path
+        between them, :py:data:`PATH_WINDOW` at a time """
+        position = None
+        while True:
+            window = list(itertools.islice(xfers, PATH_WINDOW))
+            if not window:
+                return
+            stops = [(_position(src), _position(dest))
+                     for _, (src, dest) in window]
+            sources = {src for _, (src, _) in window}
+            if not any(dest in sources for _, (_, dest) in window):
+                order = self._shortest_order(stops, position, None)
+                window = [window[idx] for idx in order]
+                stops = [stops[idx] for idx in order]
+            position = stops[-1][1]
+            yield from window
+
+    def _reorder_dispenses(self, dispenses: List[Tuple[float, Any]],
+                           source: Any) -> List[Tuple[float, Any]]:
+        """ Reorder the (volume, dest) dispenses made from one aspiration to
+        shorten the path from the source, between them and back """
+        position = _position(source)
+        stops = [(_position(dest), _position(dest)) for _, dest in dispenses]
+        order = self._shortest_order(stops, position, position)
+        return [dispenses[idx] for idx in order]
+
+    def _shortest_order(self, stops, start, end) -> List[int]:
+        order = transfer_paths.shortest_order(stops, start, end)
+        before, after = self._travel
+        self._travel = (
+            before + transfer_paths.path_length(stops, start, end),
+            after + transfer_paths.path_length(
+                [stops[idx] for idx in order], start, end))
+        return order
+
     @staticmethod
     def _expand_for_volume_constraints(
-            volumes: Iterator[float],
-            targets: Iterator[Well],
+            volumes: Iterable[float],
+            targets: Iterable[Any],
             max_volume: float) -> Generator[Tuple[float, Well], None, None]:
         """ Split a sequence of proposed transfers if necessary to keep each
         transfer under the given max volume.
@@ -605,44 +765,38 @@ class TransferPlan:
                .. Aspirate -> .....*
         """
         plan_iter = self._expand_for_volume_constraints(
-            self._volumes, self._sources, self._instr.max_volume)
-        current_xfer = next(plan_iter)
+            self._volumes(), self._sources, self._instr.max_volume)
+        dest = next(iter(self._dests))
+
+        def fits(grouped_volume, grouped_count, volume):
+            return (grouped_volume +
+                    self._strategy.disposal_volume +
+                    self._strategy.air_gap * grouped_count +
+                    volume) <= self._max_volume
+
         if self._strategy.new_tip == types.TransferTipPolicy.ALWAYS:
-            yield self._format_dict('pick_up_tip', kwargs=self._tip_opts)
-        done = False
-        while not done:
-            asp_grouped = []
-            try:
-                while (sum([a[0] for a in asp_grouped]) +
-                       self._strategy.disposal_volume +
-                       self._strategy.air_gap * len(asp_grouped) +
-                       current_xfer[0]) <= self._max_volume:
-                    asp_grouped.append(current_xfer)
-                    current_xfer = next(plan_iter)
-            except StopIteration:
-                done = True
-            if not asp_grouped:
-                break
+            yield self._format_step('pick_up_tip', kwargs=self._tip_opts)
+        for asp_grouped in self._aspiration_groups(plan_iter, fits):
             # Q: What accounts as disposal volume in a consolidate action?
-            # yield self._format_dict('aspirate',
+            # yield self._format_step('aspirate',
             #                         self._strategy.disposal_volume, loc)
             for step in asp_grouped:
                 yield from self._aspirate_actions(step[0], step[1])
             yield from self._dispense_actions(
                 sum([a[0] + self._strategy.air_gap for a in asp_grouped])
                 - self._strategy.air_gap,
-                self._dests[0])
+                dest)
         yield from self._new_tip_action()
 
     def _aspirate_actions(self, vol, loc):
         yield from self._before_aspirate()
-        yield self._format_dict('aspirate',
+        yield self._format_step('aspirate',
                                 [vol, loc, self._options.aspirate.rate])
         yield from self._after_aspirate()
 
     def _dispense_actions(self, vol, loc, is_disp_next=False):
         yield from self._before_dispense()
-        yield self._format_dict('dispense',
+        yield self._format_step('dispense',
                                 [vol, loc, self._options.dispense.rate])
         yield from self._after_dispense(loc, is_disp_next)
 
@@ -650,17 +804,17 @@ class TransferPlan:
         if self._strategy.mix_strategy == MixStrategy.BEFORE or \
                 self._strategy.mix_strategy == MixStrategy.BOTH:
             if self._instr.current_volume == 0:
-                yield self._format_dict('mix', kwargs=self._mix_before_opts)
+                yield self._format_step('mix', kwargs=self._mix_before_opts)
 
     def _after_aspirate(self):
         if self._strategy.air_gap:
-            yield self._format_dict('air_gap', [self._strategy.air_gap])
+            yield self._format_step('air_gap', [self._strategy.air_gap])
         if self._strategy.touch_tip_strategy == TouchTipStrategy.ALWAYS:
-            yield self._format_dict('touch_tip', kwargs=self._touch_tip_opts)
+            yield self._format_step('touch_tip', kwargs=self._touch_tip_opts)
 
     def _before_dispense(self):
         if self._strategy.air_gap:
-            yield self._format_dict('dispense', [self._strategy.air_gap])
+            yield self._format_step('dispense', [self._strategy.air_gap])
 
     def _after_dispense(self, loc, is_disp_next=False):  # noqa(C901)
         # This sequence of actions is subject to change
@@ -671,60 +825,67 @@ class TransferPlan:
                 # If we're empty, then this is when after mixes come into play
                 if self._strategy.mix_strategy == MixStrategy.AFTER or \
                         self._strategy.mix_strategy == MixStrategy.BOTH:
-                    yield self._format_dict('mix', kwargs=self._mix_after_opts)
+                    yield self._format_step('mix', kwargs=self._mix_after_opts)
                 if self._strategy.blow_out_strategy \
                    == BlowOutStrategy.DEST_IF_EMPTY:
-                    yield self._format_dict('blow_out', [loc])
+                    yield self._format_step('blow_out', [loc])
             # If we're not empty but we're about to aspirate, we need a
             # blowout.
             if self._strategy.blow_out_strategy == BlowOutStrategy.TRASH:
-                yield self._format_dict('blow_out', [
+                yield self._format_step('blow_out', [
                     self._instr.trash_container.wells()[0]])
             elif self._strategy.blow_out_strategy == \
                     BlowOutStrategy.CUSTOM_LOCATION:
-                yield self._format_dict('blow_out', kwargs=self._blow_opts)
+                yield self._format_step('blow_out', kwargs=self._blow_opts)
             elif self._strategy.disposal_volume:
-                yield self._format_dict('blow_out', [
+                yield self._format_step('blow_out', [
                     self._instr.trash_container.wells()[0]])
         else:
             # Used by distribute
             if self._strategy.air_gap:
-                yield self._format_dict('air_gap', [self._strategy.air_gap])
+                yield self._format_step('air_gap', [self._strategy.air_gap])
         if self._strategy.touch_tip_strategy == TouchTipStrategy.ALWAYS:
-            yield self._format_dict('touch_tip', kwargs=self._touch_tip_opts)
+            yield self._format_step('touch_tip', kwargs=self._touch_tip_opts)
 
     def _new_tip_action(self):
         if self._strategy.new_tip == types.TransferTipPolicy.ALWAYS:
             if self._strategy.drop_tip_strategy == DropTipStrategy.RETURN:
-                yield self._format_dict('return_tip')
+                yield self._format_step('return_tip')
             else:
-                yield self._format_dict('drop_tip')
+                yield self._format_step('drop_tip')
 
-    def _format_dict(self, method: str,
-                     args: List = None, kwargs: Any = None):
+    def _format_step(self, method: str,
+                     args: List = None, kwargs: Any = None) -> TransferStep:
         if kwargs:
             params = {key: val for key, val in kwargs._asdict().items() if val}
         else:
             params = {}
         if not args:
             args = []
-        return {'method': method, 'args': args, 'kwargs': params}
-
-    def _create_volume_list(self, volume, total_xfers):
+        return TransferStep(method, args, params)
+
+    def _check_volumes(self):
+        volume = self._volume
+        if isinstance(volume, (float, int, tuple)):
+            return
+        if not isinstance(volume, List):
+            raise TypeError("Volume expected as a number or List or"
+                            " tuple but got {}".format(volume))
+        elif not len(volume) == self._total_xfers:
+            raise RuntimeError("List of volumes should be equal to number "
+                               "of transfers")
+
+    def _volumes(self) -> Iterator[float]:
+        """ The volume of each transfer, in order """
+        volume = self._volume
         if isinstance(volume, (float, int)):
-            return [volume] * total_xfers
+            return itertools.repeat(volume, self._total_xfers)
         elif isinstance(volume, tuple):
             return self._create_volume_gradient(
-                volume[0], volume[-1], total_xfers,
+                volume[0], volume[-1], self._total_xfers,
                 self._strategy.gradient_function)
         else:
-            if not isinstance(volume, List):
-                raise TypeError("Volume expected as a number or List or"
-                                " tuple but got {}".format(volume))
-            elif not len(volume) == total_xfers:
-                raise RuntimeError("List of volumes should be equal to number "
-                                   "of transfers")
-            return volume
+            return iter(volume)
 
     def _create_volume_gradient(self, min_v, max_v, total, gradient=None):
 
@@ -736,7 +897,7 @@ class TransferPlan:
             rel_y = gradient(rel_x) if gradient else rel_x
             return (rel_y * diff_vol) + min_v
 
-        return [_map_volume(i) for i in range(total)]
+        return (_map_volume(i) for i in range(total))
 
     def _multichannel_transfer(self, s, d):
         # TODO: add a check for container being multi-channel compatible?
@@ -779,3 +940,73 @@ class TransferPlan:
 
     def _is_first_row(self, well: Well):
         return well in well.parent.rows()[0]
+
+
+def _position(target: Union[Well, types.Location]) -> types.Point:
+    if isinstance(target, types.Location):
+        return target.point
+    return target.top().point
+
+
+def _unzip(pairs: Iterator[Tuple]) -> Tuple[Iterator, Iterator]:
+    """ Split an iterator of pairs into an iterator of the first items and
+    one of the second items, which should be consumed together """
+    firsts, seconds = itertools.tee(pairs)
+    return (first for first, _ in firsts), (second for _, second in seconds)
+
+
+#: Whether a volume fits in an aspiration, given the total volume and the
+#: number of the transfers already in it
+_Fits = Callable[[float, int, float], bool]
+
+
+def _greedy_groups(xfers: Iterator[Tuple[float, Any]],
+                   fits: _Fits) -> Iterator[List[Tuple[float, Any]]]:
+    """ Fill each aspiration with transfers in order until the next one does
+    not fit """
+    group: List[Tuple[float, Any]] = []
+    grouped_volume: float = 0
+    for xfer in xfers:
+        if group and not fits(grouped_volume, len(group), xfer[0]):
+            yield group
+            group = []
+            grouped_volume = 0
+        group.append(xfer)
+        grouped_volume += xfer[0]
+    if group:
+        yield group
+
+
+def _first_fit_decreasing(
+        xfers: List[Tuple[float, Any]],
+        fits: _Fits) -> List[List[Tuple[float, Any]]]:
+    """ Pack transfers, largest first, into the first aspiration they fit
+    in. The aspirations keep the transfers in their original order, and are
+    ordered by their first transfer. """
+    groups: List[List[Tuple[int, Tuple[float, Any]]]] = []
+    volumes: List[float] = []
+    largest_first = sorted(enumerate(xfers), key=lambda item: -item[1][0])
+    for index, xfer in largest_first:
+        for group_index, group in enumerate(groups):
+            if fits(volumes[group_index], len(group), xfer[0]):
+                group.append((index, xfer))
+                volumes[group_index] += xfer[0]
+                break
+        else:
+            groups.append([(index, xfer)])
+            volumes.append(xfer[0])
+    for group in groups:
+        group.sort(key=itemgetter(0))
+    groups.sort(key=lambda group: group[0][0])
+    return [[xfer for _, xfer in group] for group in groups]
+
+
+def _fits_in_order(group: List[Tuple[float, Any]], fits: _Fits) -> bool:
+    """ Check a packed aspiration with the volumes added up in the order they
+    will be aspirated, as the planner does """
+    grouped_volume: float = 0
+    for count, (volume, _) in enumerate(group):
+        if not fits(grouped_volume, count, volume):
+            return False
+        grouped_volume += volume
+    return True
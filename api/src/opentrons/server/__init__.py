@@ -12,7 +12,9 @@ from aiohttp import web
 from opentrons.config import CONFIG
 from .rpc import RPCServer
 from .http import HTTPServer
+from .endpoints import update
 from opentrons.api.routers import MainRouter
+from opentrons.hardware_control.modules import UpdateManager
 import opentrons
 
 if TYPE_CHECKING:
@@ -102,6 +104,8 @@ def init(hardware: 'HardwareAPILike' = None):
         checked_hardware = opentrons.hardware
     app['com.opentrons.hardware'] = checked_hardware
     app['com.opentrons.motion_lock'] = ThreadedAsyncLock()
+    app[update.UPDATE_MANAGER_KEY] = UpdateManager(
+        checked_hardware, timeout=update.UPDATE_TIMEOUT)
     app['com.opentrons.rpc'] = RPCServer(
         app, MainRouter(
             checked_hardware, lock=app['com.opentrons.motion_lock']))
@@ -12,6 +12,7 @@ from opentrons.trackers import pose_tracker
 from opentrons.config import feature_flags as ff
 from opentrons.types import Mount, Point
 from opentrons.hardware_control.types import Axis, CriticalPoint
+from opentrons.hardware_control.modules import telemetry
 
 
 log = logging.getLogger(__name__)
@@ -183,6 +184,64 @@ async def get_module_data(request):
         return web.json_response({"message": "Module not found"}, status=404)
 
 
+async def get_module_history(request):
+    """
+    Query a module (by its serial number) for the temperatures its recent
+    polls recorded. Long windows are evenly thinned out.
+
+    Query parameters (all optional):
+    - since: the start of the window, in seconds since the epoch
+    - until: the end of the window, in seconds since the epoch
+    - points: the most samples to return (default 500)
+
+    Response shape example:
+        {"fields": ["timestamp", "temperature", "target", "lidTemp",
+                    "holdTime"],
+         "samples": [{"timestamp": 1565200000.1, "temperature": 94.9,
+                      "target": 95.0, "lidTemp": 105.0, "holdTime": 30},
+                     ...]}
+    """
+    hw = hw_from_req(request)
+    requested_serial = request.match_info['serial']
+    try:
+        since = _optional_query_number(request, 'since', float)
+        until = _optional_query_number(request, 'until', float)
+        points = _optional_query_number(request, 'points', int)
+    except ValueError as e:
+        return web.json_response({"message": str(e)}, status=400)
+
+    if ff.use_protocol_api_v2():
+        hw_mods = await hw.discover_modules()
+    else:
+        hw_mods = hw.attached_modules.values()
+
+    matching_mod = next(
+        (mod for mod in hw_mods
+         if mod.device_info.get('serial') == requested_serial
+         and hasattr(mod, 'telemetry')),
+        None)
+    if not matching_mod:
+        return web.json_response({"message": "Module not found"}, status=404)
+
+    kwargs = {} if points is None else {'max_points': points}
+    try:
+        samples = matching_mod.telemetry.history(since, until, **kwargs)
+    except ValueError as e:
+        return web.json_response({"message": str(e)}, status=400)
+    return web.json_response(
+        {'fields': list(telemetry.FIELDS), 'samples': samples}, status=200)
+
+
+def _optional_query_number(request, name, kind):
+    value = request.query.get(name)
+    if value is None:
+        return None
+    try:
+        return kind(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a number, not {value}')
+
+
 async def execute_module_command(request):
     """
     Execute a command on a given module by its serial number
@@ -1,11 +1,15 @@
 import logging
 import asyncio
+import os
 import tempfile
 from aiohttp import web
 from opentrons import modules
+from opentrons.config import feature_flags as ff
+from opentrons.hardware_control.modules import update_jobs
 
 log = logging.getLogger(__name__)
 UPDATE_TIMEOUT = 15
+UPDATE_MANAGER_KEY = 'com.opentrons.module_updates'
 
 
 async def update_module_firmware(request):
@@ -20,6 +24,10 @@ async def update_module_firmware(request):
     data = await request.post()
     module_serial = request.match_info['serial']
 
+    if ff.use_protocol_api_v2():
+        return await _update_module_firmware_v2(
+            request, module_serial, data['module_firmware'])
+
     res = await _update_module_firmware(request.app['com.opentrons.hardware'],
                                         module_serial,
                                         data['module_firmware'],
@@ -90,3 +98,105 @@ async def _upload_to_module(hw, serialnum, fw_filename, loop):
     if not res:
         res = {'message': 'Module {} not found'.format(serialnum)}
     return res
+
+
+async def start_module_update(request):
+    """
+    Start updating a module's firmware without waiting for the update to
+    finish. Accepts the same request as :py:func:`update_module_firmware`.
+    Several modules can be updated at once; follow their progress with
+    :py:func:`get_module_updates`.
+
+    Responds with status 202 and the state of the update (as in
+    :py:func:`get_module_updates`), or 404 if the module is not found, or 409
+    if the module is already being updated.
+    """
+    if not ff.use_protocol_api_v2():
+        return web.json_response(
+            {'message': 'Background module updates are not supported by'
+                        ' this version of the hardware controller'},
+            status=400)
+    data = await request.post()
+    try:
+        job = await _start_update(
+            request, request.match_info['serial'], data['module_firmware'])
+    except LookupError as e:
+        return web.json_response({'message': str(e)}, status=404)
+    except update_jobs.UpdateInProgressError as e:
+        return web.json_response({'message': str(e)}, status=409)
+    return web.json_response(job.to_dict(), status=202)
+
+
+async def get_module_updates(request):
+    """
+    The state of the latest firmware update of each module that has been
+    updated since the server started:
+
+    {
+        "updates": [
+            {
+                "serial": "...",
+                "name": "tempdeck",
+                "port": "/dev/modules/...",
+                "filename": "...",
+                "status": "preparing" | "flashing" | "succeeded" | "failed",
+                "progress": 0.0 - 1.0,
+                "message": "..."
+            }
+        ]
+    }
+    """
+    manager = request.app[UPDATE_MANAGER_KEY]
+    return web.json_response(
+        {'updates': [job.to_dict() for job in manager.jobs]}, status=200)
+
+
+async def _update_module_firmware_v2(request, module_serial, data):
+    try:
+        job = await _start_update(request, module_serial, data)
+    except LookupError as e:
+        return web.json_response({'message': str(e)}, status=404)
+    except update_jobs.UpdateInProgressError as e:
+        return web.json_response({'message': str(e)}, status=409)
+    await request.app[UPDATE_MANAGER_KEY].wait(job)
+    ok = job.status == update_jobs.SUCCEEDED
+    res = {
+        'message': 'Firmware update {}'.format(
+            'successful' if ok else 'failed'),
+        'avrdudeResponse': job.message,
+        'filename': job.filename
+    }
+    if ok:
+        status = 200
+        log.info(res)
+    else:
+        status = 400 if 'checksum mismatch' in job.message else 500
+        log.error(res)
+    return web.json_response(res, status=status)
+
+
+async def _start_update(request, module_serial, data):
+    """ Start an update of the module with the given serial, from a posted
+    firmware file. The file is kept until the update is finished.
+
+    :raises LookupError: If the module is not found
+    """
+    hw = request.app['com.opentrons.hardware']
+    manager = request.app[UPDATE_MANAGER_KEY]
+    for module in await hw.discover_modules():
+        if module.device_info.get('serial') == module_serial:
+            break
+    else:
+        raise LookupError('Module {} not found'.format(module_serial))
+    fw_filename = data.filename
+    log.info('Preparing to flash firmware image {}'.format(fw_filename))
+    with tempfile.NamedTemporaryFile(
+            suffix=fw_filename, delete=False) as fp:
+        fp.write(data.file.read())
+    try:
+        job = manager.start(module, fp.name, fw_filename)
+    except Exception:
+        os.remove(fp.name)
+        raise
+    job.task.add_done_callback(lambda _: os.remove(fp.name))
+    return job
@@ -35,6 +35,8 @@ class HTTPServer(object):
             '/modules', control.get_attached_modules)
         self.app.router.add_get(
             '/modules/{serial}/data', control.get_module_data)
+        self.app.router.add_get(
+            '/modules/{serial}/data/history', control.get_module_history)
         self.app.router.add_post(
             '/modules/{serial}', control.execute_module_command)
         self.app.router.add_post(
@@ -45,6 +47,10 @@ class HTTPServer(object):
             '/server/update/firmware', endpoints.update_firmware)
         self.app.router.add_post(
             '/modules/{serial}/update', update.update_module_firmware)
+        self.app.router.add_post(
+            '/modules/{serial}/update/start', update.start_module_update)
+        self.app.router.add_get(
+            '/modules/update/status', update.get_module_updates)
         self.app.router.add_get(
             '/update/ignore', endpoints.get_ignore_version)
         self.app.router.add_post(
@@ -8,6 +8,9 @@ if TYPE_CHECKING:
         Labware, Well, ModuleGeometry)
 
 
+_new_point = tuple.__new__
+
+
 class PipetteNotAttachedError(KeyError):
     """ An error raised if a pipette is accessed that is not attached """
     pass
@@ -18,20 +21,29 @@ class Point(NamedTuple):
     y: float = 0.0
     z: float = 0.0
 
+    # Points are offset for every well position, so the arithmetic unpacks
+    # the tuples and builds its result without going through __new__
+
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, Point):
             return False
-        return self.x == other.x and self.y == other.y and self.z == other.z
+        x, y, z = self
+        ox, oy, oz = other
+        return x == ox and y == oy and z == oz
 
     def __add__(self, other: Any) -> 'Point':
         if not isinstance(other, Point):
             return NotImplemented
-        return Point(self.x + other.x, self.y + other.y, self.z + other.z)
+        x, y, z = self
+        ox, oy, oz = other
+        return _new_point(Point, (x + ox, y + oy, z + oz))
 
     def __sub__(self, other: Any) -> 'Point':
         if not isinstance(other, Point):
             return NotImplemented
-        return Point(self.x - other.x, self.y - other.y, self.z - other.z)
+        x, y, z = self
+        ox, oy, oz = other
+        return _new_point(Point, (x - ox, y - oy, z - oz))
 
     def __str__(self):
         return '({}, {}, {})'.format(self.x, self.y, self.z)
@@ -0,0 +1,159 @@
+""" opentrons.util.data_bundle: a precompiled bundle of shared data files
+
+Parsing the json files in ``shared_data`` one by one is slow on the robot's
+SD card, so wheel builds (see ``setup.py``) compile the labware, module,
+pipette and deck definitions into a single file. The file holds the pickle
+protocol it was written with and an index of ``name: (offset, length)``,
+followed by one pickled, already-parsed object per json file. The bundle is
+memory mapped and entries are unpickled on demand.
+
+When no bundle is present (for instance, when running from a source
+checkout) or a file is not in it, :py:meth:`load_shared_data` falls back to
+parsing the json file.
+
+This module only depends on the standard library so that ``setup.py`` can
+load it without importing the rest of the package.
+"""
+import json
+import logging
+import mmap
+import os
+import pickle
+import pkgutil
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MODULE_LOG = logging.getLogger(__name__)
+
+#: The name of the bundle file, in the package's shared_data directory
+BUNDLE_NAME = 'shared_data.bundle'
+#: The shared_data subdirectories whose json files go in the bundle
+BUNDLED_SUBDIRS = ['deck', 'labware/definitions/2', 'module', 'pipette']
+
+#: The pickle protocol bundles are written with. Wheels may be built with a
+#: newer Python than the robot's, so this must be one Python 3.6 can read.
+PICKLE_PROTOCOL = 4
+
+_MAGIC = b'OTSD\x02'
+_HEADER = struct.Struct('<5sBQ')
+
+
+def build_bundle(
+        source_root: str, subdirs: Iterable[str], dest: str) -> int:
+    """ Compile the json files in some subdirectories of a shared data tree
+    into a bundle.
+
+    :param source_root: The root of the shared data tree
+    :param subdirs: The subdirectories of ``source_root`` to bundle
+    :param dest: The path of the bundle file to write
+    :returns: The number of files bundled
+    """
+    index: Dict[str, Tuple[int, int]] = {}
+    blobs: List[bytes] = []
+    offset = 0
+    for subdir in subdirs:
+        top = os.path.join(source_root, subdir)
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if not filename.endswith('.json'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, source_root)\
+                    .replace(os.sep, '/')
+                with open(path, 'r', encoding='utf-8') as f:
+                    blob = pickle.dumps(
+                        json.load(f), protocol=PICKLE_PROTOCOL)
+                index[name] = (offset, len(blob))
+                blobs.append(blob)
+                offset += len(blob)
+    index_blob = pickle.dumps(index, protocol=PICKLE_PROTOCOL)
+    with open(dest, 'wb') as bundle_file:
+        bundle_file.write(
+            _HEADER.pack(_MAGIC, PICKLE_PROTOCOL, len(index_blob)))
+        bundle_file.write(index_blob)
+        for blob in blobs:
+            bundle_file.write(blob)
+    return len(index)
+
+
+class DataBundle:
+    """ A read-only view of a bundle written by :py:meth:`build_bundle`
+
+    :raises ValueError: If the file is not a bundle, or was written with a
+                        pickle protocol this Python cannot read
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as bundle_file:
+            self._map = mmap.mmap(
+                bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, protocol, index_len = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f'{path} is not a shared data bundle')
+        if protocol > pickle.HIGHEST_PROTOCOL:
+            raise ValueError(
+                f'{path} uses pickle protocol {protocol}, but this Python '
+                f'only reads up to {pickle.HIGHEST_PROTOCOL}')
+        index_start = _HEADER.size
+        self._index: Dict[str, Tuple[int, int]] = pickle.loads(
+            self._map[index_start:index_start + index_len])
+        self._data_start = index_start + index_len
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def names(self) -> List[str]:
+        """ The names (paths relative to shared_data) of bundled files """
+        return list(self._index.keys())
+
+    def load(self, name: str) -> Any:
+        """ Get the parsed contents of a bundled file.
+
+        :raises KeyError: If the file is not in the bundle
+        """
+        offset, length = self._index[name]
+        start = self._data_start + offset
+        return pickle.loads(self._map[start:start + length])
+
+
+_bundle: Optional[DataBundle] = None
+_bundle_checked = False
+
+
+def bundle_path() -> str:
+    return os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        'shared_data', BUNDLE_NAME)
+
+
+def get_bundle() -> Optional[DataBundle]:
+    """ Get the installed bundle, or None if there isn't one (or it cannot be
+    read). The bundle is only opened once.
+    """
+    global _bundle, _bundle_checked
+    if not _bundle_checked:
+        _bundle_checked = True
+        path = bundle_path()
+        if os.path.exists(path):
+            try:
+                _bundle = DataBundle(path)
+            except Exception:
+                MODULE_LOG.exception(
+                    f'Could not open shared data bundle {path}')
+    return _bundle
+
+
+def load_shared_data(name: str) -> Any:
+    """ Get the parsed contents of a json file in shared_data, from the bundle
+    if possible.
+
+    :param name: The path of the file relative to shared_data, for instance
+                 'pipette/definitions/pipetteNameSpecs.json'
+    :raises FileNotFoundError: If the file does not exist
+    """
+    bundle = get_bundle()
+    if bundle and name in bundle:
+        return bundle.load(name)
+    return json.loads(
+        pkgutil.get_data('opentrons', f'shared_data/{name}') or '{}')
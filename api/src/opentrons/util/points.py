@@ -0,0 +1,88 @@
+""" opentrons.util.points: many :py:class:`.Point` s at once.
+
+Offsetting the wells of a labware one :py:class:`.Point` at a time makes a
+new tuple per well for every operation. A :py:class:`PointArray` keeps its
+points as the rows of one NumPy array, so a whole labware can be moved with
+a single addition, and rows are only turned back into :py:class:`.Point` s
+when they are asked for.
+"""
+from typing import Any, Iterable, Iterator, List, Union
+
+import numpy as np  # type: ignore
+
+from opentrons.types import Point
+
+
+class PointArray:
+    """ An immutable sequence of :py:class:`.Point` s stored as an (n, 3)
+    array of floats.
+
+    Adding or subtracting a :py:class:`.Point` moves every point; adding or
+    subtracting another :py:class:`PointArray` of the same length works
+    point by point.
+    """
+    __slots__ = ('_array',)
+
+    def __init__(self, points: Iterable[Any] = ()) -> None:
+        if not isinstance(points, np.ndarray):
+            points = list(points)
+        array = np.array(points, dtype=float)
+        if not array.size:
+            array = array.reshape(0, 3)
+        if array.ndim != 2 or array.shape[1] != 3:
+            raise ValueError(
+                'Expected (x, y, z) points, got an array of shape {}'
+                .format(array.shape))
+        self._array = _frozen(array)
+
+    @classmethod
+    def _wrap(cls, array: np.ndarray) -> 'PointArray':
+        """ Make a PointArray around an (n, 3) array without checking or
+        copying it """
+        result = cls.__new__(cls)
+        result._array = _frozen(array)
+        return result
+
+    @property
+    def array(self) -> np.ndarray:
+        """ The points as a read-only (n, 3) array """
+        return self._array
+
+    def points(self) -> List[Point]:
+        return [Point(x, y, z) for x, y, z in self._array.tolist()]
+
+    def __len__(self) -> int:
+        return len(self._array)
+
+    def __iter__(self) -> Iterator[Point]:
+        return iter(self.points())
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return PointArray._wrap(self._array[index])
+        x, y, z = self._array[index].tolist()
+        return Point(x, y, z)
+
+    def __add__(self, other: Any) -> 'PointArray':
+        if not isinstance(other, (Point, PointArray)):
+            return NotImplemented
+        return PointArray._wrap(self._array + _as_array(other))
+
+    def __sub__(self, other: Any) -> 'PointArray':
+        if not isinstance(other, (Point, PointArray)):
+            return NotImplemented
+        return PointArray._wrap(self._array - _as_array(other))
+
+    def __repr__(self) -> str:
+        return '<{}: {} points>'.format(self.__class__.__name__, len(self))
+
+
+def _as_array(other: Union[Point, PointArray]) -> np.ndarray:
+    if isinstance(other, PointArray):
+        return other._array
+    return np.array(other, dtype=float)
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
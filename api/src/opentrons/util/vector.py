@@ -62,11 +62,6 @@ class VectorValue(tuple):
 value_type = VectorValue
 
 
-# To keep Python 3.4 compatibility
-def isclose(a, b, rel_tol):
-    return abs(a - b) < rel_tol
-
-
 class VectorEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, Vector):
@@ -77,7 +72,19 @@ class VectorEncoder(json.JSONEncoder):
             return str(obj)
 
 
+def _vector(x, y, z):
+    """ Make a Vector from three components, skipping the argument checks
+    in :py:meth:`Vector.__init__` """
+    vector = Vector.__new__(Vector)
+    vector.coordinates = _tuple.__new__(VectorValue, (x, y, z))
+    return vector
+
+
 class Vector(object):
+    # Vectors are made and thrown away for every offset calculated on a
+    # placeable, so keep them small and their arithmetic direct
+    __slots__ = ('coordinates',)
+
     zero_vector = None
 
     @classmethod
@@ -119,10 +126,10 @@ class Vector(object):
         )
 
     def __init__(self, *args, **kwargs):
-        # self.coordinates = self.zero_coordinates()
-
         args_len = len(args)
-        if args_len == 1:
+        if args_len == 3:
+            self.coordinates = _tuple.__new__(VectorValue, args)
+        elif args_len == 1:
             arg = args[0]
             if isinstance(arg, dict):
                 self.coordinates = Vector.coordinates_from_dict(arg)
@@ -135,17 +142,16 @@ class Vector(object):
                     ("One argument supplied "
                      "expected to be dict or iterable, received {}")
                     .format(type(arg)))
-        elif args_len == 3:
-            self.coordinates = value_type(*args)
         else:
             raise ValueError("Expected either a dict/iterable or x, y, z")
 
     def __eq__(self, other):
         if isinstance(other, Vector):
-            return all(
-                [isclose(a, b, rel_tol=1e-5)
-                 for a, b in zip(self, other)]
-            )
+            a = self.coordinates
+            b = other.coordinates
+            return abs(a[0] - b[0]) < 1e-5 \
+                and abs(a[1] - b[1]) < 1e-5 \
+                and abs(a[2] - b[2]) < 1e-5
         elif isinstance(other, dict):
             return self == Vector(other)
         elif self.is_iterable(other):
@@ -154,33 +160,34 @@ class Vector(object):
             raise ValueError("Expected operand to be dict, iterable or vector")
 
     def __add__(self, other):
-        other = other
-        return Vector(
-            self.coordinates.x + other[0],
-            self.coordinates.y + other[1],
-            self.coordinates.z + other[2]
-        )
+        if isinstance(other, Vector):
+            other = other.coordinates
+        x, y, z = self.coordinates
+        return _vector(x + other[0], y + other[1], z + other[2])
 
     def __sub__(self, other):
-        other = other
-        return Vector(
-            [a - b for a, b in zip(self, other)])
+        if isinstance(other, Vector):
+            other = other.coordinates
+        x, y, z = self.coordinates
+        return _vector(x - other[0], y - other[1], z - other[2])
 
     def __truediv__(self, other):
+        x, y, z = self.coordinates
         if isinstance(other, Vector):
-            return Vector(
-                [a / b for a, b in zip(self, other)])
+            ox, oy, oz = other.coordinates
+            return _vector(x / ox, y / oy, z / oz)
 
         scalar = float(other)
-        return self / Vector(scalar, scalar, scalar)
+        return _vector(x / scalar, y / scalar, z / scalar)
 
     def __mul__(self, other):
+        x, y, z = self.coordinates
         if isinstance(other, Vector):
-            return Vector(
-                [a * b for a, b in zip(self, other)])
+            ox, oy, oz = other.coordinates
+            return _vector(x * ox, y * oy, z * oz)
 
         scalar = float(other)
-        return self * Vector(scalar, scalar, scalar)
+        return _vector(x * scalar, y * scalar, z * scalar)
 
     def __str__(self):
         return "(x={:.2f}, y={:.2f}, z={:.2f})".format(
@@ -206,4 +213,4 @@ class Vector(object):
         return res
 
     def __iter__(self):
-        return iter(self.to_tuple())
+        return iter(self.coordinates)
@@ -1,5 +1,6 @@
 import json
 import pkgutil
+import numpy as np
 from numpy import isclose
 
 import pytest
@@ -184,3 +185,69 @@ def test_mutable_configs_only(monkeypatch):
         set(pipette_config.MUTABLE_CONFIGS)
     # ensure empty
     assert bool(difference) is False
+
+
+def test_spec_files_parsed_once():
+    assert pipette_config.model_config() is pipette_config.model_config()
+    assert pipette_config.name_config() is pipette_config.name_config()
+    with pytest.raises(TypeError):
+        pipette_config.configs['p300_multi_v1.4']['name'] = 'p10_single'
+
+
+def test_cached_load_sees_override_changes():
+    cdir = CONFIG['pipette_config_overrides_dir']
+    pip_id = 'cachedpipette1234'
+    model = 'p300_multi_v1.4'
+    with (cdir/f'{pip_id}.json').open('w') as ovf:
+        json.dump({'pickUpCurrent': {'value': 0.3}}, ovf)
+    first = pipette_config.load(model, pip_id)
+    assert first.pick_up_current == 0.3
+    assert pipette_config.load(model, pip_id) == first
+
+    pipette_config.save_overrides(
+        pip_id, {'pickUpCurrent': {'value': 0.42}}, model)
+    assert pipette_config.load(model, pip_id).pick_up_current == 0.42
+    # saving overrides must not leak into the shared model specs
+    assert pipette_config.load(model).pick_up_current\
+        == defs['config'][model]['pickUpCurrent']['value']
+
+    # loaded configs are independent, mutable copies
+    first.ul_per_mm['aspirate'].append([1, 2, 3])
+    assert pipette_config.load(model, pip_id).ul_per_mm['aspirate']\
+        != first.ul_per_mm['aspirate']
+
+
+@pytest.mark.parametrize('pipette_model', pipette_config.config_models)
+def test_volume_conversion_table(pipette_model):
+    config = pipette_config.load(pipette_model)
+    tables = pipette_config.compile_ul_per_mm(config.ul_per_mm)
+    for action, sequence in config.ul_per_mm.items():
+        # check every breakpoint, just either side of it, and a sweep
+        volumes = [v for seg in sequence
+                   for v in (seg[0] - 0.001, seg[0])]\
+            + [config.max_volume * frac / 20 for frac in range(1, 21)]
+        volumes = [v for v in volumes if 0 < v <= sequence[-1][0]]
+        expected = [pipette_config.piecewise_volume_conversion(v, sequence)
+                    for v in volumes]
+        table = tables[action]
+        assert [table.ul_per_mm(v) for v in volumes]\
+            == pytest.approx(expected)
+        converted = table.ul_per_mm_array(np.array(volumes))
+        assert isinstance(converted, np.ndarray)
+        assert converted.shape == (len(volumes),)
+        assert list(converted)\
+            == pytest.approx([table.ul_per_mm(v) for v in volumes])
+        assert list(converted) == pytest.approx(expected)
+        with pytest.raises(IndexError):
+            table.ul_per_mm(sequence[-1][0] + 1)
+        with pytest.raises(IndexError):
+            table.ul_per_mm_array([1, sequence[-1][0] + 1])
+
+
+def test_volume_conversion_table_unsorted():
+    # segments that a first-match scan can never reach are ignored
+    sequence = [[5, 1, 1], [2, 100, 100], [10, 2, 2]]
+    table = pipette_config.VolumeConversionTable(sequence)
+    for vol in (1, 2, 4, 5, 6, 10):
+        assert table.ul_per_mm(vol)\
+            == pipette_config.piecewise_volume_conversion(vol, sequence)
@@ -1,5 +1,8 @@
 from math import pi
-from opentrons.legacy_api.containers.placeable import Deck, Slot
+
+import pytest
+
+from opentrons.legacy_api.containers.placeable import Deck, Slot, Well
 
 from tests.opentrons import generate_plate
 # TODO: Revise to use new Labware and Well classes
@@ -25,3 +28,63 @@ def test_well_from_center():
     assert plate['B2'].from_center(r=1.0, theta=pi / 2, h=5.0) == (5, 10, 60)
     assert plate['B2'].top()[1] == (5, 5, 20)
     assert plate['B2'].bottom()[1] == (5, 5, 0)
+
+
+def test_indexed_children():
+    plate = generate_plate(96, 8, (9, 9), (0, 0), 5)
+    names = [well.get_name() for well in plate]
+    assert [plate[i].get_name() for i in range(96)] == names
+    assert plate[-1].get_name() == names[-1]
+    assert [w.get_name() for w in plate[10:20:3]] == names[10:20:3]
+    assert [w.get_name() for w in plate['A2':'A3']] == names[8:16]
+    assert plate.get_index_from_name('B3') == names.index('B3')
+    assert next(plate['H1']).get_name() == names[names.index('H1') + 1]
+    assert len(plate) == 96
+    with pytest.raises(ValueError):
+        plate.get_index_from_name('Z99')
+
+    # Wrapping around the end of the plate
+    assert [w.get_name() for w in plate.wells('H12', length=3)] == \
+        [names[-1]] + names[:2]
+    assert [w.get_name() for w in plate.wells(names[3], to=names[1])] == \
+        [names[3], names[2], names[1]]
+    assert [w.get_name() for w in plate.wells(1, to=95, step=-12)] == \
+        names[1::12]
+
+    # The grid includes wells added after it was first used
+    assert len(plate.cols['1']) == 8
+    plate.add(Well(properties={'radius': 5}), 'I1', (0, 100, 0))
+    assert len(plate.cols['1']) == 9
+    assert plate.rows['I']['1'] is plate['I1']
+
+
+def test_cached_coordinates():
+    deck = Deck()
+    slot = Slot()
+    plate = generate_plate(4, 2, (10, 10), (0, 0), 5)
+    deck.add(slot, 'A1', (100, 0, 0))
+    slot.add(plate)
+    well = plate['B2']
+    assert well.coordinates() == (110, 10, 0)
+    assert well.coordinates(plate) == (10, 10, 0)
+    assert well.get_deck() is deck
+
+    # Calibrating the plate moves its wells
+    plate._coordinates = plate._coordinates + (0, 0, 5)
+    assert well.coordinates() == (110, 10, 5)
+    assert well.coordinates(plate) == (10, 10, 5)
+
+    # So does moving the plate to another slot
+    other = Slot()
+    deck.add(other, 'A2', (200, 0, 0))
+    other.add(plate.clone(), 'plate')
+    moved = other.get_child_by_name('plate')['B2']
+    assert moved.coordinates() == (210, 10, 5)
+    assert moved.get_deck() is deck
+    assert well.coordinates() == (110, 10, 5)
+
+    # Series follow whichever well they stand for
+    series = plate.rows('A')
+    first = series.coordinates()
+    series.set_offset(1)
+    assert series.coordinates() != first
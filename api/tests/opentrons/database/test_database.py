@@ -59,3 +59,40 @@ def test_invalid_container_name():
     error_type = ValueError
     with pytest.raises(error_type):
         database.load_container("fake_container")
+
+
+def test_connection_per_thread():
+    import threading
+    with database.transaction() as first:
+        with database.transaction() as nested:
+            assert nested is first
+    with database.transaction() as again:
+        assert again is first
+        mode = again.execute('PRAGMA journal_mode').fetchone()[0]
+        assert mode == 'wal'
+
+    others = []
+    thread = threading.Thread(
+        target=lambda: others.append(database._connection()))
+    thread.start()
+    thread.join()
+    assert others[0] is not first
+
+
+def test_save_and_load_container():
+    plate = database.load_container('96-flat')
+    database.save_new_container(plate, 'copied-96-flat')
+    copied = database.load_container('copied-96-flat')
+    assert [w.get_name() for w in copied] == [w.get_name() for w in plate]
+    assert [w._coordinates for w in copied] == \
+        [w._coordinates for w in plate]
+    assert copied[3].properties == plate[3].properties
+
+    # Nothing is saved if the transaction fails part way
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            database.delete_container('copied-96-flat')
+            raise RuntimeError('interrupted')
+    assert 'copied-96-flat' in database.list_all_containers()
+    database.delete_container('copied-96-flat')
+    assert 'copied-96-flat' not in database.list_all_containers()
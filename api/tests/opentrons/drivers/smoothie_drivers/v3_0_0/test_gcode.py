@@ -0,0 +1,36 @@
+from opentrons.drivers.smoothie_drivers import gcode
+from opentrons.drivers.smoothie_drivers.driver_3_0 import GCODES
+
+POSITION = {'X': 0, 'Y': 0, 'Z': 0, 'A': 0, 'B': 0, 'C': 0}
+
+
+def test_coordinates():
+    builder = gcode.GCodeBuilder(GCODES, 3, 0.005)
+    target = {'Z': 10.0, 'X': 1.23456, 'Y': 0.0, 'B': -2.5, 'C': None}
+    assert builder.coordinates(target, POSITION) == 'B-2.5X1.235Z10'
+    assert builder.coordinates(target, POSITION, skip_axes='BZ') == 'X1.235'
+    assert builder.coordinates({'X': 1e-9}, POSITION) == ''
+    assert builder.move('X1') == 'G0X1'
+
+
+def test_current_command():
+    builder = gcode.GCodeBuilder(GCODES, 3, 0.005)
+    currents = {'Y': 0.3, 'X': 1.25, 'B': 0.05}
+    assert builder.current_command(currents) == \
+        'M907 B0.05 X1.25 Y0.3 G4P0.005'
+    # Reused until the driver says the currents changed
+    currents['X'] = 0.3
+    assert builder.current_command(currents) == \
+        'M907 B0.05 X1.25 Y0.3 G4P0.005'
+    builder.currents_changed()
+    assert builder.current_command(currents) == \
+        'M907 B0.05 X0.3 Y0.3 G4P0.005'
+
+
+def test_clean_response():
+    assert gcode.clean_response('G0X1', '') == ''
+    assert gcode.clean_response(
+        'M114.2', 'M114.2 ok MCS: X:1.0000\r\n') == ' ok MCS: X:1.0000'
+    assert gcode.clean_response(
+        'G28.2B some-data ok', 'G28.2B\r\nsome-data\r\nok\r\nT\r\nESTS') \
+        == 'TESTS'
@@ -1045,3 +1045,114 @@ def test_alarm_unhandled(model, monkeypatch):
         driver.move({'X': 25})
 
     assert not driver._is_hard_halting.is_set()
+
+
+def test_run_script(smoothie, monkeypatch):
+    from opentrons.drivers import serial_communication
+    from opentrons.drivers.smoothie_drivers import driver_3_0
+    from opentrons.drivers.smoothie_drivers.motion_script import MotionScript
+    command_log = []
+    smoothie._setup()
+    smoothie.home()
+    smoothie.simulating = False
+
+    def write_with_log(command, ack, connection, timeout, tag=None):
+        command_log.append(command.strip())
+        return driver_3_0.SMOOTHIE_ACK
+
+    monkeypatch.setattr(
+        serial_communication, 'write_and_return', write_with_log)
+
+    script = MotionScript()
+    script.set_active_current({'B': 0.5})
+    script.move({'B': 2})
+    script.push_active_current()
+    script.set_active_current({'Z': 0.1})
+    script.move({'X': 10, 'Y': 20, 'Z': 30}, speed=30)
+    script.pop_active_current()
+    script.move({'X': 10, 'Y': 20, 'Z': 40})
+    script.move({'X': 11, 'Y': 20, 'Z': 40})
+    script.move({'X': 10, 'Y': 20, 'Z': 40})
+    script.dwell(0.5)
+    smoothie.run_script(script)
+    expected = [
+        ['M907 A0.1 B0.5 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 G0B2'],
+        ['M400'],
+        ['M907 A0.1 B0.05 C0.05 X1.25 Y1.25 Z0.1 G4P0.005 G0F1800 '
+         'G0X10Y20Z30 G0F24000'],
+        ['M400'],
+        ['M907 A0.1 B0.05 C0.05 X1.25 Y1.25 Z0.8 G4P0.005 G0Z40'],
+        # Nothing else needs a current change, so nothing waits until the end
+        ['G0X11'],
+        ['G0X10'],
+        ['G4P0.5'],
+        ['M400'],
+    ]
+    fuzzy_assert(result=command_log, expected=expected)
+    assert smoothie.position['X'] == 10
+    assert smoothie.position['Z'] == 40
+    assert smoothie.position['B'] == 2
+    # Plungers rest at their dwelling current after the script
+    assert smoothie.current['B'] == 0.05
+
+    # Axes are only checked for homing once, before the whole script
+    home_flagged_axes = Mock()
+    monkeypatch.setattr(smoothie, 'home_flagged_axes', home_flagged_axes)
+    script = MotionScript()
+    script.move({'X': 20, 'Y': 20, 'Z': 40}, home_flagged_axes=True)
+    script.move({'B': 3})
+    script.move({'X': 30, 'Y': 20, 'A': 40}, home_flagged_axes=True)
+    smoothie.run_script(script)
+    home_flagged_axes.assert_called_once_with('XYZA')
+
+
+def test_position_tracking(smoothie, monkeypatch):
+    from opentrons.drivers import serial_communication
+    from opentrons.drivers.smoothie_drivers import driver_3_0
+    command_log = []
+    smoothie._setup()
+    smoothie.simulating = False
+    reported = {}
+
+    def write_with_log(command, ack, connection, timeout, tag=None):
+        command_log.append(command.strip())
+        return driver_3_0.SMOOTHIE_ACK
+
+    def _parse_position_response(arg):
+        position = smoothie.position
+        position.update(reported)
+        return position
+
+    monkeypatch.setattr(
+        serial_communication, 'write_and_return', write_with_log)
+    monkeypatch.setattr(
+        driver_3_0, '_parse_position_response', _parse_position_response)
+
+    def position_queries():
+        queries = command_log.count('M114.2')
+        command_log.clear()
+        return queries
+
+    # The first home reads back where the axes homed to
+    smoothie.home('ZA')
+    assert position_queries() == 1
+    # After that it's known, including when homing part of it again
+    smoothie.home('ZA')
+    smoothie.fast_home('Z', 5)
+    assert position_queries() == 0
+    # Unless something went wrong in between
+    smoothie._reset_from_error()
+    smoothie.home('ZA')
+    assert position_queries() == 1
+    # Moves are trusted
+    smoothie.move({'X': 10, 'Y': 20})
+    assert position_queries() == 0
+    assert smoothie.position['X'] == 10
+
+    # Explicit refreshes always read back, and report any disagreement
+    reported['X'] = 10.5
+    smoothie.update_position()
+    assert position_queries() == 1
+    assert smoothie.position['X'] == 10.5
+    assert smoothie.position_drift['X'] == pytest.approx(0.5)
+    assert smoothie.position_drift['Y'] == 0
@@ -35,16 +35,58 @@ async def test_sim_update():
     assert temp.status == 'idle'
 
 
-async def test_poller(monkeypatch):
-    temp = modules.tempdeck.TempDeck('', True)
+async def test_poller(monkeypatch, loop):
+    temp = modules.tempdeck.TempDeck('fake-tempdeck', False, loop)
     hit = False
 
-    def update_called():
+    def poll_called():
         nonlocal hit
         hit = True
 
-    monkeypatch.setattr(temp._driver, 'update_temperature', update_called)
+    monkeypatch.setattr(temp._driver, 'connect', lambda port: '')
+    monkeypatch.setattr(temp._driver, 'get_device_info', lambda: {})
+    monkeypatch.setattr(temp._driver, 'poll_temperature', poll_called)
     await temp._connect()
-    assert temp._poller.is_alive()
+    sup = modules.supervisor.get_supervisor(loop)
+    assert sup.ports['fake-tempdeck'] is temp._supervised
     await asyncio.sleep(tempdeck.TEMP_POLL_INTERVAL_SECS * 1.1)
     assert hit
+    await temp._stop_supervision()
+    assert 'fake-tempdeck' not in sup.ports
+
+
+async def test_publishes_changes(loop):
+    temp = modules.tempdeck.TempDeck('', True, loop)
+    await temp._connect()
+    published = []
+    unsubscribe = modules.broker.subscribe(
+        modules.MODULE_STATUS_CHANGED, published.append)
+    try:
+        temp.set_temperature(40)
+        await asyncio.sleep(0.01)
+        assert len(published) == 1
+        assert published[0]['name'] == 'tempdeck'
+        assert published[0]['serial'] == 'dummySerial'
+        assert published[0]['data']['targetTemp'] == 40
+        # Nothing changed, so nothing is published
+        temp.set_temperature(40)
+        await asyncio.sleep(0.01)
+        assert len(published) == 1
+        temp.deactivate()
+        await asyncio.sleep(0.01)
+        assert len(published) == 2
+        assert published[1]['status'] == 'idle'
+    finally:
+        unsubscribe()
+
+
+def test_adaptive_poll_interval(monkeypatch):
+    temp = modules.tempdeck.TempDeck('', True)
+    for status, interval in [
+            ('heating', tempdeck.RAMPING_POLL_INTERVAL_SECS),
+            ('cooling', tempdeck.RAMPING_POLL_INTERVAL_SECS),
+            ('holding at target', tempdeck.TEMP_POLL_INTERVAL_SECS),
+            ('idle', tempdeck.IDLE_POLL_INTERVAL_SECS)]:
+        monkeypatch.setattr(
+            tempdeck.SimulatingDriver, 'status', status)
+        assert temp._poll_interval() == interval
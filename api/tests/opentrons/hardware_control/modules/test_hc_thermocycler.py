@@ -1,4 +1,6 @@
 import asyncio
+import time
+import pytest
 from opentrons.hardware_control import modules
 
 
@@ -53,3 +55,157 @@ async def test_sim_update():
     assert therm.temperature is None
     assert therm.target is None
     assert therm.status == 'idle'
+
+
+async def test_wait_timeouts():
+    therm = await modules.build('', 'thermocycler', True, lambda x: None)
+    with pytest.raises(asyncio.TimeoutError):
+        await therm.wait_for_temp(timeout=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        await therm.wait_for_lid_temp(timeout=0.05)
+
+    waiting = asyncio.ensure_future(therm.wait_for_temp())
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+    await therm.set_temperature(40)
+    await asyncio.wait_for(waiting, timeout=0.2)
+
+
+def test_compile_profile():
+    profile = modules.thermocycler.compile_profile(
+        [{'temperature': 95, 'hold_time_seconds': 10},
+         {'temperature': 55, 'hold_time_minutes': 0.5, 'ramp_rate': 2}],
+        repetitions=3)
+    assert len(profile) == 6
+    assert profile[0] == (1, 1, 95, 10, None)
+    assert profile[1] == (1, 2, 55, 30, 2)
+    assert profile[-1].cycle_index == 3
+    assert profile[-1].step_index == 2
+
+    for steps, repetitions in [
+            ([{'temperature': 95, 'hold_time_seconds': 10}], 0),
+            ([], 1),
+            ([{'hold_time_seconds': 10}], 1),
+            ([{'temperature': 95}], 1),
+            ([{'temperature': 95, 'hold_time_seconds': -1}], 1),
+            ([{'temperature': 95, 'hold_time_seconds': float('inf')}], 1),
+            ([{'temperature': 95, 'hold_time_seconds': 1, 'lid': 1}], 1)]:
+        with pytest.raises(ValueError):
+            modules.thermocycler.compile_profile(steps, repetitions)
+
+
+class FakeDriver:
+    """ Holds count down in real time, and only show up in polls """
+    def __init__(self):
+        self.started = []
+        # Set by the test while the module's poll is running
+        self.in_poll = False
+        self.target = None
+        self.temperature = None
+        self.hold_time = None
+        self.lid_target = None
+        self.lid_temp = None
+        self.lid_status = 'open'
+        self.lid_temp_status = 'idle'
+        self.ramp_rate = None
+        self.interrupt_fd = None
+        self._hold_end = None
+
+    def connect(self, port):
+        pass
+
+    def get_device_info(self):
+        return {'serial': 'fake', 'model': 'fake', 'version': 'fake'}
+
+    def set_temperature(self, temp, hold_time=None, ramp_rate=None):
+        self.started.append((temp, self.in_poll))
+        self.target = self.temperature = temp
+        self._hold_end = time.monotonic() + hold_time
+        self.hold_time = hold_time
+
+    def poll(self):
+        if self._hold_end is not None:
+            self.hold_time = round(
+                max(0, self._hold_end - time.monotonic()), 2)
+
+    @property
+    def status(self):
+        return 'idle' if self.target is None else 'holding at target'
+
+
+async def test_profile_streams_steps(loop):
+    therm = modules.thermocycler.Thermocycler(
+        'fake-thermocycler', lambda x: None, False, loop)
+    driver = FakeDriver()
+    therm._driver = driver
+    poll = therm._poll
+
+    def flagged_poll():
+        driver.in_poll = True
+        try:
+            poll()
+        finally:
+            driver.in_poll = False
+
+    therm._poll = flagged_poll
+    await therm._connect()
+    try:
+        await asyncio.wait_for(therm.cycle_temperatures(
+            [{'temperature': 90, 'hold_time_seconds': 0.3},
+             {'temperature': 60, 'hold_time_seconds': 0.3}],
+            repetitions=2), timeout=5)
+    finally:
+        await therm._stop_supervision()
+    assert [temp for temp, _ in driver.started] == [90, 60, 90, 60]
+    # Every step after the first is started by the poll that sees the
+    # previous hold end
+    assert [from_poll for _, from_poll in driver.started]\
+        == [False, True, True, True]
+    assert therm.current_cycle_index == 2
+    assert therm.current_step_index == 2
+    assert therm._armed_step is None
+
+
+async def test_cancel_disarms_next_step(loop):
+    therm = await modules.build('', 'thermocycler', True, lambda x: None)
+    therm._armed_step = modules.thermocycler.ProfileStep(
+        temperature=60, hold_time=1, ramp_rate=None,
+        cycle_index=1, step_index=2)
+    therm.cancel()
+    # Cleared right away, not when the profile task next runs
+    assert therm._armed_step is None
+
+
+async def test_no_step_starts_after_cancel(loop):
+    therm = modules.thermocycler.Thermocycler(
+        'fake-thermocycler', lambda x: None, False, loop)
+    driver = FakeDriver()
+    therm._driver = driver
+    therm._start_step(modules.thermocycler.ProfileStep(
+        temperature=90, hold_time=0.01, ramp_rate=None,
+        cycle_index=1, step_index=1))
+    therm._armed_step = modules.thermocycler.ProfileStep(
+        temperature=60, hold_time=1, ramp_rate=None,
+        cycle_index=1, step_index=2)
+    therm._running_flag.set()
+    time.sleep(0.02)
+    started_when_cancelled = []
+
+    def cancel():
+        therm.cancel()
+        started_when_cancelled.append(len(driver.started))
+
+    step_finished = therm._step_finished
+
+    def racing_step_finished():
+        # Cancel on the loop after the poll has read the armed step, but
+        # before it starts it
+        loop.call_soon_threadsafe(cancel)
+        time.sleep(0.2)
+        return step_finished()
+
+    therm._step_finished = racing_step_finished
+    await loop.run_in_executor(None, therm._poll)
+    await asyncio.sleep(0)
+    assert started_when_cancelled == [len(driver.started)]
+    assert therm._armed_step is None
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from opentrons.hardware_control import modules
+from opentrons.hardware_control.modules import registry
+
+
+@pytest.fixture
+def published():
+    messages = []
+
+    def record(topic):
+        return lambda message: messages.append((topic, message))
+
+    unsubs = [modules.broker.subscribe(topic, record(topic))
+              for topic in (modules.MODULE_ADDED, modules.MODULE_REMOVED)]
+    yield messages
+    for unsub in unsubs:
+        unsub()
+
+
+def test_match_port():
+    assert modules.match_port('tempdeck_abc123')\
+        == ('/dev/modules/tempdeck_abc123', 'tempdeck')
+    assert modules.match_port('ttyMagDeck3')\
+        == ('/dev/modules/ttyMagDeck3', 'magdeck')
+    assert modules.match_port('ttyACM0') is None
+
+
+async def test_scanning_registry(tmpdir, loop, published):
+    (tmpdir / 'tempdeck_1').write('')
+    (tmpdir / 'not-a-module').write('')
+    source = registry.ScanningEventSource(str(tmpdir))
+    reg = registry.ModuleRegistry(
+        modules.match_port, path=str(tmpdir), source=source, loop=loop)
+    attached = reg.attached()
+    assert reg.watching
+    assert [name for _, name in attached] == ['tempdeck']
+    assert published == [
+        (modules.MODULE_ADDED,
+         {'port': '/dev/modules/tempdeck_1', 'name': 'tempdeck'})]
+
+    (tmpdir / 'magdeck_2').write('')
+    # Nothing changes until the source reports it
+    assert len(reg.attached()) == 1
+    source.rescan()
+    assert sorted(name for _, name in reg.attached())\
+        == ['magdeck', 'tempdeck']
+
+    (tmpdir / 'tempdeck_1').remove()
+    source.rescan()
+    assert [name for _, name in reg.attached()] == ['magdeck']
+    assert published[-1] == (
+        modules.MODULE_REMOVED,
+        {'port': '/dev/modules/tempdeck_1', 'name': 'tempdeck'})
+    reg.stop()
+
+
+async def test_scanning_interval(tmpdir, loop):
+    source = registry.ScanningEventSource(str(tmpdir), interval=0.01)
+    reg = registry.ModuleRegistry(
+        modules.match_port, path=str(tmpdir), source=source, loop=loop)
+    assert reg.attached() == []
+    (tmpdir / 'thermocycler_1').write('')
+    await asyncio.sleep(0.05)
+    assert [name for _, name in reg.attached()] == ['thermocycler']
+    reg.stop()
+
+
+async def test_directory_lifecycle(tmpdir, loop, published):
+    path = tmpdir / 'modules'
+    source = registry.ScanningEventSource(str(path))
+    reg = registry.ModuleRegistry(
+        modules.match_port, path=str(path), source=source, loop=loop)
+    # No directory yet: nothing attached, and we try again next time
+    assert reg.attached() == []
+    assert not reg.watching
+    path.mkdir()
+    (path / 'magdeck_1').write('')
+    assert len(reg.attached()) == 1
+    # Losing the directory means losing everything in it
+    path.remove()
+    source.rescan()
+    assert not reg.watching
+    assert reg.attached() == []
+    assert published[-1][0] == modules.MODULE_REMOVED
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'),
+                    reason='inotify is linux only')
+async def test_inotify_registry(tmpdir, loop, published):
+    (tmpdir / 'tempdeck_1').write('')
+    reg = registry.ModuleRegistry(
+        modules.match_port, path=str(tmpdir),
+        source=registry.InotifyEventSource(str(tmpdir)), loop=loop)
+    assert len(reg.attached()) == 1
+    (tmpdir / 'magdeck_2').write('')
+    os.rename(str(tmpdir / 'tempdeck_1'), str(tmpdir / 'thermocycler_3'))
+    await asyncio.sleep(0.05)
+    assert sorted(name for _, name in reg.attached())\
+        == ['magdeck', 'thermocycler']
+    assert [topic for topic, _ in published] == [
+        modules.MODULE_ADDED, modules.MODULE_ADDED,
+        modules.MODULE_REMOVED, modules.MODULE_ADDED]
+    reg.stop()
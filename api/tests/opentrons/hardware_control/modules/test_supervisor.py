@@ -0,0 +1,212 @@
+import asyncio
+import gc
+import os
+import threading
+import time
+import weakref
+
+import pytest
+
+from opentrons.hardware_control.modules import supervisor
+
+
+@pytest.fixture
+def sup(loop):
+    s = supervisor.ModuleSupervisor(loop)
+    yield s
+    loop.run_until_complete(s.shutdown())
+
+
+async def test_supervisor_per_loop(loop):
+    assert supervisor.get_supervisor(loop) is supervisor.get_supervisor(loop)
+    assert supervisor.get_supervisor(loop).loop is loop
+
+
+def test_supervisor_released_with_last_port():
+    loop = asyncio.new_event_loop()
+    sup = supervisor.get_supervisor(loop)
+    handle = sup.register('fake-port', poll=lambda: None, poll_interval=0.01)
+    loop.run_until_complete(asyncio.sleep(0.05, loop=loop))
+    threads = list(sup.executor._threads)
+    assert threads
+    loop.run_until_complete(handle.aclose())
+    assert loop not in supervisor._supervisors
+    for thread in threads:
+        thread.join(1)
+        assert not thread.is_alive()
+    loop.close()
+    loop_ref = weakref.ref(loop)
+    del loop, sup, handle
+    gc.collect()
+    assert loop_ref() is None
+
+
+async def test_polls_on_interval(sup, loop):
+    polls = []
+    handle = sup.register(
+        'fake-port', poll=lambda: polls.append(loop.time()),
+        poll_interval=0.05)
+    await asyncio.sleep(0.3)
+    assert 3 <= len(polls) <= 7
+    handle.set_poll_interval(10)
+    await asyncio.sleep(0.1)
+    count = len(polls)
+    await asyncio.sleep(0.1)
+    assert len(polls) == count
+    handle.poll_soon()
+    await asyncio.sleep(0.1)
+    assert len(polls) == count + 1
+
+
+async def test_commands_before_polls(sup, loop):
+    calls = []
+
+    def poll():
+        calls.append('poll')
+        time.sleep(0.05)
+
+    handle = sup.register('fake-port', poll=poll, poll_interval=0.01)
+    await asyncio.sleep(0.02)
+    # A poll is in flight (or about to be), but the command must not wait
+    # for any more than that one
+    commands = [
+        loop.create_task(handle.submit(lambda i=i: calls.append(i) or i))
+        for i in range(3)]
+    assert [await command for command in commands] == [0, 1, 2]
+    first_command = calls.index(0)
+    assert calls[first_command:first_command + 3] == [0, 1, 2]
+    assert calls[:first_command].count('poll') <= 2
+
+
+async def test_submit_raises(sup):
+    handle = sup.register('fake-port')
+
+    def broken():
+        raise ValueError('oops')
+
+    with pytest.raises(ValueError):
+        await handle.submit(broken)
+    # The port keeps working after a failed command
+    assert await handle.submit(lambda: 'ok') == 'ok'
+
+
+async def test_run_sync_shares_port(sup, loop):
+    active = []
+    overlaps = []
+
+    def use_port():
+        if active:
+            overlaps.append(True)
+        active.append(True)
+        time.sleep(0.01)
+        active.pop()
+
+    handle = sup.register('fake-port', poll=use_port, poll_interval=0.001)
+
+    def sync_caller():
+        for _ in range(10):
+            handle.run_sync(use_port)
+
+    thread = threading.Thread(target=sync_caller)
+    thread.start()
+    while thread.is_alive():
+        await asyncio.sleep(0.01)
+    assert not overlaps
+
+
+async def test_close(sup, loop):
+    polls = []
+    handle = sup.register(
+        'fake-port', poll=lambda: polls.append(True), poll_interval=0.01)
+    await asyncio.sleep(0.05)
+    await handle.aclose()
+    await asyncio.sleep(0.01)
+    count = len(polls)
+    await asyncio.sleep(0.05)
+    assert len(polls) == count
+    assert 'fake-port' not in sup.ports
+    with pytest.raises(supervisor.PortClosedError):
+        await handle.submit(lambda: None)
+
+
+async def test_reregister_replaces(sup, loop):
+    first = sup.register('fake-port')
+    second = sup.register('fake-port')
+    await asyncio.sleep(0)
+    assert first.closed
+    assert sup.ports['fake-port'] is second
+
+
+async def test_interrupts(sup, loop):
+    read_fd, write_fd = os.pipe()
+    interrupts = []
+    threads = []
+
+    def on_interrupt():
+        threads.append(threading.current_thread())
+        interrupts.append(os.read(read_fd, 100))
+
+    try:
+        handle = sup.register('fake-port')
+        handle.watch_interrupts(read_fd, on_interrupt)
+        os.write(write_fd, b'lid open')
+        await asyncio.sleep(0.05)
+        assert interrupts == [b'lid open']
+        # The blocking read happens off the event loop's thread
+        assert threads[0] is not threading.current_thread()
+
+        # While a command runs, it owns the port and reads the data itself
+        def command():
+            os.write(write_fd, b'ok')
+            time.sleep(0.02)
+            return os.read(read_fd, 100)
+
+        assert await handle.submit(command) == b'ok'
+        assert interrupts == [b'lid open']
+        # Watching resumes after each interrupt is handled
+        os.write(write_fd, b'lid closed')
+        await asyncio.sleep(0.05)
+        assert interrupts == [b'lid open', b'lid closed']
+        await handle.aclose()
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+
+async def test_status_waiter(loop):
+    waiter = supervisor.StatusWaiter(loop)
+    state = {'temp': 20}
+
+    # Already true: returns without being notified
+    await asyncio.wait_for(waiter.wait_for(lambda: True), timeout=0.1)
+
+    waiting = loop.create_task(
+        waiter.wait_for(lambda: state['temp'] == 40))
+    await asyncio.sleep(0.01)
+    state['temp'] = 40
+    await asyncio.sleep(0.01)
+    # Not notified yet, so not rechecked
+    assert not waiting.done()
+    waiter.notify()
+    await asyncio.wait_for(waiting, timeout=0.1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await waiter.wait_for(lambda: state['temp'] == 0, timeout=0.05)
+
+    cancelled = loop.create_task(
+        waiter.wait_for(lambda: state['temp'] == 0))
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert not waiter._waiting
+
+
+async def test_on_poll_notifies(sup, loop):
+    waiter = supervisor.StatusWaiter(loop)
+    samples = []
+    sup.register(
+        'fake-port', poll=lambda: samples.append(len(samples)),
+        poll_interval=0.01, on_poll=waiter.notify)
+    await asyncio.wait_for(
+        waiter.wait_for(lambda: len(samples) >= 3), timeout=1)
@@ -0,0 +1,67 @@
+import pytest
+
+from opentrons.hardware_control.modules import telemetry
+
+
+def test_append_and_window():
+    buf = telemetry.TelemetryBuffer(capacity=4)
+    assert len(buf) == 0
+    assert buf.window().shape == (0, len(telemetry.FIELDS))
+    for i in range(3):
+        buf.append(20 + i, 95, timestamp=100 + i)
+    assert len(buf) == 3
+    assert buf.window()[:, 0].tolist() == [100, 101, 102]
+    assert buf.window(since=101)[:, 1].tolist() == [21, 22]
+    assert buf.window(until=101)[:, 1].tolist() == [20, 21]
+    assert buf.window(since=101, until=101)[:, 1].tolist() == [21]
+
+
+def test_overwrites_oldest():
+    buf = telemetry.TelemetryBuffer(capacity=4)
+    for i in range(4):
+        buf.append(i, timestamp=i)
+    full = buf._samples
+    for i in range(4, 10):
+        buf.append(i, timestamp=i)
+    assert len(buf) == 4
+    assert buf.capacity == 4
+    assert buf.window()[:, 0].tolist() == [6, 7, 8, 9]
+    # Once full, the storage is never reallocated
+    assert buf._samples is full
+
+
+def test_grows_in_chunks():
+    buf = telemetry.TelemetryBuffer()
+    # Nothing is allocated until samples arrive
+    assert buf._samples.nbytes == 0
+    for i in range(telemetry.GROWTH_CHUNK + 1):
+        buf.append(i, timestamp=i)
+    assert len(buf._samples) == 2 * telemetry.GROWTH_CHUNK
+    assert buf.window()[:, 1].tolist() == list(
+        range(telemetry.GROWTH_CHUNK + 1))
+
+
+def test_timestamps_in_order(monkeypatch):
+    buf = telemetry.TelemetryBuffer()
+    buf.append(20)
+    # Setting the clock back does not make samples go back in time
+    monkeypatch.setattr(telemetry.time, 'time', lambda: 0)
+    buf.append(21)
+    first, second = buf.window()[:, 0].tolist()
+    assert first <= second
+    with pytest.raises(ValueError):
+        buf.append(22, timestamp=first - 1)
+
+
+def test_history():
+    buf = telemetry.TelemetryBuffer(capacity=2000)
+    for i in range(1000):
+        buf.append(i / 10, 95, 105, None, timestamp=i)
+    history = buf.history(max_points=10)
+    assert len(history) == 10
+    assert history[0] == {'timestamp': 0, 'temperature': 0, 'target': 95,
+                          'lidTemp': 105, 'holdTime': None}
+    assert history[-1]['timestamp'] == 999
+    assert len(buf.history(since=990)) == 10
+    with pytest.raises(ValueError):
+        buf.history(max_points=0)
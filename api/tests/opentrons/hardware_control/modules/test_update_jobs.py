@@ -0,0 +1,188 @@
+import asyncio
+import os
+
+import pytest
+
+from opentrons.hardware_control import modules
+from opentrons.hardware_control.modules import update, update_jobs
+
+AVRDUDE_OUTPUT = '''
+avrdude: Version 6.3
+avrdude: AVR device initialized and ready to accept instructions
+
+Reading | ################################################## | 100% 0.00s
+
+avrdude: Device signature = 0x1e9587 (probably m32u4)
+avrdude: reading input file "fw.hex"
+avrdude: writing flash (16000 bytes):
+
+Writing | ##################################################'''
+
+
+def test_upload_progress():
+    signature_read = AVRDUDE_OUTPUT.index('avrdude: Device signature')
+    assert update._upload_progress(AVRDUDE_OUTPUT[:signature_read]) == 0
+    assert update._upload_progress(AVRDUDE_OUTPUT[:-25]) == 0.25
+    assert update._upload_progress(AVRDUDE_OUTPUT) == 0.5
+    verifying = AVRDUDE_OUTPUT + ''' | 100% 2.10s
+
+avrdude: verifying flash memory against fw.hex:
+Reading | #####################'''
+    assert update._upload_progress(verifying) == 0.71
+    assert update._upload_progress(
+        verifying + '#' * 29 + ' | 100% 1.5s') == 1.0
+
+
+async def _build(name, serial):
+    module = await modules.build('', name, True, lambda x: None)
+    module._device_info = {**module.device_info, 'serial': serial}
+    return module
+
+
+class FakeHardware:
+    def __init__(self, loop):
+        self.started = []
+        self.timeouts = []
+        self.release = asyncio.Event(loop=loop)
+
+    async def update_module(
+            self, module, firmware_file, loop, progress_callback=None,
+            timeout=None):
+        self.started.append(module.device_info['serial'])
+        self.timeouts.append(timeout)
+        progress_callback(0.5)
+        await self.release.wait()
+        if firmware_file == 'bad.hex':
+            return False, 'checksum mismatch'
+        progress_callback(1.0)
+        return True, 'firmware update successful'
+
+
+async def test_concurrent_updates(loop):
+    hw = FakeHardware(loop)
+    manager = update_jobs.UpdateManager(hw, loop=loop)
+    published = []
+    unsub = modules.broker.subscribe(
+        modules.MODULE_UPDATE_PROGRESS, published.append)
+    try:
+        temp = manager.start(await _build('tempdeck', 'td1'), 'fw.hex')
+        mag = manager.start(await _build('magdeck', 'md1'), 'bad.hex')
+        await asyncio.sleep(0.01)
+        # Both are flashing at once
+        assert sorted(hw.started) == ['md1', 'td1']
+        assert [job.status for job in manager.jobs]\
+            == [update_jobs.FLASHING] * 2
+        assert temp.progress == 0.5
+
+        with pytest.raises(update_jobs.UpdateInProgressError):
+            manager.start(await _build('tempdeck', 'td1'), 'fw.hex')
+
+        hw.release.set()
+        await manager.wait(temp)
+        await manager.wait(mag)
+    finally:
+        unsub()
+    assert temp.status == update_jobs.SUCCEEDED
+    assert temp.progress == 1.0
+    assert mag.status == update_jobs.FAILED
+    assert mag.message == 'checksum mismatch'
+    assert published[-1]['status'] in (update_jobs.SUCCEEDED,
+                                       update_jobs.FAILED)
+    assert [m['progress'] for m in published if m['serial'] == 'td1']\
+        == [0.0, 0.5, 1.0, 1.0]
+    assert manager.get('td1') is temp
+
+    # Finished updates can be started again
+    hw.release.clear()
+    again = manager.start(await _build('tempdeck', 'td1'), 'fw.hex')
+    assert manager.get('td1') is again
+    hw.release.set()
+    await manager.wait(again)
+
+
+async def test_update_timeout(loop):
+    hw = FakeHardware(loop)
+    manager = update_jobs.UpdateManager(hw, loop=loop, timeout=0.05)
+    job = manager.start(await _build('tempdeck', 'td1'), 'fw.hex')
+    await asyncio.sleep(0.1)
+    # Only the upload is timed out, by the hardware controller
+    assert not job.done
+    assert hw.timeouts == [0.05]
+    hw.release.set()
+    await manager.wait(job)
+    assert job.status == update_jobs.SUCCEEDED
+
+
+async def test_avrdude_killed_on_timeout(loop, monkeypatch):
+    create_subprocess_exec = asyncio.create_subprocess_exec
+    procs = []
+
+    async def slow_avrdude(*args, **kwargs):
+        proc = await create_subprocess_exec('sleep', '10', **kwargs)
+        procs.append(proc)
+        return proc
+
+    async def discover_ports():
+        return ['ttyn_tempdeck1']
+
+    monkeypatch.setattr(asyncio, 'create_subprocess_exec', slow_avrdude)
+    monkeypatch.setattr(update, '_discover_ports', discover_ports)
+    with pytest.raises(asyncio.TimeoutError):
+        await update.update_firmware(
+            '/dev/modules/ttyn_bootloader', 'fw.hex', loop,
+            name='tempdeck', timeout=0.1)
+    assert procs[0].returncode is not None
+
+
+@pytest.mark.parametrize('first_back', [0, 1])
+async def test_same_kind_updates_find_own_ports(loop, monkeypatch, first_back):
+    ports = ['ttyn_bootloader1', 'ttyn_bootloader2']
+    locations = {'ttyn_bootloader1': '1-1.1', 'ttyn_bootloader2': '1-1.2'}
+    app_ports = [('ttyn_tempdeck3', '1-1.1'), ('ttyn_tempdeck4', '1-1.2')]
+
+    async def discover_ports():
+        return list(ports)
+
+    def usb_location(port):
+        return locations.get(os.path.basename(port))
+
+    async def avrdude(*args, **kwargs):
+        return await create_subprocess_exec('true', **kwargs)
+
+    async def read_output(stream, progress_callback):
+        return ''
+
+    create_subprocess_exec = asyncio.create_subprocess_exec
+    monkeypatch.setattr(update, '_discover_ports', discover_ports)
+    monkeypatch.setattr(update, '_usb_location', usb_location)
+    monkeypatch.setattr(update, '_read_output', read_output)
+    monkeypatch.setattr(asyncio, 'create_subprocess_exec', avrdude)
+    updates = [loop.create_task(update.update_firmware(
+        '/dev/modules/' + port, 'fw.hex', loop, name='tempdeck'))
+        for port in ports]
+    await asyncio.sleep(0.1)
+    # Both uploads are done, and the modules have not come back yet
+    assert not any(task.done() for task in updates)
+    for which in (first_back, 1 - first_back):
+        # The module resets out of its bootloader onto a new port
+        ports.remove('ttyn_bootloader{}'.format(which + 1))
+        entry, location = app_ports[which]
+        locations[entry] = location
+        ports.append(entry)
+        await asyncio.sleep(0.1)
+    new_ports = [port for port, _ in await asyncio.gather(*updates)]
+    assert new_ports == ['/dev/modules/ttyn_tempdeck3',
+                         '/dev/modules/ttyn_tempdeck4']
+
+
+def test_usb_location(tmpdir, monkeypatch):
+    sys_tty = tmpdir.mkdir('tty')
+    interface = tmpdir.mkdir('usb1').mkdir('1-1.3').mkdir('1-1.3:1.0')
+    sys_tty.mkdir('ttyACM0').join('device').mksymlinkto(interface)
+    dev = tmpdir.mkdir('dev')
+    dev.join('ttyACM0').write('')
+    port = dev.mkdir('modules').join('tty0_tempdeck')
+    port.mksymlinkto(dev.join('ttyACM0'))
+    monkeypatch.setattr(update, 'SYS_TTY_DIR', str(sys_tty))
+    assert update._usb_location(str(port)) == '1-1.3'
+    assert update._usb_location(str(dev.join('ttyACM1'))) is None
@@ -454,3 +454,21 @@ async def test_blowout_flow_rate(dummy_instruments, loop, monkeypatch):
         pip.config.blow_out,
         speed=15
     )
+
+
+async def test_plunger_positions(loop):
+    hw = hc.API.build_hardware_simulator(
+        attached_instruments={
+            types.Mount.LEFT: {'model': 'p300_single_v1.5', 'id': 'testID'}},
+        loop=loop)
+    await hw.cache_instruments()
+    instr = hw._attached_instruments[types.Mount.LEFT]
+    for action in ('aspirate', 'dispense'):
+        # every segment boundary, just below it, and some volumes between
+        volumes = [v for seg in instr.config.ul_per_mm[action]
+                   for v in (seg[0] - 0.001, seg[0])
+                   if 0 < v <= instr.config.max_volume]\
+            + [0.5, 1, 10, 37.5, 150, 300]
+        positions = hw._plunger_positions(instr, volumes, action)
+        assert list(positions) == [
+            hw._plunger_position(instr, vol, action) for vol in volumes]
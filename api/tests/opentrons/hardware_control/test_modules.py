@@ -1,5 +1,6 @@
 import pytest
 import opentrons.hardware_control as hardware_control
+from opentrons.hardware_control.modules.mod_abc import live_data_changed
 
 
 async def test_get_modules_simulating():
@@ -36,6 +37,22 @@ async def test_module_caching():
     assert two_magdecks[1] is not two_magdecks[0]
 
 
+async def test_unplugged_module_cleaned_up(monkeypatch):
+    api = hardware_control.API.build_hardware_simulator(
+        attached_modules=['tempdeck', 'magdeck'])
+    tempdeck, magdeck = sorted(await api.discover_modules(),
+                               key=lambda mod: mod.name(), reverse=True)
+    cleaned_up = []
+
+    async def cleanup():
+        cleaned_up.append(tempdeck)
+
+    monkeypatch.setattr(tempdeck, 'cleanup', cleanup)
+    api._backend._attached_modules = api._backend._attached_modules[1:]
+    assert await api.discover_modules() == [magdeck]
+    assert cleaned_up == [tempdeck]
+
+
 async def test_module_update_logic(monkeypatch):
     mod_names = ['tempdeck']
     api = hardware_control.API.build_hardware_simulator(
@@ -43,17 +60,25 @@ async def test_module_update_logic(monkeypatch):
     mods = await api.discover_modules()
     old = mods[0]
 
-    async def new_update_module(mod, ff, loop=None):
+    async def new_update_module(mod, ff, loop=None, progress_callback=None,
+                                timeout=None):
         return await hardware_control.modules.build(
             'weird-port', mod.name(), True, lambda x: None)
 
     monkeypatch.setattr(api._backend, 'update_module', new_update_module)
+    cleaned_up = []
+
+    async def cleanup():
+        cleaned_up.append(old)
+
+    monkeypatch.setattr(old, 'cleanup', cleanup)
     ok, msg = await api.update_module(mods[0], 'some_file')
 
     mods = await api.discover_modules()
     assert len(mods) == 1
 
     assert mods[0] is not old
+    assert cleaned_up == [old]
 
 
 @pytest.mark.skipif(not hardware_control.Controller,
@@ -81,7 +106,8 @@ async def test_module_update_integration(monkeypatch, loop,
     monkeypatch.setattr(hardware_control.modules.update,
                         '_discover_ports', mock_discover_ports)
 
-    async def mock_update(port, fname, loop):
+    async def mock_update(port, fname, loop, progress_callback=None,
+                          name=None, timeout=None):
         return (port, (True, 'it all worked'))
 
     monkeypatch.setattr(hardware_control.modules.update,
@@ -92,3 +118,19 @@ async def test_module_update_integration(monkeypatch, loop,
     assert ok
     new_modules = await api.discover_modules()
     assert new_modules[0] is not modules[0]
+
+
+def test_live_data_changed():
+    sample = {'status': 'heating',
+              'data': {'currentTemp': 30.0, 'targetTemp': 40, 'lid': None}}
+    assert live_data_changed(None, sample)
+    assert not live_data_changed(sample, sample)
+    assert not live_data_changed(
+        sample, {**sample, 'data': {**sample['data'], 'currentTemp': 30.05}})
+    assert live_data_changed(
+        sample, {**sample, 'data': {**sample['data'], 'currentTemp': 30.5}})
+    assert live_data_changed(sample, {**sample, 'status': 'holding at target'})
+    assert live_data_changed(
+        sample, {**sample, 'data': {**sample['data'], 'lid': 'open'}})
+    assert live_data_changed(
+        sample, {**sample, 'data': {**sample['data'], 'targetTemp': None}})
@@ -228,6 +228,29 @@ async def test_other_mount_retracted(hardware_api):
         == types.Point(54, 20, 218)
 
 
+async def test_retracted_mount_not_retracted_again(hardware_api, monkeypatch):
+    await hardware_api.home()
+    fast_home = hardware_api._backend.fast_home
+    retracted = []
+
+    def recording_fast_home(axis, margin):
+        retracted.append(axis)
+        return fast_home(axis, margin)
+
+    monkeypatch.setattr(
+        hardware_api._backend, 'fast_home', recording_fast_home)
+    await hardware_api.move_to(types.Mount.RIGHT, types.Point(0, 0, 0))
+    await hardware_api.move_to(types.Mount.LEFT, types.Point(20, 20, 0))
+    await hardware_api.move_to(types.Mount.RIGHT, types.Point(0, 0, 0))
+    assert retracted == ['A', 'Z']
+    # Nothing has moved the right mount since it was retracted
+    await hardware_api.retract(types.Mount.RIGHT)
+    await hardware_api.move_to(types.Mount.LEFT, types.Point(20, 20, 0))
+    assert retracted == ['A', 'Z', 'A']
+    assert await hardware_api.gantry_position(types.Mount.RIGHT) \
+        == types.Point(54, 20, 218)
+
+
 async def catch_oob_moves(hardware_api):
     await hardware_api.home()
     # Check axis max checking for move and move rel
@@ -293,30 +316,36 @@ async def test_shake_during_pick_up(hardware_api, monkeypatch):
     await hardware_api.cache_instruments()
 
     shake_tips_pick_up = mock.Mock(
-        side_effect=hardware_api._shake_off_tips_pick_up)
-    monkeypatch.setattr(hardware_api, '_shake_off_tips_pick_up',
+        side_effect=hardware_api._script_shake_off_tips_pick_up)
+    monkeypatch.setattr(hardware_api, '_script_shake_off_tips_pick_up',
                         shake_tips_pick_up)
 
     # Test double shake for after pick up tips
     await hardware_api.pick_up_tip(types.Mount.RIGHT, 50)
-    shake_tip_calls = [mock.call(types.Mount.RIGHT),
-                       mock.call(types.Mount.RIGHT)]
+    shake_tip_calls = [mock.call(mock.ANY, mock.ANY, types.Mount.RIGHT),
+                       mock.call(mock.ANY, mock.ANY, types.Mount.RIGHT)]
     shake_tips_pick_up.assert_has_calls(shake_tip_calls)
 
-    move_rel = mock.Mock(side_effect=hardware_api.move_rel)
-    monkeypatch.setattr(hardware_api, 'move_rel', move_rel)
+    move_rel = mock.Mock(side_effect=hardware_api._script_move_rel)
+    monkeypatch.setattr(hardware_api, '_script_move_rel', move_rel)
 
     # Test shakes in X and Y direction with 0.3 mm shake tip distance
-    shake_tips_pick_up.reset_mock()
-    await shake_tips_pick_up(types.Mount.RIGHT)
+    await hardware_api._shake_off_tips_pick_up(types.Mount.RIGHT)
     move_rel_calls = [
-        mock.call(types.Mount.RIGHT, types.Point(-0.3, 0, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(0.6, 0, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(-0.3, 0, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(0, -0.3, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(0, 0.6, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(0, -0.3, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(0, 0, 20))]
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(-0.3, 0, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(0.6, 0, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(-0.3, 0, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(0, -0.3, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(0, 0.6, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(0, -0.3, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(0, 0, 20))]
     move_rel.assert_has_calls(move_rel_calls)
 
 
@@ -339,18 +368,22 @@ async def test_shake_during_drop(hardware_api, monkeypatch):
     await hardware_api.drop_tip(types.Mount.RIGHT)
     shake_tips_drop.assert_called_once_with(types.Mount.RIGHT, 30)
 
-    move_rel = mock.Mock(side_effect=hardware_api.move_rel)
-    monkeypatch.setattr(hardware_api, 'move_rel', move_rel)
+    move_rel = mock.Mock(side_effect=hardware_api._script_move_rel)
+    monkeypatch.setattr(hardware_api, '_script_move_rel', move_rel)
 
     # Test drop tip shake with 25% of tiprack well diameter
     # between upper (2.25 mm) and lower limit (1.0 mm)
     shake_tips_drop.reset_mock()
     await shake_tips_drop(types.Mount.RIGHT, 2.0*4)
     move_rel_calls = [
-        mock.call(types.Mount.RIGHT, types.Point(-2, 0, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(4, 0, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(-2, 0, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(0, 0, 20))]
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(-2, 0, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(4, 0, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(-2, 0, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(0, 0, 20))]
     move_rel.assert_has_calls(move_rel_calls)
 
     # Test drop tip shake with 25% of tiprack well diameter
@@ -358,10 +391,14 @@ async def test_shake_during_drop(hardware_api, monkeypatch):
     shake_tips_drop.reset_mock()
     await shake_tips_drop(types.Mount.RIGHT, 2.3*4)
     move_rel_calls = [
-        mock.call(types.Mount.RIGHT, types.Point(-2.25, 0, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(4.5, 0, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(-2.25, 0, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(0, 0, 20))]
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(-2.25, 0, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(4.5, 0, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(-2.25, 0, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(0, 0, 20))]
     move_rel.assert_has_calls(move_rel_calls)
 
     # Test drop tip shake with 25% of tiprack well diameter
@@ -369,8 +406,12 @@ async def test_shake_during_drop(hardware_api, monkeypatch):
     shake_tips_drop.reset_mock()
     await shake_tips_drop(types.Mount.RIGHT, 0.9*4)
     move_rel_calls = [
-        mock.call(types.Mount.RIGHT, types.Point(-1, 0, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(2, 0, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(-1, 0, 0), speed=50),
-        mock.call(types.Mount.RIGHT, types.Point(0, 0, 20))]
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(-1, 0, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(2, 0, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(-1, 0, 0), speed=50),
+        mock.call(mock.ANY, mock.ANY,
+                  types.Mount.RIGHT, types.Point(0, 0, 20))]
     move_rel.assert_has_calls(move_rel_calls)
@@ -0,0 +1,128 @@
+""" Benchmarks of the geometry primitives on a 384 well plate: every well is
+offset by a calibration and then to its top, the way a protocol iterating
+over a plate would.
+
+Every implementation must agree. Timing them depends on the machine, so
+that only runs in the benchmark job (``make benchmark``, which sets
+``OT_API_BENCHMARK``). It prints how long each takes per plate, and checks
+that the optimized primitives are no slower than the ones they replaced and
+that moving a whole plate at once beats moving it well by well.
+"""
+import os
+import timeit
+from typing import Any, NamedTuple
+
+import pytest
+
+from opentrons.types import Point
+from opentrons.util.points import PointArray
+from opentrons.util.vector import Vector, VectorValue
+
+ROWS = 16
+COLUMNS = 24
+REPEATS = 20
+
+benchmark = pytest.mark.skipif(
+    not os.environ.get('OT_API_BENCHMARK'),
+    reason='benchmarks only run when OT_API_BENCHMARK is set')
+
+
+class NamedTuplePoint(NamedTuple):
+    """ The arithmetic :py:class:`.Point` had before it was optimized """
+    x: float = 0.0
+    y: float = 0.0
+    z: float = 0.0
+
+    def __add__(self, other: Any) -> 'NamedTuplePoint':
+        if not isinstance(other, NamedTuplePoint):
+            return NotImplemented
+        return NamedTuplePoint(
+            self.x + other.x, self.y + other.y, self.z + other.z)
+
+
+class UnslottedVector:
+    """ The parts of the legacy :py:class:`.Vector` that adding uses, as they
+    were before it was slimmed down
+    """
+    def __init__(self, *args):
+        if len(args) == 1:
+            arg = args[0]
+            self.coordinates = VectorValue(arg[0], arg[1], arg[2])
+        elif len(args) == 3:
+            self.coordinates = VectorValue(*args)
+        else:
+            raise ValueError("Expected either a dict/iterable or x, y, z")
+
+    def __add__(self, other):
+        return UnslottedVector(
+            self.coordinates.x + other[0],
+            self.coordinates.y + other[1],
+            self.coordinates.z + other[2])
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            return self.coordinates[index]
+        elif isinstance(index, str):
+            return getattr(self.coordinates, index)
+        raise IndexError('Expected slice or string as an index')
+
+    def __iter__(self):
+        return iter(self.coordinates)
+
+
+def _wells(point_type):
+    return [point_type(col * 4.5, row * 4.5, 0.0)
+            for col in range(COLUMNS) for row in range(ROWS)]
+
+
+def _offset_each(wells, calibration, top):
+    return [well + calibration + top for well in wells]
+
+
+def _cases():
+    named_wells = _wells(NamedTuplePoint)
+    point_wells = _wells(Point)
+    vector_wells = _wells(Vector)
+    unslotted_wells = _wells(UnslottedVector)
+    array_wells = PointArray(point_wells)
+
+    return {
+        'NamedTuple point': lambda: _offset_each(
+            named_wells, NamedTuplePoint(1, 2, 3), NamedTuplePoint(0, 0, 10)),
+        'types.Point': lambda: _offset_each(
+            point_wells, Point(1, 2, 3), Point(0, 0, 10)),
+        'unslotted Vector': lambda: _offset_each(
+            unslotted_wells, UnslottedVector(1, 2, 3),
+            UnslottedVector(0, 0, 10)),
+        'legacy Vector': lambda: _offset_each(
+            vector_wells, Vector(1, 2, 3), Vector(0, 0, 10)),
+        'PointArray': lambda: list(
+            array_wells + Point(1, 2, 3) + Point(0, 0, 10)),
+        'PointArray (no iteration)': lambda: (
+            array_wells + Point(1, 2, 3) + Point(0, 0, 10)),
+    }
+
+
+def test_offset_384_wells():
+    results = {name: case() for name, case in _cases().items()}
+    expected = [tuple(p) for p in results['NamedTuple point']]
+    assert [tuple(p) for p in results['types.Point']] == expected
+    assert [tuple(p) for p in results['unslotted Vector']] == expected
+    assert [tuple(p) for p in results['legacy Vector']] == expected
+    assert [tuple(p) for p in results['PointArray']] == expected
+
+
+@benchmark
+def test_offset_384_wells_timings(capsys):
+    timings = {name: min(timeit.repeat(case, number=REPEATS, repeat=5))
+               for name, case in _cases().items()}
+    with capsys.disabled():
+        print('\nOffsetting {} wells:'.format(ROWS * COLUMNS))
+        for name, seconds in timings.items():
+            print('{:>26}: {:8.1f} us per plate'.format(
+                name, seconds / REPEATS * 1e6))
+
+    assert timings['types.Point'] <= timings['NamedTuple point']
+    assert timings['legacy Vector'] <= timings['unslotted Vector']
+    assert timings['PointArray (no iteration)'] \
+        < timings['NamedTuple point']
@@ -24,7 +24,10 @@ def get_labware_def(monkeypatch):
                 'opentrons',
                 f'shared_data/labware/definitions/2/{labware_name}/1.json'))
         return labware_def
-    monkeypatch.setattr(papi.labware, 'get_labware_definition', dummy_load)
+    monkeypatch.setattr(
+        papi.labware, '_shared_labware_definition', dummy_load)
+    monkeypatch.setattr(
+        papi.contexts, '_shared_labware_definition', dummy_load)
 
 
 def test_load_instrument(loop):
@@ -401,3 +401,48 @@ def test_tiprack_list():
     with pytest.raises(labware.OutOfTipsError):
         labware.select_tiprack_from_list(
             [tiprack], 1, tiprack.wells()[95])
+
+
+def test_well_geometry_views():
+    labware_def = labware.get_labware_definition(
+        'corning_384_wellplate_112ul_flat')
+    slot = Location(Point(10, 20, 30), 'Test Slot')
+    lw = labware.Labware(labware_def, slot)
+    corner = Point(**labware_def['cornerOffsetFromSlot']) + slot.point
+    for name, props in labware_def['wells'].items():
+        well = lw[name]
+        assert well is lw.wells_by_name()[name]
+        assert well.top().point == corner + Point(
+            props['x'], props['y'], props['z'] + props['depth'])
+        assert well.max_volume == props['totalLiquidVolume']
+
+    lw.set_calibration(Point(1, 2, 3))
+    props = labware_def['wells']['P24']
+    assert lw['P24'].bottom().point == corner + Point(
+        props['x'] + 1, props['y'] + 2, props['z'] + 3)
+    assert lw.well(-1) is lw['P24']
+
+
+def test_tip_state_survives_calibration():
+    tiprack = labware.Labware(
+        labware.get_labware_definition('opentrons_96_tiprack_300ul'),
+        Location(Point(0, 0, 0), 'Test Slot'))
+    tiprack.use_tips(tiprack['A1'], 8)
+    tiprack.set_calibration(Point(1, 1, 1))
+    assert tiprack.next_tip() is tiprack['A2']
+    tiprack.reset()
+    assert tiprack.next_tip() is tiprack['A1']
+
+
+def test_well_identity_survives_calibration():
+    definition = labware.get_labware_definition(
+        'corning_96_wellplate_360ul_flat')
+    plate = labware.Labware(definition, Location(Point(0, 0, 0), 'Test Slot'))
+    other = labware.Labware(definition, Location(Point(0, 0, 0), 'Test Slot'))
+    seen = {plate['A1']: 'first', plate['B1']: 'second'}
+    plate.set_calibration(Point(1, 1, 1))
+    assert seen[plate['A1']] == 'first'
+    assert plate['B1'] in seen
+    assert plate['A1'] != plate['B1']
+    # The same well of another labware at the same place is a different well
+    assert other['A1'] != plate['A1']
@@ -40,3 +40,58 @@ def test_deprecated_load(loop):
     ctx = papi.ProtocolContext(loop=loop)
     labware = ctx.load_labware_by_name(labware_name, '1', 'my cool labware')
     assert 'my cool labware' in str(labware)
+
+
+def test_definition_index_and_cache():
+    index = papi.labware._definition_index(
+        papi.labware.CONFIG['labware_user_definitions_dir_v2'])
+    assert ('opentrons', labware_name, 1) in index
+    first = papi.labware._shared_labware_definition(labware_name)
+    assert papi.labware._shared_labware_definition(labware_name) is first
+
+
+def test_returned_definition_is_a_copy(loop):
+    dfn = papi.labware.get_labware_definition(labware_name)
+    dfn['parameters']['loadName'] = 'scribbled'
+    dfn['wells']['A1']['depth'] = 0
+    again = papi.labware.get_labware_definition(labware_name)
+    assert again['parameters']['loadName'] == labware_name
+    assert again['wells']['A1']['depth'] != 0
+    ctx = papi.ProtocolContext(loop=loop)
+    labware = ctx.load_labware(labware_name, '1')
+    assert labware._definition['parameters']['loadName'] == labware_name
+
+
+def test_tip_length_not_shared(loop):
+    ctx = papi.ProtocolContext(loop=loop)
+    tiprack1 = ctx.load_labware('opentrons_96_tiprack_300ul', '1')
+    tiprack2 = ctx.load_labware('opentrons_96_tiprack_300ul', '2')
+    length = tiprack1.tip_length
+    tiprack2.tip_length = length + 1.0
+    assert tiprack1.tip_length == length
+    tiprack3 = ctx.load_labware('opentrons_96_tiprack_300ul', '3')
+    assert tiprack3.tip_length == length
+
+
+def test_custom_definition_cache_invalidation():
+    dfn = dict(papi.labware.get_labware_definition(labware_name))
+    dfn['namespace'] = 'custom_beta'
+    dfn['metadata'] = dict(dfn['metadata'], displayName='my custom plate')
+    dfn['parameters'] = dict(dfn['parameters'], loadName='my_custom_plate')
+
+    with pytest.raises(FileNotFoundError):
+        papi.labware.get_labware_definition('my_custom_plate')
+
+    papi.labware.save_definition(dfn)
+    loaded = papi.labware.get_labware_definition('my_custom_plate')
+    assert loaded['metadata']['displayName'] == 'my custom plate'
+
+    dfn['metadata'] = dict(dfn['metadata'], displayName='renamed plate')
+    papi.labware.save_definition(dfn, force=True)
+    loaded = papi.labware.get_labware_definition(
+        'my_custom_plate', 'custom_beta')
+    assert loaded['metadata']['displayName'] == 'renamed plate'
+
+    papi.labware.delete_all_custom_labware()
+    with pytest.raises(FileNotFoundError):
+        papi.labware.get_labware_definition('my_custom_plate')
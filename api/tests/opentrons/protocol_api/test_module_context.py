@@ -1,3 +1,4 @@
+import asyncio
 import json
 import pkgutil
 
@@ -182,6 +183,46 @@ def test_thermocycler_temp(loop):
     assert mod.ramp_rate is None
 
 
+def test_parallel_module_commands(loop, monkeypatch):
+    ctx = papi.ProtocolContext(loop)
+    ctx._hw_manager.hardware._backend._attached_modules = [
+        ('mod0', 'thermocycler')]
+    mod = ctx.load_module('thermocycler')
+    hw_mod = mod._module._api
+    reached = asyncio.Event(loop=hw_mod.loop)
+
+    async def wait_for_temp(timeout=None):
+        await reached.wait()
+
+    monkeypatch.setattr(hw_mod, 'wait_for_temp', wait_for_temp)
+    with ctx.parallel() as block:
+        cooling = mod.set_block_temperature(4)
+        # The protocol goes on while the block cools
+        ctx.home()
+        assert not cooling.done()
+        hw_mod.loop.call_soon_threadsafe(reached.set)
+        block.wait_for(mod)
+        assert cooling.done()
+        mod.set_lid_temperature(100)
+        mod.open_lid()
+    assert ctx._parallel is None
+    assert mod.block_target_temperature == 4
+    assert mod.lid_target_temperature == 100
+
+    async def overheated(timeout=None):
+        raise RuntimeError('overheated')
+
+    monkeypatch.setattr(hw_mod, 'wait_for_temp', overheated)
+    with pytest.raises(RuntimeError):
+        with ctx.parallel():
+            mod.set_block_temperature(4)
+            ctx.home()
+    assert ctx._parallel is None
+    # Outside of a block commands wait as before
+    monkeypatch.setattr(hw_mod, 'wait_for_temp', wait_for_temp)
+    assert mod.set_block_temperature(10) is None
+
+
 def test_thermocycler_profile(loop):
     ctx = papi.ProtocolContext(loop)
     ctx._hw_manager.hardware._backend._attached_modules = [
@@ -1,6 +1,7 @@
 # pylama:ignore=W0612
 import json
 import os
+import shutil
 import time
 
 import pytest
@@ -175,15 +176,20 @@ def test_load_calibration(monkeypatch, clear_calibration):
     assert test_labware.tip_length == test_tip_length
 
 
-def test_wells_rebuilt_with_offset():
+def test_wells_moved_with_offset():
     test_labware = labware.Labware(minimalLabwareDef,
                                    Location(Point(0, 0, 0), 'deck'))
     old_wells = test_labware._wells
+    old_top = old_wells[0].top().point
+    old_wells[0].has_tip = True
     assert test_labware._offset == Point(10, 10, 5)
     assert test_labware._calibrated_offset == Point(10, 10, 5)
     labware.save_calibration(test_labware, Point(2, 2, 2))
     new_wells = test_labware._wells
-    assert old_wells[0] != new_wells[0]
+    # The same wells are moved, and keep their tip state
+    assert old_wells[0] is new_wells[0]
+    assert new_wells[0].top().point == old_top + Point(2, 2, 2)
+    assert new_wells[0].has_tip
     assert test_labware._offset == Point(10, 10, 5)
     assert test_labware._calibrated_offset == Point(12, 12, 7)
 
@@ -222,3 +228,49 @@ def test_hash_labware_def():
     assert labware._hash_labware_def(def1a) == labware._hash_labware_def(def1b)
     # different data should not match
     assert labware._hash_labware_def(def1a) != labware._hash_labware_def(def2)
+
+
+def test_labware_hash_memoized(monkeypatch):
+    hashed = []
+
+    def counting_hash(labware_def):
+        hashed.append(labware_def)
+        return MOCK_HASH
+
+    monkeypatch.setattr(labware, '_hash_labware_def', counting_hash)
+    definition = json.loads(json.dumps(minimalLabwareDef))
+    for _ in range(3):
+        assert labware._get_labware_hash(definition) == MOCK_HASH
+    assert len(hashed) == 1
+    # an equal but distinct definition gets its own hash
+    labware._get_labware_hash(json.loads(json.dumps(minimalLabwareDef)))
+    assert len(hashed) == 2
+
+
+def test_calibration_listing_sees_saves(monkeypatch, clear_calibration):
+    monkeypatch.setattr(labware, '_hash_labware_def', mock_hash_labware)
+    definition = json.loads(json.dumps(minimalLabwareDef))
+    first = labware.load_from_definition(
+        definition, Location(Point(0, 0, 0), 'deck'))
+    assert first._calibrated_offset == Point(10, 10, 5)
+
+    labware.save_calibration(first, Point(1, 2, 3))
+    second = labware.load_from_definition(
+        definition, Location(Point(0, 0, 0), 'deck'))
+    assert second._calibrated_offset == Point(11, 12, 8)
+
+    labware.clear_calibrations()
+    third = labware.load_from_definition(
+        definition, Location(Point(0, 0, 0), 'deck'))
+    assert third._calibrated_offset == Point(10, 10, 5)
+
+
+def test_save_after_calibration_dir_removed(monkeypatch, clear_calibration):
+    monkeypatch.setattr(labware, '_hash_labware_def', mock_hash_labware)
+    test_labware = labware.Labware(minimalLabwareDef,
+                                   Location(Point(0, 0, 0), 'deck'))
+    labware.save_calibration(test_labware, Point(1, 1, 1))
+    # For instance, a calibration reset deletes the whole directory
+    shutil.rmtree(os.path.dirname(path(MOCK_HASH)))
+    labware.save_calibration(test_labware, Point(2, 2, 2))
+    assert os.path.exists(path(MOCK_HASH))
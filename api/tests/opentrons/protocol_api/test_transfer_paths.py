@@ -0,0 +1,42 @@
+import itertools
+import random
+
+from opentrons.types import Point
+from opentrons.protocol_api import transfer_paths as tp
+
+
+def _wells(points):
+    return [(Point(*p), Point(*p)) for p in points]
+
+
+def test_path_length():
+    stops = [(Point(0, 0, 0), Point(3, 4, 0)), (Point(3, 4, 0), Point())]
+    assert tp.path_length(stops) == 0
+    assert tp.path_length(stops, start=Point(0, 3, 4), end=Point(0, 0, 5)) \
+        == 5 + 5
+
+
+def test_zig_zag_is_straightened():
+    points = [(0, 0, 0), (90, 0, 0), (10, 0, 0), (80, 0, 0), (20, 0, 0)]
+    stops = _wells(points)
+    order = tp.shortest_order(stops, start=Point(0, 0, 0))
+    assert sorted(order) == list(range(len(points)))
+    assert [points[idx] for idx in order] == sorted(points)
+
+
+def test_never_worse_than_given():
+    rng = random.Random(1234)
+    for _ in range(20):
+        count = rng.randint(1, 7)
+        stops = [(Point(rng.uniform(0, 100), rng.uniform(0, 100), 0),
+                  Point(rng.uniform(0, 100), rng.uniform(0, 100), 0))
+                 for _ in range(count)]
+        start = Point(0, 0, 0)
+        order = tp.shortest_order(stops, start=start)
+        assert sorted(order) == list(range(count))
+        length = tp.path_length([stops[idx] for idx in order], start)
+        assert length <= tp.path_length(stops, start) + 1e-9
+        best = min(tp.path_length([stops[idx] for idx in perm], start)
+                   for perm in itertools.permutations(range(count)))
+        # The heuristic should be close to the best order for a few stops
+        assert length <= best * 1.5 + 1e-9
@@ -1,4 +1,6 @@
 """ Test the Transfer class and its functions """
+import tracemalloc
+
 import pytest
 import opentrons.protocol_api as papi
 from opentrons.types import Mount, TransferTipPolicy
@@ -32,7 +34,7 @@ def test_default_transfers(_instr_labware):
         max_volume=_instr_labware['instr'].hw_pipette['working_volume'])
     xfer_plan_list = []
     for step in xfer_plan:
-        xfer_plan_list.append(step)
+        xfer_plan_list.append(step._asdict())
     exp1 = [{'method': 'pick_up_tip', 'args': [], 'kwargs': {}},
             {'method': 'aspirate',
              'args': [100, lw1.columns()[0][0], 1.0], 'kwargs': {}},
@@ -76,7 +78,7 @@ def test_default_transfers(_instr_labware):
         max_volume=_instr_labware['instr'].hw_pipette['working_volume'])
     dist_plan_list = []
     for step in dist_plan:
-        dist_plan_list.append(step)
+        dist_plan_list.append(step._asdict())
     exp2 = [{'method': 'pick_up_tip', 'args': [], 'kwargs': {}},
             {'method': 'aspirate',
              'args': [300, lw1.columns()[0][0], 1.0], 'kwargs': {}},
@@ -108,7 +110,7 @@ def test_default_transfers(_instr_labware):
         max_volume=_instr_labware['instr'].hw_pipette['working_volume'])
     consd_plan_list = []
     for step in consd_plan:
-        consd_plan_list.append(step)
+        consd_plan_list.append(step._asdict())
     exp3 = [{'method': 'pick_up_tip', 'args': [], 'kwargs': {}},
             {'method': 'aspirate',
              'args': [50, lw1.columns()[0][0], 1.0], 'kwargs': {}},
@@ -150,8 +152,8 @@ def test_no_new_tip(_instr_labware):
         max_volume=_instr_labware['instr'].hw_pipette['working_volume'],
         options=options)
     for step in xfer_plan:
-        assert step['method'] != 'pick_up_tip'
-        assert step['method'] != 'drop_tip'
+        assert step.method != 'pick_up_tip'
+        assert step.method != 'drop_tip'
 
     # ========== Distribute ===========
     dist_plan = tx.TransferPlan(
@@ -160,8 +162,8 @@ def test_no_new_tip(_instr_labware):
         max_volume=_instr_labware['instr'].hw_pipette['working_volume'],
         options=options)
     for step in dist_plan:
-        assert step['method'] != 'pick_up_tip'
-        assert step['method'] != 'drop_tip'
+        assert step.method != 'pick_up_tip'
+        assert step.method != 'drop_tip'
 
     # ========== Consolidate ===========
     consd_plan = tx.TransferPlan(
@@ -170,8 +172,8 @@ def test_no_new_tip(_instr_labware):
         max_volume=_instr_labware['instr'].hw_pipette['working_volume'],
         options=options)
     for step in consd_plan:
-        assert step['method'] != 'pick_up_tip'
-        assert step['method'] != 'drop_tip'
+        assert step.method != 'pick_up_tip'
+        assert step.method != 'drop_tip'
 
 
 def test_new_tip_always(_instr_labware, monkeypatch):
@@ -195,7 +197,7 @@ def test_new_tip_always(_instr_labware, monkeypatch):
         options=options)
     xfer_plan_list = []
     for step in xfer_plan:
-        xfer_plan_list.append(step)
+        xfer_plan_list.append(step._asdict())
     exp1 = [{'method': 'pick_up_tip', 'args': [], 'kwargs': {}},
             {'method': 'aspirate', 'args': [100, lw1.columns()[0][1], 1.0],
              'kwargs': {}},
@@ -245,7 +247,7 @@ def test_transfer_w_airgap_blowout(_instr_labware):
         options=options)
     xfer_plan_list = []
     for step in xfer_plan:
-        xfer_plan_list.append(step)
+        xfer_plan_list.append(step._asdict())
     exp1 = [{'method': 'aspirate',
              'args': [100, lw1.columns()[0][1], 1.0], 'kwargs': {}},
             {'method': 'air_gap',
@@ -295,7 +297,7 @@ def test_transfer_w_airgap_blowout(_instr_labware):
         options=options)
     dist_plan_list = []
     for step in dist_plan:
-        dist_plan_list.append(step)
+        dist_plan_list.append(step._asdict())
     exp2 = [{'method': 'aspirate',
              'args': [240, lw1.columns()[1][0], 1.0], 'kwargs': {}},
             {'method': 'air_gap', 'args': [10], 'kwargs': {}},
@@ -332,7 +334,7 @@ def test_transfer_w_airgap_blowout(_instr_labware):
         options=options)
     consd_plan_list = []
     for step in consd_plan:
-        consd_plan_list.append(step)
+        consd_plan_list.append(step._asdict())
     exp3 = [{'method': 'aspirate',
              'args': [60, lw1.columns()[1][0], 1.0], 'kwargs': {}},
             {'method': 'air_gap', 'args': [10], 'kwargs': {}},
@@ -388,7 +390,7 @@ def test_touchtip_mix(_instr_labware):
         options=options)
     xfer_plan_list = []
     for step in xfer_plan:
-        xfer_plan_list.append(step)
+        xfer_plan_list.append(step._asdict())
     exp1 = [{'method': 'aspirate',
              'args': [100, lw1.columns()[0][1], 1.0], 'kwargs': {}},
             {'method': 'touch_tip', 'args': [], 'kwargs': {}},
@@ -427,7 +429,7 @@ def test_touchtip_mix(_instr_labware):
         options=options)
     dist_plan_list = []
     for step in dist_plan:
-        dist_plan_list.append(step)
+        dist_plan_list.append(step._asdict())
     exp2 = [{'method': 'aspirate',
              'args': [300, lw1.columns()[1][0], 1.0], 'kwargs': {}},
             {'method': 'touch_tip', 'args': [], 'kwargs': {}},
@@ -458,7 +460,7 @@ def test_touchtip_mix(_instr_labware):
         options=options)
     consd_plan_list = []
     for step in consd_plan:
-        consd_plan_list.append(step)
+        consd_plan_list.append(step._asdict())
     exp3 = [{'method': 'aspirate',
              'args': [60, lw1.columns()[1][0], 1.0], 'kwargs': {}},
             {'method': 'touch_tip', 'args': [], 'kwargs': {}},
@@ -526,7 +528,7 @@ def test_all_options(_instr_labware):
         options=options)
     xfer_plan_list = []
     for step in xfer_plan:
-        xfer_plan_list.append(step)
+        xfer_plan_list.append(step._asdict())
     exp1 = [{'method': 'pick_up_tip',
              'args': [], 'kwargs': {'presses': 4, 'increment': 2}},
             {'method': 'aspirate',
@@ -565,7 +567,7 @@ def test_oversized_distribute(_instr_labware):
         max_volume=_instr_labware['instr'].hw_pipette['working_volume'])
     xfer_plan_list = []
     for step in xfer_plan:
-        xfer_plan_list.append(step)
+        xfer_plan_list.append(step._asdict())
     exp1 = [{'method': 'pick_up_tip', 'args': [], 'kwargs': {}},
             {'method': 'aspirate',
              'args': [300, lw1.wells_by_index()['A1'], 1.0], 'kwargs': {}},
@@ -607,7 +609,7 @@ def test_oversized_consolidate(_instr_labware):
         max_volume=_instr_labware['instr'].hw_pipette['working_volume'])
     xfer_plan_list = []
     for step in xfer_plan:
-        xfer_plan_list.append(step)
+        xfer_plan_list.append(step._asdict())
     exp1 = [{'method': 'pick_up_tip', 'args': [], 'kwargs': {}},
             {'method': 'aspirate',
              'args': [300, lw2.wells_by_index()['A2'], 1.0], 'kwargs': {}},
@@ -648,7 +650,7 @@ def test_oversized_transfer(_instr_labware):
         max_volume=_instr_labware['instr'].hw_pipette['working_volume'])
     xfer_plan_list = []
     for step in xfer_plan:
-        xfer_plan_list.append(step)
+        xfer_plan_list.append(step._asdict())
     exp1 = [{'method': 'pick_up_tip', 'args': [], 'kwargs': {}},
             {'method': 'aspirate',
              'args': [300, lw2.wells_by_index()['A2'], 1.0], 'kwargs': {}},
@@ -676,3 +678,117 @@ def test_oversized_transfer(_instr_labware):
              'args': [200, lw1.wells_by_index()['C1'], 1.0], 'kwargs': {}},
             {'method': 'drop_tip', 'args': [], 'kwargs': {}}]
     assert xfer_plan_list == exp1
+
+
+def test_plan_is_streamed(_instr_labware):
+    lw1 = _instr_labware['lw1']
+    lw2 = _instr_labware['lw2']
+    instr = _instr_labware['instr']
+
+    def peak_memory(plates):
+        plan = tx.TransferPlan(
+            (10, 20), lw1.wells(), [lw2.wells()] * plates, instr,
+            max_volume=instr.hw_pipette['working_volume'],
+            mode='distribute')
+        tracemalloc.start()
+        try:
+            steps = plan.__iter__()
+            first = next(steps)
+            for step in steps:
+                pass
+            return tracemalloc.get_traced_memory()[1], first, step
+        finally:
+            tracemalloc.stop()
+
+    small_peak, first, last = peak_memory(2)
+    large_peak, _, _ = peak_memory(50)
+    assert first == tx.TransferStep('pick_up_tip', [], {})
+    assert last.method == 'drop_tip'
+    # 4800 dispenses take no more memory to plan than 192 do
+    assert large_peak < small_peak * 2
+
+
+def test_optimize_path(_instr_labware):
+    lw1 = _instr_labware['lw1']
+    lw2 = _instr_labware['lw2']
+    instr = _instr_labware['instr']
+    # Alternate between the two ends of the plate
+    wells = lw2.wells()
+    scattered = [well for pair in zip(wells[:48], reversed(wells[48:]))
+                 for well in pair]
+
+    def plan(options, sources, dests, mode):
+        xfer_plan = tx.TransferPlan(
+            30, sources, dests, instr,
+            max_volume=instr.hw_pipette['working_volume'], mode=mode,
+            options=tx.TransferOptions(transfer=options))
+        return [(step.method, step.args) for step in xfer_plan], xfer_plan
+
+    for sources, mode in ((lw1['A1'], 'distribute'),
+                          (lw1.wells(), 'transfer')):
+        plain, plain_plan = plan(tx.Transfer(), sources, scattered, mode)
+        optimized, xfer_plan = plan(
+            tx.Transfer(optimize_path=True), sources, scattered, mode)
+        assert plain_plan.travel_distance == (0, 0)
+        before, after = xfer_plan.travel_distance
+        assert after < before
+        if mode == 'distribute':
+            assert after < before * 0.6
+        # The same liquid goes to the same places, in the same batches
+        assert sorted(str(step) for step in optimized) \
+            == sorted(str(step) for step in plain)
+        assert [method for method, _ in optimized] \
+            == [method for method, _ in plain]
+        if mode == 'distribute':
+            assert [args for method, args in optimized
+                    if method == 'aspirate'] \
+                == [args for method, args in plain if method == 'aspirate']
+        else:
+            pairs = list(zip(lw1.wells(), scattered))
+            steps = iter(args for method, args in optimized
+                         if method in ('aspirate', 'dispense'))
+            assert sorted(
+                (str(asp[1]), str(disp[1])) for asp, disp in zip(steps, steps)
+            ) == sorted((str(src), str(dest)) for src, dest in pairs)
+
+    # A well that is both a source and a destination keeps the order
+    chained, xfer_plan = plan(
+        tx.Transfer(optimize_path=True), wells[:10], wells[1:11], 'transfer')
+    plain, _ = plan(tx.Transfer(), wells[:10], wells[1:11], 'transfer')
+    assert chained == plain
+    assert xfer_plan.travel_distance == (0, 0)
+
+
+def test_pack_dispenses(_instr_labware):
+    lw1 = _instr_labware['lw1']
+    lw2 = _instr_labware['lw2']
+    instr = _instr_labware['instr']
+    volumes = [200, 150, 100, 150, 200, 100]
+    wells = lw2.wells()[:6]
+
+    def plan(pack, sources, dests, mode):
+        xfer_plan = tx.TransferPlan(
+            volumes, sources, dests, instr,
+            max_volume=instr.hw_pipette['working_volume'], mode=mode,
+            options=tx.TransferOptions(
+                transfer=tx.Transfer(pack_dispenses=pack,
+                                     new_tip=TransferTipPolicy.NEVER)))
+        return [(step.method, step.args) for step in xfer_plan], xfer_plan
+
+    for mode, sources, dests, moved in (
+            ('distribute', lw1['A1'], wells, 'dispense'),
+            ('consolidate', wells, lw1['A1'], 'aspirate')):
+        greedy, greedy_plan = plan(False, sources, dests, mode)
+        packed, packed_plan = plan(True, sources, dests, mode)
+        assert greedy_plan.aspirations_saved == 0
+        assert packed_plan.aspirations_saved == 1
+        grouped = 'aspirate' if mode == 'distribute' else 'dispense'
+        assert [args[0] for method, args in greedy if method == grouped] \
+            == [200, 250, 150, 300]
+        assert [args[0] for method, args in packed if method == grouped] \
+            == [300, 300, 300]
+        # Every well still gets (or gives) its own volume
+        assert sorted((args[0], str(args[1]))
+                      for method, args in packed if method == moved) \
+            == sorted((volume, str(well))
+                      for volume, well in zip(volumes, wells))
@@ -106,6 +106,40 @@ def test_add_container(virtual_smoothie_env):
     assert set(res) == set(expected)
 
 
+def test_add_container_reuses_prototype(virtual_smoothie_env, monkeypatch):
+    from opentrons.data_storage import database
+    robot.reset()
+    c1 = robot.add_container('96-flat', '1')
+
+    def no_database(name):
+        raise AssertionError('container loaded from the database again')
+    monkeypatch.setattr(database, 'load_container', no_database)
+    robot.reset()
+    c2 = robot.add_container('96-flat', '2')
+    assert c2 is not c1
+    assert c2[0] is not c1[0]
+    assert c2[0].properties is c1[0].properties
+    assert c2.rows['A'][0] is c2[0]
+    assert [w.get_name() for w in c2] == [w.get_name() for w in c1]
+    assert c2[5]._coordinates == c1[5]._coordinates
+    assert c2.parent is robot.deck['2']
+    monkeypatch.undo()
+
+    # Saving a container calibration loads it from the database again
+    robot.poses = robot._calibrate_container_with_delta(
+        robot.poses, c2, 1, 2, 3, save=True)
+    loaded = []
+    real_load = database.load_container
+
+    def counted_load(name):
+        loaded.append(name)
+        return real_load(name)
+    monkeypatch.setattr(database, 'load_container', counted_load)
+    c3 = robot.add_container('96-flat', '3')
+    assert loaded == ['96-flat']
+    assert c3._coordinates == c2._coordinates
+
+
 def test_comment(virtual_smoothie_env):
     robot.reset()
     robot.clear_commands()
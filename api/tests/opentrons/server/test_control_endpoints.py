@@ -583,3 +583,37 @@ async def test_rail_lights(async_client):
     assert resp.status == 200
     data = await resp.json()
     assert not data['on']
+
+
+@pytest.mark.api2_only
+async def test_get_module_history(
+          virtual_smoothie_env,
+          loop,
+          async_server,
+          async_client,
+          monkeypatch):
+    hw = async_server['com.opentrons.hardware']
+    temp_module = await modules.build('', 'tempdeck', True, lambda x: None)
+    for i in range(10):
+        temp_module.telemetry.append(20 + i, 40, timestamp=1000 + i)
+
+    async def stub():
+        return [temp_module]
+
+    monkeypatch.setattr(hw, 'discover_modules', stub)
+
+    resp = await async_client.get(
+        '/modules/dummySerial/data/history?since=1005&points=3')
+    body = await resp.json()
+    assert resp.status == 200
+    assert body['fields'] == ['timestamp', 'temperature', 'target',
+                              'lidTemp', 'holdTime']
+    assert [s['timestamp'] for s in body['samples']] == [1005, 1007, 1009]
+    assert body['samples'][0]['temperature'] == 25
+    assert body['samples'][0]['lidTemp'] is None
+
+    resp = await async_client.get(
+        '/modules/dummySerial/data/history?points=lots')
+    assert resp.status == 400
+    resp = await async_client.get('/modules/notASerial/data/history')
+    assert resp.status == 404
@@ -3,7 +3,7 @@ import json
 import tempfile
 import asyncio
 import pytest
-from aiohttp import web
+from aiohttp import web, FormData
 from opentrons.server import init
 from opentrons.server.endpoints import update
 from opentrons.server.endpoints import serverlib_fallback
@@ -259,3 +259,73 @@ async def test_fail_update_module_firmware(
     assert resp4.status == 404
     j4 = await resp4.json()
     assert j4 == expected_res4
+
+
+@pytest.mark.api2_only
+async def test_background_module_updates(
+        virtual_smoothie_env,
+        loop,
+        async_server,
+        async_client,
+        monkeypatch):
+    from opentrons.hardware_control import modules as hc_modules
+    hw = async_server['com.opentrons.hardware']
+    attached = []
+    for name, serial in (('tempdeck', 'td1'), ('magdeck', 'md1')):
+        module = await hc_modules.build('', name, True, lambda x: None)
+        module._device_info = {**module.device_info, 'serial': serial}
+        attached.append(module)
+
+    async def mock_discover_modules():
+        return attached
+
+    release = asyncio.Event(loop=loop)
+    flashed = {}
+
+    async def mock_update_module(
+            module, firmware_file, loop=None, progress_callback=None,
+            timeout=None):
+        with open(firmware_file) as fw:
+            flashed[module.device_info['serial']] = fw.read()
+        progress_callback(0.5)
+        await release.wait()
+        return True, 'firmware update successful'
+
+    monkeypatch.setattr(hw, 'discover_modules', mock_discover_modules)
+    monkeypatch.setattr(hw, 'update_module', mock_update_module)
+
+    def firmware(contents):
+        data = FormData()
+        data.add_field('module_firmware', contents, filename='fw.hex')
+        return data
+
+    for serial in ('td1', 'md1'):
+        resp = await async_client.post(
+            '/modules/{}/update/start'.format(serial),
+            data=firmware('firmware for ' + serial))
+        assert resp.status == 202
+        body = await resp.json()
+        assert body['serial'] == serial
+        assert body['filename'] == 'fw.hex'
+    resp = await async_client.post(
+        '/modules/td1/update/start',
+        data=firmware('again'))
+    assert resp.status == 409
+    resp = await async_client.post(
+        '/modules/nope/update/start',
+        data=firmware('nope'))
+    assert resp.status == 404
+
+    resp = await async_client.get('/modules/update/status')
+    assert resp.status == 200
+    updates = (await resp.json())['updates']
+    assert {(u['serial'], u['status'], u['progress']) for u in updates}\
+        == {('td1', 'flashing', 0.5), ('md1', 'flashing', 0.5)}
+    assert flashed == {'td1': 'firmware for td1', 'md1': 'firmware for md1'}
+
+    release.set()
+    await asyncio.sleep(0.05)
+    resp = await async_client.get('/modules/update/status')
+    updates = (await resp.json())['updates']
+    assert {(u['serial'], u['status'], u['progress']) for u in updates}\
+        == {('td1', 'succeeded', 1.0), ('md1', 'succeeded', 1.0)}
@@ -0,0 +1,88 @@
+import json
+import os
+import pickletools
+import struct
+
+import pytest
+
+from opentrons.config import pipette_config
+from opentrons.protocol_api import labware
+from opentrons.util import data_bundle
+
+
+SHARED_DATA = os.path.join(
+    os.path.dirname(data_bundle.__file__), '..', 'shared_data')
+
+
+@pytest.fixture
+def bundle(tmpdir, monkeypatch):
+    path = str(tmpdir.join(data_bundle.BUNDLE_NAME))
+    data_bundle.build_bundle(SHARED_DATA, data_bundle.BUNDLED_SUBDIRS, path)
+    bundle = data_bundle.DataBundle(path)
+    monkeypatch.setattr(data_bundle, 'get_bundle', lambda: bundle)
+    labware._clear_definition_caches()
+    yield bundle
+    labware._clear_definition_caches()
+
+
+def test_bundle_contents(bundle):
+    for subdir in data_bundle.BUNDLED_SUBDIRS:
+        for dirpath, _, filenames in os.walk(
+                os.path.join(SHARED_DATA, subdir)):
+            for filename in filenames:
+                if not filename.endswith('.json'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, SHARED_DATA)
+                with open(path, encoding='utf-8') as f:
+                    assert bundle.load(name) == json.load(f)
+    assert 'protocol/schemas/1.json' not in bundle
+    with pytest.raises(KeyError):
+        bundle.load('labware/definitions/2/fake_labware/1.json')
+
+
+def _pickle_protocol(blob):
+    opcode, arg, _ = next(pickletools.genops(blob))
+    assert opcode.name == 'PROTO'
+    return arg
+
+
+def test_bundle_pickle_protocol(bundle, tmpdir):
+    # Readable by the robot's Python, whatever Python built the wheel
+    assert data_bundle.PICKLE_PROTOCOL == 4
+    path = str(tmpdir.join(data_bundle.BUNDLE_NAME))
+    with open(path, 'rb') as f:
+        contents = f.read()
+    magic, protocol, index_len = data_bundle._HEADER.unpack_from(contents)
+    assert protocol == 4
+    data_start = data_bundle._HEADER.size + index_len
+    assert _pickle_protocol(contents[data_bundle._HEADER.size:]) == 4
+    offset, length = bundle._index['pipette/definitions/pipetteNameSpecs.json']
+    assert _pickle_protocol(
+        contents[data_start + offset:data_start + offset + length]) == 4
+
+    too_new = struct.pack('<5sBQ', magic, 255, index_len)\
+        + contents[data_bundle._HEADER.size:]
+    tmpdir.join('too_new.bundle').write_binary(too_new)
+    with pytest.raises(ValueError):
+        data_bundle.DataBundle(str(tmpdir.join('too_new.bundle')))
+
+
+def test_load_from_bundle(bundle):
+    name = 'pipette/definitions/pipetteNameSpecs.json'
+    assert data_bundle.load_shared_data(name)\
+        == pipette_config._thaw(pipette_config.name_config())
+    # files that aren't bundled still load from json
+    assert data_bundle.load_shared_data('protocol/schemas/1.json')
+    with pytest.raises(FileNotFoundError):
+        data_bundle.load_shared_data('protocol/schemas/fake.json')
+
+
+def test_labware_from_bundle(bundle):
+    dfn = labware.get_labware_definition('corning_96_wellplate_360ul_flat')
+    assert dfn['parameters']['loadName'] == 'corning_96_wellplate_360ul_flat'
+    index = labware._definition_index(
+        labware.CONFIG['labware_user_definitions_dir_v2'])
+    assert ('opentrons', 'corning_96_wellplate_360ul_flat', 1) in index
+    with pytest.raises(FileNotFoundError):
+        labware.get_labware_definition('fake_labware')
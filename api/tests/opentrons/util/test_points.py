@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from opentrons.types import Point
+from opentrons.util.points import PointArray
+
+
+def test_point_arithmetic():
+    assert Point(1, 2, 3) + Point(1, 1, 1) == Point(2, 3, 4)
+    assert Point(1, 2, 3) - Point(1, 1, 1) == Point(0, 1, 2)
+    assert isinstance(Point(1, 2, 3) + Point(), Point)
+    with pytest.raises(TypeError):
+        Point(1, 2, 3) + (1, 1, 1)
+
+
+def test_point_array():
+    points = PointArray([Point(0, 0, 0), Point(1, 2, 3), (4, 5, 6)])
+    assert len(points) == 3
+    assert points[1] == Point(1, 2, 3)
+    assert points[-1] == Point(4, 5, 6)
+    assert list(points[1:]) == [Point(1, 2, 3), Point(4, 5, 6)]
+
+    moved = points + Point(1, 1, 1)
+    assert list(moved) == [Point(1, 1, 1), Point(2, 3, 4), Point(5, 6, 7)]
+    assert list(moved - points) == [Point(1, 1, 1)] * 3
+    # The original is unchanged, and cannot be changed through its array
+    assert points[0] == Point(0, 0, 0)
+    with pytest.raises(ValueError):
+        points.array[0, 0] = 1
+
+    assert len(PointArray()) == 0
+    assert list(PointArray(np.zeros((2, 3)))) == [Point(0, 0, 0)] * 2
+    with pytest.raises(ValueError):
+        PointArray([(1, 2)])
@@ -90,3 +90,13 @@ def test_json_encoder():
     s = json.dumps(v1, cls=VectorEncoder)
     v2 = json.loads(s)
     assert v1 == v2
+
+
+def test_arithmetic_with_iterables():
+    v1 = Vector(1, 2, 3)
+    assert v1 + (1, 1, 1) == (2, 3, 4)
+    assert v1 - [1, 1, 1] == (0, 1, 2)
+    assert v1 * 2 == (2, 4, 6)
+    assert isinstance(v1 + (0, 0, 0), Vector)
+    with pytest.raises(AttributeError):
+        v1.x = 4